@@ -1,6 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
 from pathlib import Path
-from typing import List
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+import shutil
+from workers import io_pool
+from search_index import search_index
+from file_index import MAX_PAGE_SIZE, SORT_FIELDS, ListingQuery, company_files
 
 router = APIRouter()
 
@@ -8,22 +14,22 @@ COMPANIES_DIR = Path("firmalar")
 COMPANIES_DIR.mkdir(exist_ok=True)
 
 @router.get("/companies")
-async def list_companies():
+async def list_companies(request: Request):
     """
-    Tüm firmaları listele
+    Tüm firmaları listele (katalogdan; değişiklik yoksa 304)
     """
     try:
-        companies = []
-        for company_dir in COMPANIES_DIR.iterdir():
-            if company_dir.is_dir():
-                # Firma klasöründeki dosya sayısını say
-                file_count = len([f for f in company_dir.iterdir() if f.is_file()])
-                companies.append({
-                    "name": company_dir.name,
-                    "file_count": file_count
-                })
+        etag = await io_pool.run(company_files.companies_etag)
+        if not_modified(request, etag):
+            return Response(status_code=304, headers=listing_headers(etag))
         
-        return {"companies": companies, "count": len(companies)}
+        companies = company_files.list_companies()
+        return JSONResponse(
+            {"companies": companies, "count": len(companies)},
+            headers=listing_headers(etag)
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Firma listeleme hatası: {str(e)}")
 
@@ -43,7 +49,8 @@ async def create_company(company_data: dict):
         raise HTTPException(status_code=400, detail="Bu firma zaten mevcut")
     
     try:
-        company_dir.mkdir(exist_ok=True)
+        await io_pool.run(company_dir.mkdir, exist_ok=True)
+        company_files.notify_company_created(company_name)
         return {
             "message": "Firma başarıyla oluşturuldu",
             "name": company_name,
@@ -53,59 +60,69 @@ async def create_company(company_data: dict):
         raise HTTPException(status_code=500, detail=f"Firma oluşturma hatası: {str(e)}")
 
 @router.get("/companies/{company_name}/files")
-async def list_company_files(company_name: str):
+async def list_company_files(company_name: str, request: Request,
+                             sort: str = "path", order: str = "asc",
+                             limit: Optional[int] = None, cursor: Optional[str] = None,
+                             extension: Optional[str] = None, subfolder: Optional[str] = None,
+                             name_prefix: Optional[str] = None,
+                             modified_from: Optional[datetime] = None, modified_to: Optional[datetime] = None):
     """
-    Belirli bir firmaya ait dosyaları listele (alt klasörler dahil)
+    Belirli bir firmaya ait dosyaları listele (alt klasörler dahil, katalogdan; değişiklik yoksa 304)
+    
+    limit verilirse sayfalı döner, sonraki sayfa için next_cursor gönderilir.
+    Filtreler: extension (".xlsx,.docx"), subfolder (iş emri klasörü, "" = firma kökü),
+    name_prefix, modified_from/modified_to (ISO tarih). Sıralama: path | mtime | name.
     """
-    company_dir = COMPANIES_DIR / company_name
+    query = listing_query(sort, order, limit, cursor, extension, subfolder, name_prefix, modified_from, modified_to)
     
-    if not company_dir.exists():
+    etag = await io_pool.run(company_files.company_etag, company_name)
+    if etag is None:
         raise HTTPException(status_code=404, detail="Firma bulunamadı")
     
     try:
-        files = []
-        # Firma klasörünü ve alt klasörlerini recursive olarak tara
-        for file_path in company_dir.rglob('*'):
-            if file_path.is_file():
-                # Relative path'i al (firma klasörüne göre)
-                rel_path = file_path.relative_to(company_dir)
-                
-                # Alt klasör varsa (iş emri no klasörü) parent klasör adını al
-                subfolder = rel_path.parent.name if rel_path.parent != Path('.') else None
-                
-                files.append({
-                    "name": file_path.name,
-                    "size": file_path.stat().st_size,
-                    "extension": file_path.suffix,
-                    "subfolder": subfolder,  # İş emri no klasörü
-                    "full_path": str(rel_path).replace('\\', '/')
-                })
+        if not_modified(request, etag):
+            return Response(status_code=304, headers=listing_headers(etag))
         
-        return {"company": company_name, "files": files, "count": len(files)}
+        files, next_cursor = company_files.list_company_files(company_name, query)
+        return JSONResponse(
+            {
+                "company": company_name,
+                "files": files,
+                "count": len(files),
+                "next_cursor": next_cursor,
+                # Filtresiz sorguda firmadaki toplam dosya sayısı
+                "total": None if query.filtered else company_files.company_file_count(company_name)
+            },
+            headers=listing_headers(etag)
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Dosya listeleme hatası: {str(e)}")
 
 @router.get("/all-company-files")
-async def list_all_company_files():
+async def list_all_company_files(request: Request,
+                                 sort: str = "path", order: str = "asc",
+                                 limit: Optional[int] = None, cursor: Optional[str] = None,
+                                 extension: Optional[str] = None, name_prefix: Optional[str] = None,
+                                 modified_from: Optional[datetime] = None, modified_to: Optional[datetime] = None):
     """
-    Tüm firmaların dosyalarını listele
+    Tüm firmaların dosyalarını listele (katalogdan; değişiklik yoksa 304, limit ile sayfalı)
     """
+    query = listing_query(sort, order, limit, cursor, extension, None, name_prefix, modified_from, modified_to)
+    
     try:
-        all_files = []
-        for company_dir in COMPANIES_DIR.iterdir():
-            if company_dir.is_dir():
-                company_name = company_dir.name
-                for file_path in company_dir.iterdir():
-                    if file_path.is_file():
-                        all_files.append({
-                            "name": file_path.name,
-                            "size": file_path.stat().st_size,
-                            "extension": file_path.suffix,
-                            "company": company_name,
-                            "full_path": f"{company_name}/{file_path.name}"
-                        })
+        etag = await io_pool.run(company_files.companies_etag)
+        if not_modified(request, etag):
+            return Response(status_code=304, headers=listing_headers(etag))
         
-        return {"files": all_files, "count": len(all_files)}
+        all_files, next_cursor = company_files.list_direct_files(query)
+        return JSONResponse(
+            {"files": all_files, "count": len(all_files), "next_cursor": next_cursor},
+            headers=listing_headers(etag)
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Firma dosyaları listeleme hatası: {str(e)}")
 
@@ -120,8 +137,9 @@ async def delete_company(company_name: str):
         raise HTTPException(status_code=404, detail="Firma bulunamadı")
     
     try:
-        import shutil
-        shutil.rmtree(company_dir)
+        await io_pool.run(shutil.rmtree, company_dir)
+        search_index.notify_removed_tree(company_dir)
+        company_files.notify_company_removed(company_name)
         return {
             "message": "Firma başarıyla silindi",
             "company": company_name
@@ -130,5 +148,41 @@ async def delete_company(company_name: str):
         raise HTTPException(status_code=500, detail=f"Firma silme hatası: {str(e)}")
 
 
+def listing_headers(etag: str) -> Dict[str, str]:
+    # Tarayıcı listeyi saklar ama her seferinde ETag ile doğrular
+    return {"ETag": etag, "Cache-Control": "no-cache"}
 
+def not_modified(request: Request, etag: str) -> bool:
+    """İstemcinin elindeki liste güncel mi (If-None-Match)"""
+    if_none_match = request.headers.get("if-none-match", "")
+    return etag in if_none_match or if_none_match.strip() == "*"
 
+def listing_query(sort: str, order: str, limit: Optional[int], cursor: Optional[str],
+                  extension: Optional[str], subfolder: Optional[str], name_prefix: Optional[str],
+                  modified_from: Optional[datetime], modified_to: Optional[datetime]) -> ListingQuery:
+    """Liste sorgu parametrelerini doğrula"""
+    if sort not in SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Geçersiz sıralama: {sort} ({', '.join(SORT_FIELDS)})")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="Geçersiz sıralama yönü (asc, desc)")
+    if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit 1 ile {MAX_PAGE_SIZE} arasında olmalı")
+    
+    extensions = None
+    if extension:
+        extensions = frozenset(
+            ext if ext.startswith('.') else f".{ext}"
+            for ext in (part.strip().lower() for part in extension.split(',')) if ext
+        )
+    
+    return ListingQuery(
+        sort=sort,
+        order=order,
+        limit=limit,
+        cursor=cursor,
+        extensions=extensions,
+        subfolder=subfolder,
+        name_prefix=name_prefix.lower() if name_prefix else None,
+        modified_from=modified_from.timestamp() if modified_from else None,
+        modified_to=modified_to.timestamp() if modified_to else None
+    )
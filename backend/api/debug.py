@@ -2,15 +2,13 @@
 Debug endpoints - Sorun giderme için
 """
 
-from fastapi import APIRouter
-from license_manager import LicenseManager
+from fastapi import APIRouter, Depends
+from license_manager import LicenseManager, get_license_manager
 import platform
 import subprocess
 
 router = APIRouter()
 
-license_manager = LicenseManager()
-
 
 @router.get("/debug/system-info")
 async def get_system_info():
@@ -27,14 +25,15 @@ async def get_system_info():
 
 
 @router.get("/debug/hwid-details")
-async def get_hwid_details():
+async def get_hwid_details(license_manager: LicenseManager = Depends(get_license_manager)):
     """HWID üretim detaylarını döndür"""
     try:
         hwid = license_manager.get_hwid()
         return {
             "success": True,
             "hwid": hwid,
-            "hwid_short": hwid[:16] + "..." if hwid else None
+            "hwid_short": hwid[:16] + "..." if hwid else None,
+            "probes": license_manager.hwid_provider.last_report
         }
     except Exception as e:
         import traceback
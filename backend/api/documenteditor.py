@@ -0,0 +1,63 @@
+"""
+Document Editor API - Syncfusion DocumentEditor servis endpoint'leri
+Editörün serviceUrl'i buraya bakar; içe aktarma (docx -> SFDT) ve panodan
+yapıştırma dönüşümleri internete çıkmadan yerelde yapılır.
+"""
+
+from fastapi import APIRouter, HTTPException, Request, UploadFile, File
+from pathlib import Path
+from typing import Any, Dict
+from document_cache import document_cache
+from docx_sfdt import clipboard_to_sfdt, docx_to_sfdt
+from json_response import json_response
+from workers import document_pool, io_pool
+
+router = APIRouter()
+
+
+def import_docx(data: bytes) -> Dict[str, Any]:
+    """Gönderilen docx baytlarını SFDT'ye çevir (aynı içerik önbellekten döner)"""
+    key = document_cache.content_key(data, "docx_to_sfdt")
+    cached = document_cache.get(key)
+    if cached is not None:
+        return cached
+
+    sfdt = document_pool.call(docx_to_sfdt, data)
+    document_cache.put(key, sfdt)
+    return sfdt
+
+
+@router.post("/documenteditor/Import")
+async def import_document(request: Request, files: UploadFile = File(...)):
+    """
+    Editörün "Aç" komutu: Word dosyasını SFDT'ye çevir
+    """
+    if Path(files.filename or "").suffix.lower() != ".docx":
+        raise HTTPException(status_code=400, detail="Sadece .docx dosyaları içe aktarılabilir")
+
+    try:
+        data = await files.read()
+        sfdt = await io_pool.run(import_docx, data)
+        return await io_pool.run(json_response, request, sfdt)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Dosya dönüştürme hatası: {str(e)}")
+    finally:
+        await files.close()
+
+
+@router.post("/documenteditor/SystemClipboard")
+async def system_clipboard(data: Dict[str, Any]):
+    """
+    Panodan yapıştırılan HTML/RTF içeriğini SFDT'ye çevir
+    Body: {"content": "...", "type": ".html" | ".rtf"}
+    """
+    content = data.get("content")
+    if not isinstance(content, str):
+        raise HTTPException(status_code=400, detail="Eksik parametre")
+
+    try:
+        return await io_pool.run(clipboard_to_sfdt, content, str(data.get("type") or ""))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Yapıştırma dönüştürme hatası: {str(e)}")
@@ -1,14 +1,33 @@
-from fastapi import APIRouter, HTTPException, UploadFile, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, UploadFile, Form, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator, Callable
+from urllib.parse import quote
+import asyncio
+import collections
 import openpyxl
+from openpyxl.cell.cell import Cell
+from openpyxl.reader.excel import ExcelReader
 from docx import Document
 import json
+import mimetypes
 import shutil
 import os
 import zipfile
-import xml.etree.ElementTree as ET
+from document_cache import document_cache
+from workers import PoolBusyError, document_pool, io_pool
+from search_index import search_index
+from xlsx_text import xlsx_contains
+from docx_text import docx_contains, read_docx
+from docx_patch import DocxPatchUnsupported, patch_docx
+from xlsx_package import XlsxPackage
+from xlsx_patch import XlsxPatchUnsupported, patch_xlsx
+from docx_sfdt import docx_to_sfdt
+from media_store import media_store
+from file_index import company_files
+from raw_file import raw_file_response
+from json_response import cached_json_response
+from fs_walk import walk
 
 router = APIRouter()
 
@@ -17,7 +36,7 @@ COMPANIES_DIR = Path("firmalar")
 COMPANIES_DIR.mkdir(exist_ok=True)
 
 @router.get("/file/{filename}")
-async def get_file(filename: str):
+async def get_file(filename: str, request: Request):
     """
     Şablon dosyasını oku (parse edilmiş JSON formatında)
     """
@@ -27,35 +46,92 @@ async def get_file(filename: str):
         raise HTTPException(status_code=404, detail="Dosya bulunamadı")
     
     try:
-        extension = file_path.suffix.lower()
-        
-        if extension in ['.xlsx', '.xls']:
-            return read_excel(file_path)
-        elif extension in ['.docx', '.doc']:
-            return read_word(file_path)
-        else:
-            raise HTTPException(status_code=400, detail="Desteklenmeyen dosya formatı")
+        return await document_response(request, file_path, lambda document: with_media_base(document, request))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Dosya okuma hatası: {str(e)}")
+
+@router.get("/file/{filename}/media/{media_id}")
+async def get_file_media(filename: str, media_id: str, request: Request):
+    """
+    Şablon dosyasındaki resmi döndür (kimlik içerik özetidir, yanıt değişmez)
+    """
+    return media_response(media_id, request)
+
+@router.get("/file/{filename}/manifest")
+async def get_file_manifest(filename: str, request: Request):
+    """
+    Şablon Excel dosyasının özeti: sayfalar, boyutlar, birleştirilmiş hücreler,
+    sütun genişlikleri ve stil tablosu (hücreler /cells ile parça parça alınır)
+    """
+    file_path = TEMPLATE_DIR / filename
+    
+    if not file_path.exists():
+        raise HTTPException(status_code=404, detail="Dosya bulunamadı")
+    
+    try:
+        return await document_response(
+            request, file_path, lambda document: document_manifest(document, file_url(request, "/manifest"))
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Dosya okuma hatası: {str(e)}")
+
+@router.get("/file/{filename}/cells")
+async def get_file_cells(filename: str, sheet: str, request: Request, row_start: int = 1, row_end: Optional[int] = None,
+                         col_start: int = 1, col_end: Optional[int] = None):
+    """
+    Şablon Excel dosyasından hücre bloğu oku (satır/sütun aralıkları 1 tabanlı, dahil)
+    """
+    file_path = TEMPLATE_DIR / filename
+    
+    if not file_path.exists():
+        raise HTTPException(status_code=404, detail="Dosya bulunamadı")
+    
+    try:
+        return await document_response(
+            request, file_path, lambda document: cell_block(document, sheet, row_start, row_end, col_start, col_end)
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Dosya okuma hatası: {str(e)}")
 
 @router.get("/file/{filename}/raw")
-async def get_file_raw(filename: str):
+async def get_file_raw(filename: str, request: Request):
     """
     Şablon dosyasını ham haliyle (raw) döndür - Syncfusion için
+    ETag/Last-Modified ile doğrulanır (değişmediyse 304), Range desteklenir.
     """
     file_path = TEMPLATE_DIR / filename
     
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="Dosya bulunamadı")
     
-    return FileResponse(
-        path=file_path,
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        filename=filename
-    )
+    return raw_file_response(file_path, request, filename)
+
+@router.get("/file/{filename}/sfdt")
+async def get_file_sfdt(filename: str, request: Request):
+    """
+    Şablon Word dosyasını Syncfusion editörünün formatında (SFDT) döndür
+    Dönüşüm yerelde yapılır ve dosya sürümü başına önbelleğe alınır.
+    """
+    file_path = TEMPLATE_DIR / filename
+    
+    if not file_path.exists():
+        raise HTTPException(status_code=404, detail="Dosya bulunamadı")
+    
+    try:
+        return await document_response(request, file_path, lambda document: document, loader=load_sfdt)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Dosya dönüştürme hatası: {str(e)}")
 
 @router.get("/companies/{company_name}/file/{filename}")
-async def get_company_file(company_name: str, filename: str):
+async def get_company_file(company_name: str, filename: str, request: Request, path: Optional[str] = None):
     """
     Firma dosyasını oku (parse edilmiş JSON formatında, alt klasörler dahil)
     """
@@ -64,53 +140,117 @@ async def get_company_file(company_name: str, filename: str):
     if not company_dir.exists():
         raise HTTPException(status_code=404, detail="Firma bulunamadı")
     
-    # Dosyayı firma klasöründe veya alt klasörlerde ara
-    file_path = None
-    for found_path in company_dir.rglob(filename):
-        if found_path.is_file() and found_path.name == filename:
-            file_path = found_path
-            break
+    # Dosyayı firma klasöründe veya alt klasörlerde bul (aynı isimde birden fazla varsa path gerekir)
+    file_path = await io_pool.run(find_company_file, company_name, filename, path)
     
-    if not file_path or not file_path.exists():
+    if not file_path:
         raise HTTPException(status_code=404, detail="Dosya bulunamadı")
     
     try:
-        extension = file_path.suffix.lower()
-        
-        if extension in ['.xlsx', '.xls']:
-            return read_excel(file_path)
-        elif extension in ['.docx', '.doc']:
-            return read_word(file_path)
-        else:
-            raise HTTPException(status_code=400, detail="Desteklenmeyen dosya formatı")
+        return await document_response(request, file_path, lambda document: with_media_base(document, request))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Dosya okuma hatası: {str(e)}")
+
+@router.get("/companies/{company_name}/file/{filename}/media/{media_id}")
+async def get_company_file_media(company_name: str, filename: str, media_id: str, request: Request):
+    """
+    Firma dosyasındaki resmi döndür (kimlik içerik özetidir, yanıt değişmez)
+    """
+    return media_response(media_id, request)
+
+@router.get("/companies/{company_name}/file/{filename}/manifest")
+async def get_company_file_manifest(company_name: str, filename: str, request: Request, path: Optional[str] = None):
+    """
+    Firma Excel dosyasının özeti (hücreler /cells ile parça parça alınır)
+    """
+    company_dir = COMPANIES_DIR / company_name
+    
+    if not company_dir.exists():
+        raise HTTPException(status_code=404, detail="Firma bulunamadı")
+    
+    file_path = await io_pool.run(find_company_file, company_name, filename, path)
+    
+    if not file_path:
+        raise HTTPException(status_code=404, detail="Dosya bulunamadı")
+    
+    try:
+        query = f"path={quote(path)}" if path else ""
+        return await document_response(
+            request, file_path, lambda document: document_manifest(document, file_url(request, "/manifest"), query)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Dosya okuma hatası: {str(e)}")
+
+@router.get("/companies/{company_name}/file/{filename}/cells")
+async def get_company_file_cells(company_name: str, filename: str, sheet: str, request: Request,
+                                 row_start: int = 1, row_end: Optional[int] = None,
+                                 col_start: int = 1, col_end: Optional[int] = None, path: Optional[str] = None):
+    """
+    Firma Excel dosyasından hücre bloğu oku (satır/sütun aralıkları 1 tabanlı, dahil)
+    """
+    company_dir = COMPANIES_DIR / company_name
+    
+    if not company_dir.exists():
+        raise HTTPException(status_code=404, detail="Firma bulunamadı")
+    
+    file_path = await io_pool.run(find_company_file, company_name, filename, path)
+    
+    if not file_path:
+        raise HTTPException(status_code=404, detail="Dosya bulunamadı")
+    
+    try:
+        return await document_response(
+            request, file_path, lambda document: cell_block(document, sheet, row_start, row_end, col_start, col_end)
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Dosya okuma hatası: {str(e)}")
 
 @router.get("/companies/{company_name}/file/{filename}/raw")
-async def get_company_file_raw(company_name: str, filename: str):
+async def get_company_file_raw(company_name: str, filename: str, request: Request, path: Optional[str] = None):
     """
     Firma dosyasını ham haliyle (raw) döndür - Syncfusion için (alt klasörler dahil)
+    ETag/Last-Modified ile doğrulanır (değişmediyse 304), Range desteklenir.
     """
     company_dir = COMPANIES_DIR / company_name
     
     if not company_dir.exists():
         raise HTTPException(status_code=404, detail="Firma bulunamadı")
     
-    # Dosyayı firma klasöründe veya alt klasörlerde ara
-    file_path = None
-    for found_path in company_dir.rglob(filename):
-        if found_path.is_file() and found_path.name == filename:
-            file_path = found_path
-            break
+    # Dosyayı firma klasöründe veya alt klasörlerde bul (aynı isimde birden fazla varsa path gerekir)
+    file_path = await io_pool.run(find_company_file, company_name, filename, path)
     
-    if not file_path or not file_path.exists():
+    if not file_path:
         raise HTTPException(status_code=404, detail="Dosya bulunamadı")
     
-    return FileResponse(
-        path=file_path,
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        filename=filename
-    )
+    return raw_file_response(file_path, request, filename)
+
+@router.get("/companies/{company_name}/file/{filename}/sfdt")
+async def get_company_file_sfdt(company_name: str, filename: str, request: Request, path: Optional[str] = None):
+    """
+    Firma Word dosyasını SFDT formatında döndür (alt klasörler dahil)
+    """
+    company_dir = COMPANIES_DIR / company_name
+    
+    if not company_dir.exists():
+        raise HTTPException(status_code=404, detail="Firma bulunamadı")
+    
+    file_path = await io_pool.run(find_company_file, company_name, filename, path)
+    
+    if not file_path:
+        raise HTTPException(status_code=404, detail="Dosya bulunamadı")
+    
+    try:
+        return await document_response(request, file_path, lambda document: document, loader=load_sfdt)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Dosya dönüştürme hatası: {str(e)}")
 
 @router.delete("/file/{filename}")
 async def delete_file(filename: str):
@@ -123,7 +263,7 @@ async def delete_file(filename: str):
         raise HTTPException(status_code=404, detail="Dosya bulunamadı")
     
     try:
-        os.remove(file_path)
+        await io_pool.run(os.remove, file_path)
         return {
             "message": "Dosya başarıyla silindi",
             "filename": filename
@@ -132,7 +272,7 @@ async def delete_file(filename: str):
         raise HTTPException(status_code=500, detail=f"Dosya silme hatası: {str(e)}")
 
 @router.delete("/companies/{company_name}/file/{filename}")
-async def delete_company_file(company_name: str, filename: str):
+async def delete_company_file(company_name: str, filename: str, path: Optional[str] = None):
     """
     Firma dosyasını sil (alt klasörler dahil)
     """
@@ -141,18 +281,16 @@ async def delete_company_file(company_name: str, filename: str):
     if not company_dir.exists():
         raise HTTPException(status_code=404, detail="Firma bulunamadı")
     
-    # Dosyayı firma klasöründe veya alt klasörlerde ara
-    file_path = None
-    for found_path in company_dir.rglob(filename):
-        if found_path.is_file() and found_path.name == filename:
-            file_path = found_path
-            break
+    # Dosyayı firma klasöründe veya alt klasörlerde bul (aynı isimde birden fazla varsa path gerekir)
+    file_path = await io_pool.run(find_company_file, company_name, filename, path)
     
-    if not file_path or not file_path.exists():
+    if not file_path:
         raise HTTPException(status_code=404, detail="Dosya bulunamadı")
     
     try:
-        os.remove(file_path)
+        await io_pool.run(os.remove, file_path)
+        search_index.notify_removed(file_path)
+        company_files.notify_removed(file_path)
         return {
             "message": "Dosya başarıyla silindi",
             "company": company_name,
@@ -182,7 +320,7 @@ async def rename_file(old_name: str, new_name: str):
         raise HTTPException(status_code=400, detail="Bu isimde bir dosya zaten mevcut")
     
     try:
-        os.rename(old_path, new_path)
+        await io_pool.run(os.rename, old_path, new_path)
         return {
             "message": "Dosya başarıyla adlandırıldı",
             "old_name": old_name,
@@ -192,7 +330,7 @@ async def rename_file(old_name: str, new_name: str):
         raise HTTPException(status_code=500, detail=f"Dosya adlandırma hatası: {str(e)}")
 
 @router.patch("/companies/{company_name}/file/rename")
-async def rename_company_file(company_name: str, old_name: str, new_name: str):
+async def rename_company_file(company_name: str, old_name: str, new_name: str, path: Optional[str] = None):
     """
     Firma dosyasının adını değiştir (alt klasörler dahil)
     """
@@ -201,14 +339,10 @@ async def rename_company_file(company_name: str, old_name: str, new_name: str):
     if not company_dir.exists():
         raise HTTPException(status_code=404, detail="Firma bulunamadı")
     
-    # Dosyayı firma klasöründe veya alt klasörlerde ara
-    old_path = None
-    for found_path in company_dir.rglob(old_name):
-        if found_path.is_file() and found_path.name == old_name:
-            old_path = found_path
-            break
+    # Dosyayı firma klasöründe veya alt klasörlerde bul (aynı isimde birden fazla varsa path gerekir)
+    old_path = await io_pool.run(find_company_file, company_name, old_name, path)
     
-    if not old_path or not old_path.exists():
+    if not old_path:
         raise HTTPException(status_code=404, detail="Dosya bulunamadı")
     
     # Yeni dosya adı için uzantıyı koru veya kontrol et
@@ -222,7 +356,9 @@ async def rename_company_file(company_name: str, old_name: str, new_name: str):
         raise HTTPException(status_code=400, detail="Bu isimde bir dosya zaten mevcut")
     
     try:
-        os.rename(old_path, new_path)
+        await io_pool.run(os.rename, old_path, new_path)
+        search_index.notify_renamed(old_path, new_path)
+        company_files.notify_renamed(old_path, new_path)
         return {
             "message": "Dosya başarıyla adlandırıldı",
             "company": company_name,
@@ -258,15 +394,16 @@ async def save_word_file_upload(file: UploadFile, company: str = Form(...)):
     
     try:
         # Dosyayı kaydet
-        with open(target_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        size = await io_pool.run(write_upload, file.file, target_path)
+        search_index.notify_changed(target_path)
+        company_files.notify_changed(target_path)
         
         return {
             "message": "Dosya başarıyla kaydedildi",
             "path": str(target_path),
             "company": company,
             "filename": new_filename,
-            "size": os.path.getsize(target_path)
+            "size": size
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Dosya kaydetme hatası: {str(e)}")
@@ -274,77 +411,315 @@ async def save_word_file_upload(file: UploadFile, company: str = Form(...)):
         file.file.close()
 
 
+def find_company_file(company_name: str, filename: str, rel_path: Optional[str] = None) -> Optional[Path]:
+    """
+    Firma klasöründe (alt klasörler dahil) dosyayı ada göre bul (bellekteki indeksten)
+
+    rel_path: Firma klasörüne göreli yol (örn. "SM-128/BAYKAR_F.02.xlsx")
+    """
+    return company_files.find(company_name, filename, rel_path)
+
+def write_upload(source, target_path: Path) -> int:
+    """Yüklenen dosya akışını hedefe yaz, yazılan boyutu döndür"""
+    with open(target_path, "wb") as buffer:
+        shutil.copyfileobj(source, buffer)
+    return os.path.getsize(target_path)
+
+def load_document(file_path: Path) -> Dict[str, Any]:
+    """
+    Dokümanı uzantısına göre parse et
+    Sonuç önbellekten döner; önbellekte yoksa parse işlemi doküman havuzunda çalışır.
+    """
+    extension = file_path.suffix.lower()
+    
+    if extension in ['.xlsx', '.xls']:
+        parser = read_excel
+    elif extension in ['.docx', '.doc']:
+        parser = read_word
+    else:
+        raise HTTPException(status_code=400, detail="Desteklenmeyen dosya formatı")
+    
+    return document_cache.get_or_parse(
+        file_path,
+        lambda path: document_pool.call(parser, path),
+        kind=parser.__name__
+    )
+
+def load_sfdt(file_path: Path) -> Dict[str, Any]:
+    """
+    Word dokümanının SFDT hali (önbellekten; yoksa doküman havuzunda dönüştürülür)
+    """
+    if file_path.suffix.lower() != '.docx':
+        raise HTTPException(status_code=400, detail="Sadece .docx dosyaları editörde açılabilir")
+    
+    return document_cache.get_or_parse(
+        file_path,
+        lambda path: document_pool.call(docx_to_sfdt, path),
+        kind="docx_to_sfdt"
+    )
+
+# Yüklenen dosyanın kapsayıcısında bulunması gereken ana parça
+OOXML_MAIN_PARTS = {'.xlsx': 'xl/workbook.xml', '.docx': 'word/document.xml'}
+OLE_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+def validate_document(file_path: Path, filename: str) -> Optional[str]:
+    """
+    Dosya içeriği uzantısıyla uyumlu mu (uyumsuzsa hata mesajı, değilse None)
+    İçerik parse edilmez; sadece kapsayıcı (zip / OLE) ve ana parça kontrol edilir.
+    """
+    extension = Path(filename).suffix.lower()
+    try:
+        if extension in OOXML_MAIN_PARTS:
+            with zipfile.ZipFile(file_path) as z:
+                z.getinfo(OOXML_MAIN_PARTS[extension])
+        elif extension in ['.xls', '.doc']:
+            with open(file_path, "rb") as f:
+                if f.read(len(OLE_SIGNATURE)) != OLE_SIGNATURE:
+                    raise ValueError("OLE imzası yok")
+    except (zipfile.BadZipFile, KeyError, ValueError, OSError):
+        return f"Dosya içeriği {extension} formatında değil veya bozuk"
+    return None
+
+def prepare_document(file_path: Path) -> bool:
+    """
+    Yeni gelen dokümanı önceden işle: parse (resimler medya deposuna), Word için
+    editörün SFDT hali (şablonlar arama indeksine girmediği için metin çıkarılmaz)
+    Sonuçlar önbelleğe yazılır; ilk açılış sonraki açılışlar kadar hızlı olur.
+    Eski formatlar (.xls, .doc) parse edilemediği için atlanır (False).
+    Hatalar çağırana (ingest_uploads) bırakılır.
+    """
+    if file_path.suffix.lower() not in OOXML_MAIN_PARTS:
+        return False
+    load_document(file_path)
+    if file_path.suffix.lower() == '.docx':
+        load_sfdt(file_path)
+    return True
+
+async def document_response(request: Request, file_path: Path,
+                            build: Callable[[Dict[str, Any]], Any],
+                            loader: Callable[[Path], Dict[str, Any]] = load_document) -> Response:
+    """
+    Parse edilmiş dokümandan üretilen JSON yanıtı (orjson + sıkıştırma)
+
+    Sıkıştırılmış gövde dosya sürümüne bağlı olarak parse önbelleğinin yanında
+    saklanır; önbellekte varsa doküman hiç yüklenmez.
+
+    Args:
+        build: Dokümandan yanıt içeriğini üreten fonksiyon (örn. manifest, hücre bloğu)
+        loader: load_document veya load_sfdt
+    """
+    # Anahtar yüklemeden önce alınır: dosya arada değişirse eski sürüm anahtarına yazılır
+    cache_key = await io_pool.run(document_cache.cache_key, file_path, "response")
+    
+    async def produce():
+        document = await io_pool.run(loader, file_path)
+        return build(document)
+    
+    return await cached_json_response(request, cache_key, produce)
+
+def file_url(request: Request, suffix: str = "") -> str:
+    """İstek yolundan dosyanın API adresini çıkar (örn. .../file/F.02.xlsx/manifest -> .../file/F.02.xlsx)"""
+    path = request.url.path.rstrip('/')
+    if suffix and path.endswith(suffix):
+        path = path[:-len(suffix)]
+    return quote(path)
+
+def with_media_base(document: Dict[str, Any], request: Request) -> Dict[str, Any]:
+    """
+    Excel JSON'una resimlerin indirileceği adresi ekle (resimler sadece kimlikle taşınır)
+
+    Önbellekteki sözlük paylaşıldığı için değiştirilmez, yüzeysel kopya döner.
+    """
+    if document.get("type") != "excel":
+        return document
+    return {**document, "media_base": file_url(request) + "/media"}
+
+def document_manifest(document: Dict[str, Any], base_url: str, query: str = "") -> Dict[str, Any]:
+    """
+    Excel JSON'undan hücre satırları hariç her şeyi döndür
+
+    query: Dosyayı tanımlayan sorgu parametreleri (örn. path=...), cells_url'e eklenir
+    """
+    if document.get("type") != "excel":
+        raise HTTPException(status_code=400, detail="Özet sadece Excel dosyaları için alınabilir")
+    
+    return {
+        **document,
+        "sheets": {
+            sheet_name: {
+                **{key: value for key, value in sheet.items() if key != "rows"},
+                "row_count": len(sheet["rows"])
+            }
+            for sheet_name, sheet in document["sheets"].items()
+        },
+        "lazy": True,
+        "media_base": base_url + "/media",
+        "cells_url": base_url + "/cells" + (f"?{query}" if query else "")
+    }
+
+def cell_block(document: Dict[str, Any], sheet_name: str, row_start: int = 1, row_end: Optional[int] = None,
+               col_start: int = 1, col_end: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Sayfanın kompakt satırlarından bir blok döndür
+
+    Aralıklar sayfa boyutlarına kırpılır; satırların sonundaki varsayılan
+    hücreler yine gönderilmez (istemci col_end'e kadar tamamlar).
+    """
+    if document.get("type") != "excel":
+        raise HTTPException(status_code=400, detail="Hücre blokları sadece Excel dosyaları için alınabilir")
+    
+    sheet = document["sheets"].get(sheet_name)
+    if sheet is None:
+        raise HTTPException(status_code=404, detail="Sayfa bulunamadı")
+    
+    rows = sheet["rows"]
+    row_start = max(row_start, 1)
+    row_end = min(row_end or len(rows), len(rows))
+    col_start = max(col_start, 1)
+    col_end = min(col_end or sheet["max_column"], sheet["max_column"])
+    
+    block = [row[col_start - 1:col_end] for row in rows[row_start - 1:row_end]]
+    
+    return {
+        "sheet": sheet_name,
+        "row_start": row_start,
+        "row_end": max(row_end, row_start - 1),
+        "col_start": col_start,
+        "col_end": col_end,
+        "rows": block
+    }
+
+def media_response(media_id: str, request: Request) -> Response:
+    """İçerik adresli resmi uzun süreli önbellek başlıklarıyla döndür"""
+    media_path = media_store.path(media_id)
+    if media_path is None:
+        raise HTTPException(status_code=404, detail="Resim bulunamadı")
+    
+    # Kimlik içeriğin özeti olduğu için ETag olarak doğrudan kullanılabilir
+    headers = {
+        "ETag": f'"{media_store.digest(media_id)}"',
+        "Cache-Control": "public, max-age=31536000, immutable"
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    if headers["ETag"] in if_none_match or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    
+    media_type = mimetypes.guess_type(media_path.name)[0] or "application/octet-stream"
+    return FileResponse(path=media_path, media_type=media_type, headers=headers)
+
+def cell_style_dict(cell) -> Dict[str, Any]:
+    """Hücrenin font, dolgu, hizalama ve kenarlık bilgileri"""
+    style = {}
+    
+    # Font stilleri
+    if cell.font:
+        style["font"] = {
+            "bold": cell.font.bold or False,
+            "italic": cell.font.italic or False,
+            "size": cell.font.size or 11,
+            "color": cell.font.color.rgb if cell.font.color and hasattr(cell.font.color, 'rgb') else None,
+            "name": cell.font.name or "Calibri"
+        }
+    
+    # Arka plan rengi
+    if cell.fill and cell.fill.start_color:
+        if hasattr(cell.fill.start_color, 'rgb'):
+            style["fill"] = cell.fill.start_color.rgb
+    
+    # Hizalama
+    if cell.alignment:
+        style["alignment"] = {
+            "horizontal": cell.alignment.horizontal or "left",
+            "vertical": cell.alignment.vertical or "top",
+            "wrap_text": cell.alignment.wrap_text or False
+        }
+    
+    # Kenarlıklar
+    if cell.border:
+        style["border"] = {
+            "top": bool(cell.border.top and cell.border.top.style),
+            "bottom": bool(cell.border.bottom and cell.border.bottom.style),
+            "left": bool(cell.border.left and cell.border.left.style),
+            "right": bool(cell.border.right and cell.border.right.style)
+        }
+    
+    return style
+
+class StyleTable:
+    """
+    Çalışma kitabının tekrarsız stil tablosu
+
+    Aynı içerikli stiller tek kayıt olarak tutulur; hücreler tablodaki
+    sıra numarasını taşır. default_id biçimlendirilmemiş hücrenin stilidir.
+    """
+
+    def __init__(self, wb):
+        self.table: List[Dict[str, Any]] = []
+        self._ids: Dict[str, int] = {}
+        self.default_id = self.intern(Cell(wb.worksheets[0]))
+
+    def intern(self, cell) -> int:
+        style = cell_style_dict(cell)
+        key = json.dumps(style, sort_keys=True, default=str)
+        style_id = self._ids.get(key)
+        if style_id is None:
+            style_id = self._ids[key] = len(self.table)
+            self.table.append(style)
+        return style_id
+
 def read_excel(file_path: Path) -> Dict[str, Any]:
     """Excel dosyasını oku ve tüm format bilgileriyle JSON formatına çevir"""
-    import base64
-    from io import BytesIO
+    # Zip bir kez açılır: openpyxl'in arşivi üzerinden önce paket ilişkileri ve
+    # hücre içi resimler okunur, sonra workbook yüklenir (read() arşivi kapatır)
+    reader = ExcelReader(file_path)
+    deep_images = {}
+    try:
+        deep_images = XlsxPackage(reader.archive, reader.valid_files).in_cell_images(media_store)
+    except Exception as e:
+        print(f"Deep parse hatası: {str(e)}")
+    reader.read()
+    wb = reader.wb
     
-    wb = openpyxl.load_workbook(file_path)
+    # Çalışma kitabı genelinde stil tablosu (hücreler stil id'si taşır)
+    styles = StyleTable(wb)
+    style_ids: Dict[Tuple[int, int, int, int], int] = {}
     
     sheets_data = {}
     for sheet_name in wb.sheetnames:
         ws = wb[sheet_name]
         
-        # Sheet'teki tüm verileri ve stilleri al
-        data = []
+        # Sheet'teki tüm verileri al - koordinat satır/sütun sırasından çıkarılır,
+        # stiller stil tablosuna referansla yazılır
+        rows = []
         for row in ws.iter_rows():
             row_data = []
             for cell in row:
                 # Hücre değeri
                 value = cell.value if cell.value is not None else ""
                 
-                # Hücre stilleri
-                cell_style = {
-                    "value": str(value),
-                    "coordinate": cell.coordinate,
-                }
+                # openpyxl stil indeksleri aynıysa stil sözlüğü de aynıdır
+                cell_style = cell._style
+                if cell_style is None:
+                    style_key = (0, 0, 0, 0)
+                else:
+                    style_key = (cell_style.fontId, cell_style.fillId, cell_style.alignmentId, cell_style.borderId)
+                style_id = style_ids.get(style_key)
+                if style_id is None:
+                    style_id = style_ids[style_key] = styles.intern(cell)
                 
                 # Formül varsa ekle (data_type 'f' ise formül hücresidir)
                 if cell.data_type == 'f':
-                    cell_style["formula"] = cell.value if isinstance(cell.value, str) and cell.value.startswith('=') else f"={cell.value}"
-                    # Hesaplanmış değeri de sakla (eğer varsa)
-                    try:
-                        # Formülün hesaplanmış değerini al
-                        calculated_value = ws.cell(cell.row, cell.column).value
-                        if calculated_value is not None:
-                            cell_style["value"] = str(calculated_value)
-                    except:
-                        pass
-                
-                # Font stilleri
-                if cell.font:
-                    cell_style["font"] = {
-                        "bold": cell.font.bold or False,
-                        "italic": cell.font.italic or False,
-                        "size": cell.font.size or 11,
-                        "color": cell.font.color.rgb if cell.font.color and hasattr(cell.font.color, 'rgb') else None,
-                        "name": cell.font.name or "Calibri"
-                    }
-                
-                # Arka plan rengi
-                if cell.fill and cell.fill.start_color:
-                    if hasattr(cell.fill.start_color, 'rgb'):
-                        cell_style["fill"] = cell.fill.start_color.rgb
-                
-                # Hizalama
-                if cell.alignment:
-                    cell_style["alignment"] = {
-                        "horizontal": cell.alignment.horizontal or "left",
-                        "vertical": cell.alignment.vertical or "top",
-                        "wrap_text": cell.alignment.wrap_text or False
-                    }
-                
-                # Kenarlıklar
-                if cell.border:
-                    cell_style["border"] = {
-                        "top": bool(cell.border.top and cell.border.top.style),
-                        "bottom": bool(cell.border.bottom and cell.border.bottom.style),
-                        "left": bool(cell.border.left and cell.border.left.style),
-                        "right": bool(cell.border.right and cell.border.right.style)
-                    }
-                
-                row_data.append(cell_style)
-            data.append(row_data)
+                    formula = cell.value if isinstance(cell.value, str) and cell.value.startswith('=') else f"={cell.value}"
+                    row_data.append([style_id, str(value), formula])
+                elif value != "":
+                    row_data.append([style_id, str(value)])
+                else:
+                    row_data.append(style_id)
+            
+            # Sondaki boş ve varsayılan stilli hücreler gönderilmez (istemci max_column'a tamamlar)
+            while row_data and row_data[-1] == styles.default_id:
+                row_data.pop()
+            rows.append(row_data)
         
         # Birleştirilmiş hücreler
         merged_cells = []
@@ -375,17 +750,13 @@ def read_excel(file_path: Path) -> Dict[str, Any]:
         # Daha önce eklenen resimlerin anchor'larını takip et (Deep Parse ile çakışmayı önlemek için)
         existing_anchors = set()
         
-        # 1. Önce Deep Parse (Hücre İçi) resimleri dene
-        try:
-            deep_images = extract_deep_images(file_path)
-            if sheet_name in deep_images:
-                print(f"Deep parse ile {sheet_name} sayfasında {len(deep_images[sheet_name])} resim bulundu.")
-                for img in deep_images[sheet_name]:
-                    images.append(img)
-                    if img.get('anchor'):
-                        existing_anchors.add(img['anchor'])
-        except Exception as e:
-            print(f"Deep parse hatası: {str(e)}")
+        # 1. Önce Deep Parse (Hücre İçi) resimleri (paket bir kez parse edildi)
+        if sheet_name in deep_images:
+            print(f"Deep parse ile {sheet_name} sayfasında {len(deep_images[sheet_name])} resim bulundu.")
+            for img in deep_images[sheet_name]:
+                images.append(img)
+                if img.get('anchor'):
+                    existing_anchors.add(img['anchor'])
 
         # 2. Standart OpenPyXL Resimleri
         if hasattr(ws, '_images') and ws._images:
@@ -394,14 +765,14 @@ def read_excel(file_path: Path) -> Dict[str, Any]:
                     # Resim verisini al
                     image_data = img._data()
                     
-                    # Base64'e çevir
-                    base64_data = base64.b64encode(image_data).decode('utf-8')
-                    
                     # Resim formatını belirle
                     image_format = 'png'  # Varsayılan
                     if hasattr(img, 'format'):
                         image_format = img.format.lower()
                     
+                    # Medya deposuna yaz - JSON'da sadece kimlik taşınır
+                    media_id = media_store.put(image_data, image_format)
+                    
                     # Anchor bilgisini al (resmin bağlı olduğu hücre)
                     # Anchor bilgisini al (resmin bağlı olduğu hücre)
                     anchor = None
@@ -447,7 +818,7 @@ def read_excel(file_path: Path) -> Dict[str, Any]:
                     
                     images.append({
                         "anchor": anchor,
-                        "data": base64_data,
+                        "media": media_id,
                         "format": image_format,
                         "width": width,
                         "height": height
@@ -457,7 +828,7 @@ def read_excel(file_path: Path) -> Dict[str, Any]:
                     continue
         
         sheets_data[sheet_name] = {
-            "data": data,
+            "rows": rows,
             "max_row": ws.max_row,
             "max_column": ws.max_column,
             "merged_cells": merged_cells,
@@ -468,74 +839,17 @@ def read_excel(file_path: Path) -> Dict[str, Any]:
     
     return {
         "type": "excel",
+        "format": "compact",
         "filename": file_path.name,
+        "styles": styles.table,
+        "default_style": styles.default_id,
         "sheets": sheets_data,
         "active_sheet": wb.active.title
     }
 
 def read_word(file_path: Path) -> Dict[str, Any]:
     """Word dosyasını oku ve JSON formatına çevir - stil bilgileriyle birlikte"""
-    doc = Document(file_path)
-    
-    # Paragrafları oku
-    paragraphs = []
-    for para in doc.paragraphs:
-        para_data = {
-            "text": para.text,
-            "style": para.style.name if para.style else "Normal"
-        }
-        
-        # Paragraph format bilgileri
-        if para.runs:
-            # İlk run'un formatını al (genelde tüm paragraph aynı formatta)
-            first_run = para.runs[0]
-            para_data["format"] = {
-                "bold": first_run.bold if first_run.bold is not None else False,
-                "italic": first_run.italic if first_run.italic is not None else False,
-                "underline": bool(first_run.underline),
-                "font_size": first_run.font.size.pt if first_run.font.size else None,
-                "font_name": first_run.font.name if first_run.font.name else None,
-                "font_color": str(first_run.font.color.rgb) if first_run.font.color and hasattr(first_run.font.color, 'rgb') else None
-            }
-            
-            # Alignment
-            if para.alignment:
-                para_data["alignment"] = str(para.alignment)
-        
-        paragraphs.append(para_data)
-    
-    # Tabloları oku
-    tables = []
-    for table in doc.tables:
-        table_data = []
-        for row in table.rows:
-            row_data = []
-            for cell in row.cells:
-                cell_data = {
-                    "text": cell.text
-                }
-                # Cell format bilgileri
-                if cell.paragraphs:
-                    first_para = cell.paragraphs[0]
-                    if first_para.runs:
-                        first_run = first_para.runs[0]
-                        cell_data["format"] = {
-                            "bold": first_run.bold if first_run.bold is not None else False,
-                            "italic": first_run.italic if first_run.italic is not None else False,
-                            "font_size": first_run.font.size.pt if first_run.font.size else None,
-                            "font_name": first_run.font.name if first_run.font.name else None,
-                            "font_color": str(first_run.font.color.rgb) if first_run.font.color and hasattr(first_run.font.color, 'rgb') else None
-                        }
-                row_data.append(cell_data)
-            table_data.append(row_data)
-        tables.append(table_data)
-    
-    return {
-        "type": "word",
-        "filename": file_path.name,
-        "paragraphs": paragraphs,
-        "tables": tables
-    }
+    return read_docx(file_path)
 
 def sanitize_folder_name(name: str) -> str:
     """
@@ -598,18 +912,32 @@ async def save_file(data: Dict[str, Any]):
         company_name = data.get("company")
         file_type = data.get("type")
         content = data.get("content")
+        # Excel için tüm içerik yerine sadece değişen hücreler gönderilebilir:
+        # {"base_company": str|None, "base_path": str|None, "cells": [{sheet, coordinate, value, formula?}],
+        #  "images": [{sheet, anchor, media|data, width, height}], "active_sheet": str}
+        patch = data.get("patch") if file_type == "excel" else None
         
-        if not all([filename, company_name, file_type, content]):
+        if not all([filename, company_name, file_type, content or patch]):
             raise HTTPException(status_code=400, detail="Eksik parametre")
         
+        base_path = None
+        if patch:
+            base_path = await io_pool.run(
+                resolve_patch_base, filename, patch.get("base_company"), patch.get("base_path")
+            )
+        
         # Firma klasörünü oluştur
         company_dir = COMPANIES_DIR / company_name
         company_dir.mkdir(exist_ok=True)
         
         # Excel ise iş emri numarasını çıkar
         work_order_no = None
-        if file_type == "excel" and "sheets" in content:
-            work_order_no = extract_work_order_number(content["sheets"])
+        if patch:
+            # Kaynak dosyanın (önbellekteki) değerleri + yama üzerinden aranır
+            sheets_data = await io_pool.run(patched_sheet_values, base_path, patch.get("cells", []))
+            work_order_no = await io_pool.run(extract_work_order_number, sheets_data)
+        elif file_type == "excel" and "sheets" in content:
+            work_order_no = await io_pool.run(extract_work_order_number, content["sheets"])
         
         # Hedef klasör yolu
         if work_order_no:
@@ -630,13 +958,18 @@ async def save_file(data: Dict[str, Any]):
         target_path = target_dir / new_filename
         
         # Dosya tipine göre kaydet
-        if file_type == "excel":
-            save_excel(target_path, content, filename)
+        if patch:
+            await document_pool.run(save_excel_patch, target_path, base_path, patch)
+        elif file_type == "excel":
+            await document_pool.run(save_excel, target_path, content, filename)
         elif file_type == "word":
-            save_word(target_path, content)
+            await document_pool.run(save_word, target_path, content, filename)
         else:
             raise HTTPException(status_code=400, detail="Desteklenmeyen dosya tipi")
         
+        search_index.notify_changed(target_path)
+        company_files.notify_changed(target_path)
+        
         return {
             "message": "Dosya başarıyla kaydedildi",
             "path": str(target_path),
@@ -644,6 +977,8 @@ async def save_file(data: Dict[str, Any]):
             "work_order_no": work_order_no,
             "filename": new_filename
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Dosya kaydetme hatası: {str(e)}")
 
@@ -684,65 +1019,16 @@ def save_excel(file_path: Path, content: Dict[str, Any], template_filename: str)
                 if "formula" in cell_data:
                     ws.cell(row=row_idx + 1, column=col_idx + 1).value = cell_data["formula"]
                 else:
-                    # Değeri al
-                    value = cell_data.get("value", "")
-                    
-                    # Sayısal değerleri korumaya çalış (int/float)
-                    if isinstance(value, str) and value.strip():
-                        # Boşlukları temizleyip sayı kontrolü yap
-                        val_str = value.strip()
-                        try:
-                            if '.' in val_str:
-                                value = float(val_str)
-                            else:
-                                value = int(val_str)
-                        except ValueError:
-                            # Sayı değilse string olarak bırak
-                            pass
+                    # Değeri al (sayısal değerler int/float olarak korunur)
+                    value = coerce_cell_value(cell_data.get("value", ""))
                     
                     # Excel hücresine yaz
                     if value != "": # Boş olmayanları yaz
                         ws.cell(row=row_idx + 1, column=col_idx + 1).value = value
         
         # Resimleri kaydet (Place in Cell olanları Place Over Cells'e dönüştürür)
-        images = sheet_data.get("images", [])
-        if images:
-            from openpyxl.drawing.image import Image
-            import io
-            import base64
-            
-            for img_data in images:
-                try:
-                    # Anchor kontrolü
-                    anchor = img_data.get("anchor")
-                    if not anchor:
-                        continue
-                        
-                    # Base64 verisini çöz
-                    b64_data = img_data.get("data")
-                    if not b64_data:
-                        continue
-                        
-                    img_bytes = base64.b64decode(b64_data)
-                    img_stream = io.BytesIO(img_bytes)
-                    
-                    # Resmi oluştur
-                    img = Image(img_stream)
-                    
-                    # Resmi hücreye yerleştir
-                    img.anchor = anchor
-                    
-                    # Boyutları ayarla (opsiyonel, orijinal boyut korunabilir)
-                    if img_data.get("width"):
-                        img.width = img_data["width"]
-                    if img_data.get("height"):
-                        img.height = img_data["height"]
-                        
-                    ws.add_image(img)
-                    
-                except Exception as e:
-                    print(f"Resim kaydetme hatası: {str(e)}")
-                    continue
+        for img_data in sheet_data.get("images", []):
+            add_sheet_image(ws, img_data)
 
     # Aktif sheet'i koru
     active_sheet = content.get("active_sheet")
@@ -751,11 +1037,186 @@ def save_excel(file_path: Path, content: Dict[str, Any], template_filename: str)
 
     wb.save(file_path)
 
-def save_word(file_path: Path, content: Dict[str, Any]):
-    """Word dosyasını kaydet - stil bilgileriyle birlikte"""
+def coerce_cell_value(value: Any) -> Any:
+    """Editörden gelen metni mümkünse sayıya çevir (int/float)"""
+    if isinstance(value, str) and value.strip():
+        # Boşlukları temizleyip sayı kontrolü yap
+        val_str = value.strip()
+        try:
+            if '.' in val_str:
+                return float(val_str)
+            return int(val_str)
+        except ValueError:
+            # Sayı değilse string olarak bırak
+            pass
+    return value
+
+def add_sheet_image(ws, img_data: Dict[str, Any]):
+    """Resmi hücreye bağlı olarak sayfaya ekle (medya kimliği veya base64 veri)"""
+    from openpyxl.drawing.image import Image
+    import io
+    import base64
+    
+    try:
+        # Anchor kontrolü
+        anchor = img_data.get("anchor")
+        if not anchor:
+            return
+            
+        # Resim verisi: medya deposundaki kimlik veya (eski format) base64
+        if img_data.get("media"):
+            img_bytes = media_store.read(img_data["media"])
+        elif img_data.get("data"):
+            img_bytes = base64.b64decode(img_data["data"])
+        else:
+            img_bytes = None
+        if not img_bytes:
+            return
+        
+        # Resmi oluştur ve hücreye yerleştir
+        img = Image(io.BytesIO(img_bytes))
+        img.anchor = anchor
+        
+        # Boyutları ayarla (opsiyonel, orijinal boyut korunabilir)
+        if img_data.get("width"):
+            img.width = img_data["width"]
+        if img_data.get("height"):
+            img.height = img_data["height"]
+            
+        ws.add_image(img)
+        
+    except Exception as e:
+        print(f"Resim kaydetme hatası: {str(e)}")
+
+def resolve_patch_base(filename: str, base_company: Optional[str], base_rel_path: Optional[str] = None) -> Path:
+    """
+    Yamanın uygulanacağı kaynak dosya: editörde açılan şablon veya firma dosyası
+    (base_rel_path: firma dosyasının firma klasörüne göreli yolu)
+    """
+    if base_company:
+        company_dir = COMPANIES_DIR / base_company
+        base_path = find_company_file(base_company, filename, base_rel_path) if company_dir.exists() else None
+        if not base_path:
+            raise HTTPException(status_code=404, detail="Kaynak firma dosyası bulunamadı")
+        return base_path
+    return TEMPLATE_DIR / filename
+
+def patched_sheet_values(base_path: Path, cells: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Kaynak dosyanın hücre değerlerine yamaları uygula
+
+    extract_work_order_number'ın beklediği {sayfa: {"data": [[{"value": ...}]]}}
+    biçiminde döner; stiller dahil edilmez.
+    """
+    from openpyxl.utils.cell import coordinate_to_tuple
+    
+    sheets = {}
+    if base_path.exists():
+        document = load_document(base_path)
+        for sheet_name, sheet in document["sheets"].items():
+            sheets[sheet_name] = {
+                "data": [[{"value": cell[1]} if isinstance(cell, list) else {} for cell in row] for row in sheet["rows"]]
+            }
+    
+    for patch in cells:
+        sheet = sheets.get(patch.get("sheet"))
+        if sheet is None:
+            continue
+        row_idx, col_idx = coordinate_to_tuple(patch["coordinate"])
+        rows = sheet["data"]
+        while len(rows) < row_idx:
+            rows.append([])
+        row = rows[row_idx - 1]
+        while len(row) < col_idx:
+            row.append({})
+        row[col_idx - 1] = {"value": patch.get("formula") or patch.get("value", "")}
+    
+    return sheets
+
+def save_excel_patch(file_path: Path, base_path: Path, patch: Dict[str, Any]):
+    """
+    Excel dosyasını yama ile kaydet.
+    Kaynak dosya (şablon veya açılan firma dosyası) kopyalanır, sadece
+    değişen hücreler ve eklenen resimler yazılır.
+
+    Resim eklenmediyse hücreler doğrudan XML seviyesinde yazılır (xlsx_patch);
+    openpyxl'in desteklemediği parçalar da korunur. Yama güvenle uygulanamazsa
+    openpyxl ile yükleyip kaydetmeye dönülür.
+    """
+    if base_path.exists() and not patch.get("images"):
+        cells = []
+        for cell_patch in patch.get("cells", []):
+            value = coerce_cell_value(cell_patch.get("value", ""))
+            cells.append({
+                "sheet": cell_patch.get("sheet"),
+                "coordinate": cell_patch.get("coordinate"),
+                "value": None if value == "" else value,
+                "formula": cell_patch.get("formula")
+            })
+        try:
+            patch_xlsx(base_path, file_path, cells, patch.get("active_sheet"))
+            return
+        except XlsxPatchUnsupported as e:
+            print(f"XML yaması uygulanamadı, openpyxl ile kaydediliyor: {e}")
+    
+    # Kaynak dosyayı hedefe kopyala (formatı ve değişmeyen hücreleri korumak için)
+    if base_path.exists():
+        if base_path.resolve() != file_path.resolve():
+            shutil.copy(base_path, file_path)
+    else:
+        # Kaynak yoksa yeni dosya oluştur
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        openpyxl.Workbook().save(file_path)
+    
+    wb = openpyxl.load_workbook(file_path)
+    
+    for cell_patch in patch.get("cells", []):
+        sheet_name = cell_patch.get("sheet")
+        coordinate = cell_patch.get("coordinate")
+        if sheet_name not in wb.sheetnames or not coordinate:
+            # Şablonda olmayan sheet'i atla
+            continue
+        
+        cell = wb[sheet_name][coordinate]
+        if cell_patch.get("formula"):
+            cell.value = cell_patch["formula"]
+        else:
+            # Boş değer hücreyi temizler
+            value = coerce_cell_value(cell_patch.get("value", ""))
+            cell.value = None if value == "" else value
+    
+    for img_data in patch.get("images", []):
+        sheet_name = img_data.get("sheet")
+        if sheet_name in wb.sheetnames:
+            add_sheet_image(wb[sheet_name], img_data)
+    
+    # Aktif sheet'i koru
+    active_sheet = patch.get("active_sheet")
+    if active_sheet and active_sheet in wb.sheetnames:
+        wb.active = wb[active_sheet]
+    
+    wb.save(file_path)
+
+def save_word(file_path: Path, content: Dict[str, Any], template_filename: str):
+    """
+    Word dosyasını kaydet - stil bilgileriyle birlikte
+
+    Şablon varsa kopyalanır ve sadece değişen paragraf/hücre metinleri XML
+    seviyesinde yazılır (docx_patch); üst/alt bilgi, resimler, bölüm ayarları ve
+    tablo stilleri korunur. Paragraf/tablo yapısı değişmişse doküman içerikten
+    yeniden oluşturulur.
+    """
     from docx.shared import Pt, RGBColor
     from docx.enum.text import WD_ALIGN_PARAGRAPH
     
+    template_path = TEMPLATE_DIR / template_filename
+    if template_path.suffix.lower() == '.docx' and template_path.exists():
+        try:
+            patch_docx(template_path, file_path, content)
+            return
+        except DocxPatchUnsupported as e:
+            print(f"XML yaması uygulanamadı, doküman yeniden oluşturuluyor: {e}")
+    
     doc = Document()
     
     # Paragrafları ekle
@@ -879,169 +1340,13 @@ def save_word(file_path: Path, content: Dict[str, Any]):
     
     doc.save(file_path)
 
-def extract_deep_images(file_path: Path) -> Dict[str, List[Dict[str, Any]]]:
-    """
-    Excel dosyasını ZIP olarak açıp "Place in Cell" (Hücre İçi) resimlerini yakalamaya çalışır.
-    Bu yöntem openpyxl'in desteklemediği Rich Value yapısını manuel parse eder.
-    """
-    import base64
-    
-    results = {}
-    
-    try:
-        if not zipfile.is_zipfile(file_path):
-            return {}
-
-        with zipfile.ZipFile(file_path, 'r') as z:
-            # 1. Sheet isimlerini ve yollarını bul (workbook.xml)
-            sheet_map = {} # { "rId1": "Sheet1" }
-            try:
-                wb_root = ET.fromstring(z.read('xl/workbook.xml'))
-                
-                # Namespace ile uğraşmamak için basit tag kontrolü
-                def clean_tag(tag):
-                    return tag.split('}')[-1] if '}' in tag else tag
-
-                for sheet in wb_root.findall(".//{*}sheet"):
-                    name = sheet.get('name')
-                    rId = sheet.get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id')
-                    if name and rId:
-                        sheet_map[rId] = name
-            except:
-                pass
-            
-            # 2. Sheet yollarını bul (_rels/workbook.xml.rels)
-            sheet_paths = {} # { "Sheet1": "xl/worksheets/sheet1.xml" }
-            try:
-                rels_root = ET.fromstring(z.read('xl/_rels/workbook.xml.rels'))
-                for rel in rels_root.findall(".//{*}Relationship"):
-                    rId = rel.get('Id')
-                    target = rel.get('Target')
-                    if rId in sheet_map:
-                        sheet_name = sheet_map[rId]
-                        # Target bazen "worksheets/sheet1.xml", bazen "/xl/worksheets..." olabilir
-                        if target.startswith('/'):
-                            path = target[1:]
-                        elif target.startswith('worksheets'):
-                            path = f"xl/{target}"
-                        else:
-                            path = f"xl/{target}"
-                        sheet_paths[sheet_name] = path
-            except:
-                pass
-            
-            # 3. Metadata haritasını çıkar (metadata.xml) -> VM index to RV index
-            # vm="1" -> richValue index X
-            metadata_map = [] 
-            try:
-                if 'xl/metadata.xml' in z.namelist():
-                    meta_root = ET.fromstring(z.read('xl/metadata.xml'))
-                    # valueMetadata bloğunu bul
-                    # Genellikle: <valueMetadata ...><bk><rc t="1" v="0"/></bk>...</valueMetadata>
-                    # rc t="1" demek Rich Value, v="0" ise rdValues.xml'deki index
-                    for bk in meta_root.findall(".//{*}valueMetadata/{*}bk"):
-                        rc = bk.find(".//{*}rc")
-                        if rc is not None and rc.get('t') == '1': # t=1 Rich Value demek
-                            metadata_map.append(int(rc.get('v')))
-                        else:
-                            metadata_map.append(None)
-            except:
-                print("Metadata okunamadi")
-
-            # 4. Rich Values -> Resim İlişkisi (rdValues.xml ve richValueRel.xml)
-            # Basitleştirme: richValueRel.xml genellikle rv indexine karşılık gelen rId'yi tutar
-            rv_to_rid = {}
-            try:
-                if 'xl/richData/richValueRel.xml' in z.namelist():
-                    # <richValueRel ...><rel r:id="rId1"/> ... </richValueRel>
-                    # Buradaki sıra rdValues.xml'deki rv sırasıyla (veya metadata v indexiyle) aynıdır
-                    rv_rel_root = ET.fromstring(z.read('xl/richData/richValueRel.xml'))
-                    for idx, rel in enumerate(rv_rel_root.findall(".//{*}rel")):
-                        rId = rel.get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id')
-                        if rId:
-                            rv_to_rid[idx] = rId
-            except:
-                pass
-            
-            # 5. rId -> Resim Dosyası Yolu (richData/_rels/richValueRel.xml.rels)
-            rid_to_path = {}
-            try:
-                rels_path = 'xl/richData/_rels/richValueRel.xml.rels'
-                if rels_path in z.namelist():
-                    rv_rels_root = ET.fromstring(z.read(rels_path))
-                    for rel in rv_rels_root.findall(".//{*}Relationship"):
-                        rId = rel.get('Id')
-                        target = rel.get('Target')
-                        if rId and target:
-                            # Target genelde "../media/image1.jpg" şeklindedir
-                            # Biz xl/richData/ konumundayız, ../ sonrası xl/media olur
-                            if target.startswith('../'):
-                                full_path = "xl" + target[2:]
-                            else:
-                                full_path = "xl/richData/" + target
-                            rid_to_path[rId] = full_path
-            except:
-                pass
-                
-            # 6. Her sheet'i tara ve resimli hücreleri bul
-            for sheet_name, xml_path in sheet_paths.items():
-                if xml_path not in z.namelist():
-                    continue
-                
-                sheet_images = []
-                try:
-                    sheet_root = ET.fromstring(z.read(xml_path))
-                    # <c r="A1" t="e" vm="1">
-                    for cell in sheet_root.findall(".//{*}c"):
-                        vm = cell.get('vm')
-                        if vm:
-                            try:
-                                vm_idx = int(vm)
-                                # vm 1-based index (genelde), metadata listesi 0-based
-                                # Ancak Excel vm indexleri bazen 1'den baslar. Deneme yanilma: genelde vm-1
-                                if vm_idx > 0 and (vm_idx - 1) < len(metadata_map):
-                                    rv_idx = metadata_map[vm_idx - 1]
-                                    
-                                    if rv_idx is not None and rv_idx in rv_to_rid:
-                                        rId = rv_to_rid[rv_idx]
-                                        
-                                        if rId in rid_to_path:
-                                            image_path = rid_to_path[rId]
-                                            
-                                            # Resmi zip'ten oku
-                                            if image_path in z.namelist():
-                                                img_data = z.read(image_path)
-                                                base64_data = base64.b64encode(img_data).decode('utf-8')
-                                                
-                                                # Dosya uzantısını bul
-                                                ext = os.path.splitext(image_path)[1][1:].lower()
-                                                if ext == 'jpeg': ext = 'jpg'
-                                                
-                                                # Anchor (A1 gibi)
-                                                anchor = cell.get('r')
-                                                
-                                                sheet_images.append({
-                                                    "anchor": anchor,
-                                                    "data": base64_data,
-                                                    "format": ext,
-                                                    "width": 100, # Varsayılan
-                                                    "height": 100,
-                                                    "type": "in_cell" # İşaretleyici
-                                                })
-                            except:
-                                continue
-                except Exception as e:
-                    print(f"Sheet parse error ({sheet_name}): {e}")
-                
-                if sheet_images:
-                    results[sheet_name] = sheet_images
-                    
-    except Exception as e:
-        print(f"Deep zip parse error: {e}")
-        import traceback
-        traceback.print_exc()
-        
-    return results
+# Paralel arama: içerik taraması firma dosyaları küçük gruplar halinde doküman
+# havuzuna dağıtılır, sonuçlar bulundukça istemciye akıtılır
+SEARCH_BATCH_SIZE = int(os.getenv("SEARCH_BATCH_SIZE", "4"))
+SEARCHABLE_EXTENSIONS = ['.xlsx', '.xls', '.docx', '.doc']
+
+# İstemci kimliği -> aktif aramanın iptal bayrağı (yeni arama eskisini iptal eder)
+active_searches: Dict[str, asyncio.Event] = {}
 
 @router.get("/search")
 async def search_files(query: str):
@@ -1052,7 +1357,6 @@ async def search_files(query: str):
         return {"results": [], "count": 0}
     
     query = query.lower().strip()
-    results = []
     
     print(f"\n[SEARCH] Arama başlatıldı: '{query}'")
     print(f"[SEARCH] Tarama dizini: {COMPANIES_DIR.absolute()}")
@@ -1062,97 +1366,182 @@ async def search_files(query: str):
             print(f"[SEARCH] HATA: {COMPANIES_DIR} dizini bulunamadı!")
             return {"results": [], "count": 0}
 
-        # Tüm firmaları ve dosyalarını tara
-        for company_dir in COMPANIES_DIR.iterdir():
-            if not company_dir.is_dir():
-                continue
-                
-            company_name = company_dir.name
-            # print(f"[SEARCH] Firma inceleniyor: {company_name}")
-            
-            # Alt klasörler dahil tüm dosyaları tara
-            for file_path in company_dir.rglob("*"):
-                if not file_path.is_file():
-                    continue
-                
-                extension = file_path.suffix.lower()
-                if extension not in ['.xlsx', '.xls', '.docx', '.doc']:
-                    continue
-                
-                # Dosya adında ara
-                match_reason = None
-                if query in file_path.name.lower():
-                    match_reason = "Dosya adı eşleşti"
-                
-                # Dosya içeriğinde ara (eğer henüz eşleşmediyse)
-                content_match = False
-                if not match_reason:
-                    if extension in ['.xlsx', '.xls']:
-                        content_match = search_in_excel(file_path, query)
-                    elif extension in ['.docx', '.doc']:
-                        content_match = search_in_word(file_path, query)
-                
-                if content_match:
-                    match_reason = "Dosya içeriği eşleşti"
-                
-                if match_reason:
-                    print(f"[SEARCH] Eşleşme bulundu: {file_path.name} ({match_reason})")
-                    # Relative path'i al (firma klasörüne göre)
-                    try:
-                        rel_path = file_path.relative_to(COMPANIES_DIR / company_name)
-                        results.append({
-                            "filename": file_path.name,
-                            "company": company_name,
-                            "path": str(rel_path).replace('\\', '/'),
-                            "reason": match_reason,
-                            "extension": extension
-                        })
-                    except Exception as e:
-                        print(f"[SEARCH] Path hatası: {e}")
+        results = [result async for result in iter_search_results(query, asyncio.Event())]
+        results.sort(key=lambda r: (r["company"], r["path"]))
         
         print(f"[SEARCH] Arama tamamlandı. {len(results)} sonuç bulundu.")
         return {"results": results, "count": len(results)}
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"[SEARCH] Genel arama hatası: {str(e)}")
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Arama sırasında hata oluştu: {str(e)}")
 
+@router.get("/search/stream")
+async def search_files_stream(query: str, client_id: Optional[str] = None):
+    """
+    Aramayı NDJSON olarak akıt - her satır bir JSON nesnesi:
+    {"type": "result", "result": {...}} sonuç bulundukça,
+    {"type": "done", "count": n, "cancelled": bool} en sonda.
+
+    Aynı client_id ile yeni bir arama başlatılırsa önceki arama iptal edilir.
+    """
+    query = (query or "").lower().strip()
+
+    cancelled = asyncio.Event()
+    if client_id:
+        previous = active_searches.get(client_id)
+        if previous is not None:
+            previous.set()
+        active_searches[client_id] = cancelled
+
+    async def stream():
+        count = 0
+        try:
+            if len(query) >= 2 and COMPANIES_DIR.exists():
+                async for result in iter_search_results(query, cancelled):
+                    count += 1
+                    yield json.dumps({"type": "result", "result": result}, ensure_ascii=False) + "\n"
+            yield json.dumps({"type": "done", "count": count, "cancelled": cancelled.is_set()}) + "\n"
+        except Exception as e:
+            print(f"[SEARCH] Akış arama hatası: {str(e)}")
+            yield json.dumps({"type": "error", "detail": f"Arama sırasında hata oluştu: {str(e)}"}, ensure_ascii=False) + "\n"
+        finally:
+            if client_id and active_searches.get(client_id) is cancelled:
+                del active_searches[client_id]
+
+    return StreamingResponse(
+        stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"}
+    )
+
+async def iter_search_results(query: str, cancelled: asyncio.Event) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Arama sonuçlarını bulundukça üret
+
+    İndeks hazırsa sonuçlar doğrudan indeksten gelir. Değilse önce dosya adı
+    eşleşmeleri hemen döner, ardından içerik taraması doküman havuzundaki
+    tüm çekirdeklere dağıtılır. cancelled set edilince bekleyen işler iptal edilir.
+    """
+    if search_index.ready:
+        # Kalıcı indeksten ara (milisaniyeler)
+        for result in await io_pool.run(search_index.search, query):
+            yield result
+        return
+
+    # İndeks henüz hazır değil - dosyaları doğrudan tara
+    candidates = await io_pool.run(list_search_candidates)
+
+    batches: List[List[Tuple[str, str]]] = []
+    for company_name, files in candidates.items():
+        content_files = []
+        for file_path in files:
+            if query in file_path.name.lower():
+                yield make_search_result(company_name, file_path, "Dosya adı eşleşti")
+            else:
+                content_files.append((company_name, str(file_path)))
+        # Her firma kendi içinde gruplara bölünür (süreçler arası iletişim maliyeti düşük kalır)
+        for i in range(0, len(content_files), SEARCH_BATCH_SIZE):
+            batches.append(content_files[i:i + SEARCH_BATCH_SIZE])
+
+    if cancelled.is_set():
+        return
+
+    queued = collections.deque(batches)
+    running: Dict[asyncio.Future, List[Tuple[str, str]]] = {}
+    cancel_waiter = asyncio.ensure_future(cancelled.wait())
+    try:
+        while queued or running:
+            # Havuz doluysa başka isteklerle paylaşmak için en fazla çekirdek sayısı kadar iş
+            while queued and len(running) < document_pool.max_workers:
+                batch = queued.popleft()
+                task = asyncio.ensure_future(
+                    document_pool.run(search_file_batch, [path for _, path in batch], query)
+                )
+                running[task] = batch
+
+            done, _ = await asyncio.wait(
+                set(running) | {cancel_waiter},
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if cancelled.is_set():
+                print(f"[SEARCH] Arama iptal edildi: '{query}'")
+                return
+
+            for task in done:
+                batch = running.pop(task)
+                try:
+                    matched = set(task.result())
+                except PoolBusyError:
+                    # Havuz başka isteklerle dolu - grubu kısa bir beklemeden sonra tekrar dene
+                    queued.append(batch)
+                    await asyncio.sleep(0.05)
+                    continue
+                except Exception as e:
+                    print(f"[SEARCH] İçerik tarama hatası: {e}")
+                    continue
+
+                for company_name, path in batch:
+                    if path in matched:
+                        yield make_search_result(company_name, Path(path), "Dosya içeriği eşleşti")
+    finally:
+        cancel_waiter.cancel()
+        for task in running:
+            task.cancel()
+
+def list_search_candidates() -> Dict[str, List[Path]]:
+    """Aranabilir tüm firma dosyalarını firmaya göre grupla"""
+    candidates: Dict[str, List[Path]] = {}
+    
+    # Alt klasörler dahil tüm dosyalar (boyut/tarih gerekmediği için stat yapılmaz)
+    for record in walk(COMPANIES_DIR, stat=False, extensions=SEARCHABLE_EXTENSIONS):
+        company_name, _, rest = record.rel.partition('/')
+        if not rest:
+            continue  # Firma klasörü dışındaki dosyalar aranmaz
+        candidates.setdefault(company_name, []).append(COMPANIES_DIR / record.rel)
+    
+    return candidates
+
+def search_file_batch(paths: List[str], query: str) -> List[str]:
+    """Dosya grubunun içeriğinde ara (doküman havuzunda çalışır), eşleşen yolları döndür"""
+    matched = []
+    for path in paths:
+        file_path = Path(path)
+        if file_path.suffix.lower() in ['.xlsx', '.xls']:
+            content_match = search_in_excel(file_path, query)
+        else:
+            content_match = search_in_word(file_path, query)
+        if content_match:
+            matched.append(path)
+    return matched
+
+def make_search_result(company_name: str, file_path: Path, reason: str) -> Dict[str, Any]:
+    # Relative path'i al (firma klasörüne göre)
+    rel_path = file_path.relative_to(COMPANIES_DIR / company_name)
+    print(f"[SEARCH] Eşleşme bulundu: {file_path.name} ({reason})")
+    return {
+        "filename": file_path.name,
+        "company": company_name,
+        "path": str(rel_path).replace('\\', '/'),
+        "reason": reason,
+        "extension": file_path.suffix.lower()
+    }
+
 def search_in_excel(file_path: Path, query: str) -> bool:
-    """Excel içeriğinde arama yap"""
+    """Excel içeriğinde arama yap (openpyxl yerine XML akış okuyucusu ile)"""
     try:
-        # data_only=True bazen kaydedilmemiş formüllerde sorun çıkarabiliyor.
-        # read_only=True ise bazı büyük dosyalarda daha hızlıdır.
-        # İkisini de kaldırarak en güvenli (ama biraz daha yavaş) okumayı deneyelim.
-        wb = openpyxl.load_workbook(file_path, data_only=False, read_only=False)
-        for sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
-            # Tüm hücreleri tara
-            for row in ws.iter_rows():
-                for cell in row:
-                    cell_value = cell.value
-                    if cell_value and query in str(cell_value).lower():
-                        return True
-        return False
+        return xlsx_contains(file_path, query)
     except Exception as e:
         # print(f"[SEARCH] Excel hata ({file_path.name}): {e}")
         return False
 
 def search_in_word(file_path: Path, query: str) -> bool:
-    """Word içeriğinde arama yap"""
+    """Word içeriğinde arama yap (paragraflar ve tablo hücreleri)"""
     try:
-        doc = Document(file_path)
-        # Paragraflarda ara
-        for para in doc.paragraphs:
-            if query in para.text.lower():
-                return True
-        # Tablolarda ara
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    if query in cell.text.lower():
-                        return True
-        return False
+        return docx_contains(file_path, query)
     except Exception as e:
         # print(f"[SEARCH] Word hata ({file_path.name}): {e}")
         return False
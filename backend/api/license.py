@@ -5,13 +5,10 @@ License API endpoints
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Optional
-from license_manager import LicenseManager
+from license_manager import LicenseManager, get_license_manager
 
 router = APIRouter()
 
-# LicenseManager instance
-license_manager = LicenseManager()
-
 
 class LicenseActivateRequest(BaseModel):
     license_key: str
@@ -24,7 +21,7 @@ class LicenseResponse(BaseModel):
 
 
 @router.get("/license/status", response_model=LicenseResponse)
-async def get_license_status():
+async def get_license_status(license_manager: LicenseManager = Depends(get_license_manager)):
     """Lisans durumunu kontrol et"""
     is_licensed = license_manager.is_licensed()
     hwid = license_manager.get_hwid() if not is_licensed else None
@@ -37,7 +34,7 @@ async def get_license_status():
 
 
 @router.get("/license/hwid")
-async def get_hwid():
+async def get_hwid(license_manager: LicenseManager = Depends(get_license_manager)):
     """HWID'yi döndür (aktivasyon için)"""
     import traceback
     import sys
@@ -77,7 +74,7 @@ async def get_hwid():
 
 
 @router.post("/license/activate", response_model=LicenseResponse)
-async def activate_license(request: LicenseActivateRequest):
+async def activate_license(request: LicenseActivateRequest, license_manager: LicenseManager = Depends(get_license_manager)):
     """Lisansı aktifleştir"""
     success, message = license_manager.activate_license(request.license_key)
     
@@ -91,7 +88,7 @@ async def activate_license(request: LicenseActivateRequest):
 
 
 @router.post("/license/verify")
-async def verify_license(request: LicenseActivateRequest):
+async def verify_license(request: LicenseActivateRequest, license_manager: LicenseManager = Depends(get_license_manager)):
     """Lisans anahtarını doğrula (kaydetmeden)"""
     is_valid, error_msg = license_manager.verify_license(request.license_key)
     
@@ -1,7 +1,12 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from pathlib import Path
-import shutil
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
+import asyncio
 import os
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from workers import PoolBusyError, io_pool
+from fs_walk import walk
+from upload_stream import stream_multipart, safe_filename, upload_sessions
+from api.files import prepare_document, validate_document
 
 router = APIRouter()
 
@@ -11,81 +16,158 @@ UPLOAD_DIR.mkdir(exist_ok=True)
 # İzin verilen dosya uzantıları
 ALLOWED_EXTENSIONS = {".xlsx", ".xls", ".docx", ".doc"}
 
+# Yükleme sonrası ön işleme: aynı anda en fazla bu kadar dosya (tüm yüklemeler
+# için ortak); havuz doluysa dosya birkaç kez geri çekilerek yeniden denenir
+INGEST_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", "2"))
+INGEST_RETRY_LIMIT = int(os.getenv("INGEST_RETRY_LIMIT", "3"))
+INGEST_RETRY_SECONDS = float(os.getenv("INGEST_RETRY_SECONDS", "2"))
+ingest_slots = asyncio.Semaphore(max(INGEST_CONCURRENCY, 1))
+
 def is_allowed_file(filename: str) -> bool:
     """Dosya uzantısını kontrol et"""
     return Path(filename).suffix.lower() in ALLOWED_EXTENSIONS
 
+def scan_templates() -> List[Dict[str, Any]]:
+    """Şablon klasöründeki izin verilen dosyaları listele"""
+    files = []
+    for record in walk(UPLOAD_DIR, recursive=False, extensions=ALLOWED_EXTENSIONS):
+        files.append({
+            "name": record.name,
+            "path": str(UPLOAD_DIR / record.name),
+            "size": record.size,
+            "extension": record.extension.lower()
+        })
+    return files
+
+def check_template_filename(filename: str) -> Optional[str]:
+    """Yüklenemeyecek dosya için hata mesajı (uygunsa None)"""
+    if not is_allowed_file(filename):
+        return f"Sadece {', '.join(ALLOWED_EXTENSIONS)} dosyaları yüklenebilir"
+    return None
+
+async def ingest_file(item: Dict[str, Any]):
+    """Tek dosyayı ön işle; hatalar burada loglanır (yükleme yanıtı çoktan gönderildi)"""
+    file_path = Path(item["path"])
+    async with ingest_slots:
+        for attempt in range(INGEST_RETRY_LIMIT + 1):
+            try:
+                await io_pool.run(prepare_document, file_path)
+                return
+            except PoolBusyError:
+                if attempt == INGEST_RETRY_LIMIT:
+                    print(f"[INGEST] Havuz dolu, ön işleme atlandı ({item['filename']}); ilk açılışta yapılacak")
+                    return
+                await asyncio.sleep(INGEST_RETRY_SECONDS * (2 ** attempt))
+            except Exception as e:
+                print(f"[INGEST] Ön işleme başarısız ({item['filename']}): {e}")
+                return
+
+async def ingest_uploads(uploaded_files: List[Dict[str, Any]]):
+    """
+    Yüklenen dosyaları önceden işle (parse, resimler, SFDT)
+    Yanıt gönderildikten sonra arka plan görevi olarak çalışır; yükleme parse
+    işlemini beklemez, ilk açılış genelde önbellekten döner. Eşzamanlılık
+    INGEST_CONCURRENCY ile sınırlıdır.
+    """
+    await asyncio.gather(*(ingest_file(item) for item in uploaded_files))
+
 @router.post("/upload")
-async def upload_file(files: list[UploadFile] = File(...)):
+async def upload_file(request: Request, background_tasks: BackgroundTasks):
     """
     Şablon dosyası yükle (birden fazla dosya desteklenmektedir)
-    Excel veya Word dosyalarını form_sablonlari klasörüne kaydeder
+    Excel veya Word dosyalarını form_sablonlari klasörüne kaydeder.
+    Gövde (multipart/form-data) geçici dosyaya alınmadan doğrudan hedefe akıtılır;
+    içeriği uzantısıyla uyuşmayan dosyalar kaydedilmez.
     """
-    if not files:
+    results = await stream_multipart(request.headers, request.stream(), UPLOAD_DIR,
+                                     check_template_filename, validate_document)
+    if not results:
         raise HTTPException(status_code=400, detail="Dosya seçilmedi")
-    
-    uploaded_files = []
-    errors = []
-    
-    for file in files:
-        if not file.filename:
-            errors.append({"filename": "bilinmiyor", "error": "Dosya adı geçersiz"})
-            continue
-        
-        # Dosya uzantısını kontrol et
-        if not is_allowed_file(file.filename):
-            errors.append({
-                "filename": file.filename,
-                "error": f"Sadece {', '.join(ALLOWED_EXTENSIONS)} dosyaları yüklenebilir"
-            })
-            continue
-        
-        # Dosya yolunu oluştur
-        file_path = UPLOAD_DIR / file.filename
-        
-        # Aynı isimde dosya varsa üzerine yaz
-        try:
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            
-            uploaded_files.append({
-                "filename": file.filename,
-                "path": str(file_path),
-                "size": os.path.getsize(file_path)
-            })
-        except Exception as e:
-            errors.append({
-                "filename": file.filename,
-                "error": f"Dosya yükleme hatası: {str(e)}"
-            })
-        finally:
-            file.file.close()
-    
+
+    uploaded_files = [result for result in results if "error" not in result]
+    errors = [result for result in results if "error" in result]
+    background_tasks.add_task(ingest_uploads, uploaded_files)
+
     return {
         "uploaded": uploaded_files,
         "errors": errors,
-        "total": len(files),
+        "total": len(results),
         "success_count": len(uploaded_files),
         "error_count": len(errors),
         "message": f"{len(uploaded_files)} dosya başarıyla yüklendi"
     }
 
+@router.post("/upload/sessions")
+async def create_upload_session(data: dict, background_tasks: BackgroundTasks):
+    """
+    Devam ettirilebilir yükleme oturumu aç (büyük dosyalar için)
+    Body: {"filename": "...", "size": bayt}
+    Dönen chunk_size kadar parçalar PUT /upload/sessions/{id}?offset=N ile gönderilir.
+    """
+    filename = safe_filename(str(data.get("filename") or ""))
+    if not filename:
+        raise HTTPException(status_code=400, detail="Dosya adı geçersiz")
+    error = check_template_filename(filename)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    try:
+        size = int(data.get("size"))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Dosya boyutu geçersiz")
+
+    try:
+        state = await io_pool.run(upload_sessions.create, filename, size, validate_document)
+        if state["completed"]:
+            background_tasks.add_task(ingest_uploads, [state["file"]])
+        return state
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Yükleme oturumu hatası: {str(e)}")
+
+@router.get("/upload/sessions/{upload_id}")
+async def get_upload_session(upload_id: str):
+    """Oturumun durumu (received: sunucuya ulaşan bayt sayısı, devam offset'i)"""
+    return await io_pool.run(upload_sessions.get, upload_id)
+
+@router.put("/upload/sessions/{upload_id}")
+async def upload_session_chunk(upload_id: str, offset: int, request: Request, background_tasks: BackgroundTasks):
+    """
+    Oturuma parça ekle (gövde ham bayt)
+    offset sunucudaki received değerine eşit olmalıdır, değilse 409 döner.
+    Son parçayla dosya doğrulanıp form_sablonlari klasörüne taşınır (completed: true);
+    ön işleme yanıttan sonra arka planda yapılır.
+    """
+    content_length = request.headers.get("content-length")
+    try:
+        state = await upload_sessions.append(
+            upload_id, offset, request.stream(),
+            int(content_length) if content_length and content_length.isdigit() else None,
+            validate_document
+        )
+        if state["completed"]:
+            background_tasks.add_task(ingest_uploads, [state["file"]])
+        return state
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Parça yükleme hatası: {str(e)}")
+
+@router.delete("/upload/sessions/{upload_id}")
+async def delete_upload_session(upload_id: str):
+    """Yarım kalan yüklemeyi iptal et"""
+    await io_pool.run(upload_sessions.delete, upload_id)
+    return {"message": "Yükleme iptal edildi"}
+
 @router.get("/templates")
 async def list_templates():
     """
     form_sablonlari klasöründeki tüm dosyaları listele
     """
     try:
-        files = []
-        for file_path in UPLOAD_DIR.iterdir():
-            if file_path.is_file() and is_allowed_file(file_path.name):
-                files.append({
-                    "name": file_path.name,
-                    "path": str(file_path),
-                    "size": os.path.getsize(file_path),
-                    "extension": file_path.suffix.lower()
-                })
-        
+        files = await io_pool.run(scan_templates)
         return {"files": files, "count": len(files)}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Dosya listeleme hatası: {str(e)}")
@@ -0,0 +1,244 @@
+"""
+Document Cache - Parse edilmiş doküman önbelleği
+read_excel / read_word çıktıları dosya yolu + mtime + boyut anahtarıyla saklanır.
+Bellek katmanı (byte bütçeli LRU) ve yeniden başlatmalarda korunan bir disk katmanı vardır.
+Kayıtlardan türetilen baytlar (örn. sıkıştırılmış JSON yanıtları) da aynı katmanlarda tutulur.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Önbellek dizini ve bütçeleri
+PARSE_CACHE_DIR = Path(os.getenv("PARSE_CACHE_DIR", ".cache/parsed"))
+PARSE_CACHE_MEMORY_MB = int(os.getenv("PARSE_CACHE_MEMORY_MB", "256"))
+PARSE_CACHE_DISK_MB = int(os.getenv("PARSE_CACHE_DISK_MB", "2048"))
+
+# Parser çıktısının formatı değiştiğinde artırılır (eski disk kayıtları kullanılmaz)
+PARSER_VERSION = 3
+
+
+class DocumentCache:
+    """
+    İki katmanlı (bellek + disk) parse önbelleği
+
+    Anahtar dosyanın içeriğini temsil eder (yol + mtime + boyut + parser),
+    bu yüzden dosya değiştiğinde eski kayıt kendiliğinden geçersiz kalır.
+    Dönen sözlükler paylaşılır, çağıran tarafından değiştirilmemelidir.
+    """
+
+    def __init__(self, cache_dir: Path = PARSE_CACHE_DIR,
+                 memory_budget: int = PARSE_CACHE_MEMORY_MB * 1024 * 1024,
+                 disk_budget: int = PARSE_CACHE_DISK_MB * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.memory_budget = memory_budget
+        self.disk_budget = disk_budget
+
+        self._lock = threading.Lock()
+        # Değer: parse sözlüğü veya türetilmiş bayt içeriği
+        self._memory: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: Optional[int] = None
+
+        # Aynı dosyanın eşzamanlı parse edilmesini önlemek için anahtar bazlı kilitler
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    def cache_key(self, file_path: Path, kind: str) -> Optional[str]:
+        """Dosya için önbellek anahtarı üret (dosya yoksa None)"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+
+        raw = f"{kind}|{Path(file_path).resolve()}|{stat.st_mtime_ns}|{stat.st_size}|{PARSER_VERSION}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def content_key(self, data: bytes, kind: str) -> str:
+        """Yolu olmayan içerik (örn. istemcinin gönderdiği dosya) için önbellek anahtarı"""
+        digest = hashlib.sha256(data).hexdigest()
+        return hashlib.sha256(f"{kind}|sha256:{digest}|{PARSER_VERSION}".encode()).hexdigest()
+
+    def derived_key(self, key: str, variant: str) -> str:
+        """Bir kayıttan türetilen içerik için anahtar (kaynak kayıtla birlikte geçersiz olur)"""
+        return hashlib.sha256(f"{key}|{variant}".encode()).hexdigest()
+
+    def get_or_parse(self, file_path: Path, parser: Callable[[Path], Dict[str, Any]],
+                     kind: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Dosyanın parse edilmiş halini önbellekten döndür, yoksa parse edip sakla
+
+        Args:
+            file_path: Doküman yolu
+            parser: Dosyayı parse eden fonksiyon (read_excel, read_word)
+            kind: Parser türü (varsayılan: parser fonksiyonunun adı)
+        """
+        key = self.cache_key(file_path, kind or parser.__name__)
+        if key is None:
+            return parser(file_path)
+
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        with self._key_lock(key):
+            # Kilidi beklerken başka bir istek parse etmiş olabilir
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+
+            try:
+                result = parser(file_path)
+                self.put(key, result)
+                return result
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Önce bellekten, sonra diskten oku"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry[0]
+
+        disk_path = self._disk_path(key)
+        try:
+            payload = disk_path.read_bytes()
+            value = json.loads(payload)
+        except (OSError, ValueError):
+            return None
+
+        # Disk kaydı kullanıldı - LRU temizliği için zamanını güncelle
+        try:
+            os.utime(disk_path)
+        except OSError:
+            pass
+
+        self._remember(key, value, len(payload))
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]):
+        """Değeri bellek ve disk katmanına yaz"""
+        payload = json.dumps(value, ensure_ascii=False, default=str).encode("utf-8")
+        self._remember(key, value, len(payload))
+        self._write_disk(key, payload)
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """Türetilmiş bayt içeriğini önce bellekten, sonra diskten oku"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry[0]
+
+        disk_path = self._disk_path(key, ".bin")
+        try:
+            payload = disk_path.read_bytes()
+        except OSError:
+            return None
+
+        try:
+            os.utime(disk_path)
+        except OSError:
+            pass
+
+        self._remember(key, payload, len(payload))
+        return payload
+
+    def put_bytes(self, key: str, payload: bytes):
+        """Türetilmiş bayt içeriğini bellek ve disk katmanına yaz"""
+        self._remember(key, payload, len(payload))
+        self._write_disk(key, payload, ".bin")
+
+    def clear(self):
+        """Bellek katmanını temizle (disk kayıtları korunur)"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _remember(self, key: str, value: Any, size: int):
+        """Bellek katmanına ekle, bütçe aşılırsa en eski kayıtları çıkar"""
+        if size > self.memory_budget:
+            return
+
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= previous[1]
+
+            self._memory[key] = (value, size)
+            self._memory_bytes += size
+
+            while self._memory_bytes > self.memory_budget and self._memory:
+                _, (_, old_size) = self._memory.popitem(last=False)
+                self._memory_bytes -= old_size
+
+    def _disk_path(self, key: str, suffix: str = ".json") -> Path:
+        return self.cache_dir / f"{key}{suffix}"
+
+    def _write_disk(self, key: str, payload: bytes, suffix: str = ".json"):
+        """Disk katmanına atomik olarak yaz"""
+        if self.disk_budget <= 0 or len(payload) > self.disk_budget:
+            return
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            disk_path = self._disk_path(key, suffix)
+            tmp_path = disk_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(payload)
+            os.replace(tmp_path, disk_path)
+        except OSError as e:
+            print(f"Parse önbelleği diske yazılamadı: {e}")
+            return
+
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += len(payload)
+        self._prune_disk()
+
+    def _prune_disk(self):
+        """Disk bütçesi aşıldıysa en uzun süredir kullanılmayan kayıtları sil"""
+        with self._lock:
+            if self._disk_bytes is not None and self._disk_bytes <= self.disk_budget:
+                return
+
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.is_file() and entry.name.endswith((".json", ".bin")):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                        total += stat.st_size
+        except OSError:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.disk_budget:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+        with self._lock:
+            self._disk_bytes = total
+
+
+# Süreç genelinde paylaşılan önbellek
+document_cache = DocumentCache()
@@ -0,0 +1,405 @@
+"""
+DOCX Patch - Word dosyasındaki değişen metinleri doğrudan XML seviyesinde yazar
+Doküman python-docx ile baştan kurulmaz: kaynak paketin word/document.xml'inde
+sadece metni (veya ilk run biçimi, hizalaması, stili) değişen paragraflar ve
+tablo hücreleri güncellenir; diğer parçalar (üst/alt bilgi, resimler, bölüm
+ayarları, stiller, numaralandırma) olduğu gibi kopyalanır.
+Güvenle uygulanamayan durumlarda (paragraf/tablo yapısı değişmişse)
+DocxPatchUnsupported fırlatılır.
+"""
+
+import copy
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from lxml import etree
+
+from docx_text import (
+    ALIGNMENTS, BODY, HYPERLINK, P, PPR, R, RPR, TBL, VAL, W,
+    cell_text, iter_table_rows, package_parts, paragraph_styles,
+    paragraph_text, run_format,
+)
+from package_writer import write_package
+
+XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+
+# Şema sırası: yeni eklenen özellik elemanı doğru yere konur
+PPR_ORDER = (
+    'pStyle', 'keepNext', 'keepLines', 'pageBreakBefore', 'framePr', 'widowControl',
+    'numPr', 'suppressLineNumbers', 'pBdr', 'shd', 'tabs', 'suppressAutoHyphens',
+    'kinsoku', 'wordWrap', 'overflowPunct', 'topLinePunct', 'autoSpaceDE', 'autoSpaceDN',
+    'bidi', 'adjustRightInd', 'snapToGrid', 'spacing', 'ind', 'contextualSpacing',
+    'mirrorIndents', 'suppressOverlap', 'jc', 'textDirection', 'textAlignment',
+    'textboxTightWrap', 'outlineLvl', 'divId', 'cnfStyle', 'rPr', 'sectPr', 'pPrChange'
+)
+RPR_ORDER = (
+    'rStyle', 'rFonts', 'b', 'bCs', 'i', 'iCs', 'caps', 'smallCaps', 'strike', 'dstrike',
+    'outline', 'shadow', 'emboss', 'imprint', 'noProof', 'snapToGrid', 'vanish',
+    'webHidden', 'color', 'spacing', 'w', 'kern', 'position', 'sz', 'szCs', 'highlight',
+    'u', 'effect', 'bdr', 'shd', 'fitText', 'vertAlign', 'rtl', 'cs', 'em', 'lang',
+    'eastAsianLayout', 'specVanish', 'oMath', 'rPrChange'
+)
+
+# read_word hizalama metni -> w:jc
+JC_VALUES = {'LEFT (0)': 'left'}
+for _jc, _label in ALIGNMENTS.items():
+    JC_VALUES.setdefault(_label, _jc)
+
+# Run içinde metin üreten elemanlar (docx_text.run_text ile aynı küme)
+TEXT_TAGS = {W + 't', W + 'tab', W + 'ptab', W + 'cr', W + 'noBreakHyphen'}
+
+
+class DocxPatchUnsupported(Exception):
+    """Değişiklikler XML seviyesinde güvenle uygulanamıyor (çağıran dokümanı yeniden kurmalı)"""
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _property(parent: etree._Element, name: str, order: Sequence[str]) -> etree._Element:
+    """Özellik elemanını bul, yoksa şema sırasına uygun yere ekle"""
+    el = parent.find(W + name)
+    if el is not None:
+        return el
+    el = etree.Element(W + name)
+    rank = order.index(name)
+    for index, child in enumerate(parent):
+        local = _local(child.tag)
+        if local not in order or order.index(local) > rank:
+            parent.insert(index, el)
+            return el
+    parent.append(el)
+    return el
+
+
+def _remove_property(parent: Optional[etree._Element], name: str):
+    el = parent.find(W + name) if parent is not None else None
+    if el is not None:
+        parent.remove(el)
+
+
+def _properties(owner: etree._Element, tag: str) -> etree._Element:
+    """pPr/rPr: her zaman sahibinin ilk çocuğu"""
+    props = owner.find(tag)
+    if props is None:
+        props = etree.Element(tag)
+        owner.insert(0, props)
+    return props
+
+
+def _is_text(el: etree._Element) -> bool:
+    if el.tag == W + 'br':
+        return el.get(W + 'type', 'textWrapping') == 'textWrapping'
+    return el.tag in TEXT_TAGS
+
+
+def _paragraph_runs(p: etree._Element) -> List[etree._Element]:
+    """paragraph_text'in okuduğu run'lar (doğrudan ve köprü içindekiler), belge sırasıyla"""
+    runs = []
+    for child in p:
+        if child.tag == R:
+            runs.append(child)
+        elif child.tag == HYPERLINK:
+            runs.extend(child.iterchildren(R))
+    return runs
+
+
+def _append_text(r: etree._Element, text: str):
+    """Metni run'a ekle: satır sonu w:br, sekme w:tab olur"""
+    for line_index, line in enumerate(text.split('\n')):
+        if line_index:
+            etree.SubElement(r, W + 'br')
+        for chunk_index, chunk in enumerate(line.split('\t')):
+            if chunk_index:
+                etree.SubElement(r, W + 'tab')
+            if chunk:
+                t = etree.SubElement(r, W + 't')
+                t.text = chunk
+                if chunk != chunk.strip():
+                    t.set(XML_SPACE, 'preserve')
+
+
+def set_paragraph_text(p: etree._Element, text: str):
+    """
+    Paragraf metnini değiştir
+
+    Metin ilk metinli run'a (biçimi korunarak) yazılır; diğer run'ların metni
+    silinir, metinden başka içeriği (resim, alan, sayfa sonu) olan run'lar kalır.
+    """
+    runs = _paragraph_runs(p)
+    target = next((r for r in runs if any(child.tag == W + 't' for child in r)), None)
+    if target is None:
+        target = runs[0] if runs else etree.SubElement(p, R)
+
+    for r in runs:
+        for child in [child for child in r if _is_text(child)]:
+            r.remove(child)
+        if r is not target and all(child.tag == RPR for child in r):
+            parent = r.getparent()
+            parent.remove(r)
+            if parent.tag == HYPERLINK and parent.find(R) is None:
+                p.remove(parent)
+
+    _append_text(target, text)
+
+
+def _same(current: Any, new: Any) -> bool:
+    # read_word rengi olmayan run için "None" metni döner
+    if current in (None, "None", ""):
+        current = None
+    if new in (None, "None", ""):
+        new = None
+    return current == new
+
+
+def apply_run_format(r: etree._Element, format_data: Dict[str, Any], underline: bool):
+    """read_word formatındaki değişen biçim alanlarını run'a yaz"""
+    current = run_format(r, underline=underline)
+    changes = {
+        key: value for key, value in format_data.items()
+        if key in current and not _same(current[key], value)
+    }
+    if not changes:
+        return
+
+    rPr = _properties(r, RPR)
+    for key in ("bold", "italic"):
+        if key in changes:
+            name = 'b' if key == "bold" else 'i'
+            if changes[key]:
+                el = _property(rPr, name, RPR_ORDER)
+                el.attrib.pop(VAL, None)
+            else:
+                _remove_property(rPr, name)
+
+    if "underline" in changes:
+        if changes["underline"]:
+            _property(rPr, 'u', RPR_ORDER).set(VAL, 'single')
+        else:
+            _remove_property(rPr, 'u')
+
+    if "font_size" in changes:
+        size = changes["font_size"]
+        try:
+            half_points = int(round(float(size) * 2)) if size else 0
+        except (TypeError, ValueError):
+            half_points = 0
+        if half_points > 0:
+            _property(rPr, 'sz', RPR_ORDER).set(VAL, str(half_points))
+        else:
+            _remove_property(rPr, 'sz')
+
+    if "font_name" in changes:
+        name = changes["font_name"]
+        if name:
+            fonts = _property(rPr, 'rFonts', RPR_ORDER)
+            fonts.set(W + 'ascii', str(name))
+            fonts.set(W + 'hAnsi', str(name))
+        else:
+            fonts = rPr.find(W + 'rFonts')
+            if fonts is not None:
+                fonts.attrib.pop(W + 'ascii', None)
+                fonts.attrib.pop(W + 'hAnsi', None)
+                if not len(fonts.attrib):
+                    rPr.remove(fonts)
+
+    if "font_color" in changes:
+        color = changes["font_color"]
+        rgb = str(color or "")
+        if len(rgb) == 8:  # ARGB formatı
+            rgb = rgb[2:]
+        try:
+            int(rgb, 16)
+            valid = len(rgb) == 6
+        except ValueError:
+            valid = False
+        if valid:
+            _property(rPr, 'color', RPR_ORDER).set(VAL, rgb.upper())
+        elif _same(color, None):
+            _remove_property(rPr, 'color')
+
+    if not len(rPr):
+        r.remove(rPr)
+
+
+class _ParagraphPatcher:
+    def __init__(self, styles: Dict[str, Optional[str]], default_style: Optional[str]):
+        self.styles = styles
+        self.default_style = default_style
+        # Görünen ad -> stil kimliği (aynı adlı ilk stil)
+        self.style_ids: Dict[str, str] = {}
+        for style_id, name in styles.items():
+            if name is not None:
+                self.style_ids.setdefault(name, style_id)
+
+    def patch(self, p: etree._Element, para_data: Dict[str, Any]) -> bool:
+        """Paragrafı read_word verisine göre güncelle; değişiklik olduysa True"""
+        changed = False
+        had_runs = p.find(R) is not None
+
+        text = para_data.get("text", "")
+        if not isinstance(text, str):
+            text = "" if text is None else str(text)
+        if text != paragraph_text(p):
+            set_paragraph_text(p, text)
+            changed = True
+
+        pPr = p.find(PPR)
+        style_el = pPr.find(W + 'pStyle') if pPr is not None else None
+        style_id = style_el.get(VAL) if style_el is not None else None
+        current_style = self.styles[style_id] if style_id in self.styles else self.default_style
+        new_style = para_data.get("style")
+        if new_style and new_style != current_style and new_style in self.style_ids:
+            _property(_properties(p, PPR), 'pStyle', PPR_ORDER).set(VAL, self.style_ids[new_style])
+            changed = True
+
+        first_run = p.find(R)
+        if first_run is not None and isinstance(para_data.get("format"), dict):
+            before = etree.tostring(first_run)
+            apply_run_format(first_run, para_data["format"], underline=True)
+            changed = changed or etree.tostring(first_run) != before
+
+        # read_word hizalamayı sadece run'ı olan paragraflar için verir
+        if had_runs:
+            pPr = p.find(PPR)
+            jc = pPr.find(W + 'jc') if pPr is not None else None
+            current = ALIGNMENTS.get(jc.get(VAL)) if jc is not None else None
+            new = para_data.get("alignment")
+            if new != current:
+                if new in JC_VALUES:
+                    _property(_properties(p, PPR), 'jc', PPR_ORDER).set(VAL, JC_VALUES[new])
+                    changed = True
+                elif new is None and jc is not None:
+                    pPr.remove(jc)
+                    changed = True
+
+        return changed
+
+
+def _cell_data(value: Any) -> Dict[str, Any]:
+    if isinstance(value, dict):
+        return value
+    return {"text": "" if value is None else str(value)}
+
+
+def patch_cell(tc: etree._Element, cell_data: Dict[str, Any]) -> bool:
+    """Hücre metnini (satırlar paragraflara) ve ilk run biçimini güncelle"""
+    changed = False
+    text = cell_data.get("text", "")
+    if not isinstance(text, str):
+        text = "" if text is None else str(text)
+
+    if text != cell_text(tc):
+        paragraphs = list(tc.iterchildren(P))
+        if not paragraphs:
+            paragraphs = [etree.SubElement(tc, P)]
+        lines = text.split('\n')
+        for index, line in enumerate(lines):
+            if index < len(paragraphs):
+                p = paragraphs[index]
+                if paragraph_text(p) != line:
+                    set_paragraph_text(p, line)
+            else:
+                # Yeni satır son paragrafın biçimiyle eklenir
+                p = copy.deepcopy(paragraphs[-1])
+                set_paragraph_text(p, line)
+                paragraphs[-1].addnext(p)
+                paragraphs.append(p)
+        for p in paragraphs[len(lines):]:
+            tc.remove(p)
+        changed = True
+
+    first_para = tc.find(P)
+    first_run = first_para.find(R) if first_para is not None else None
+    if first_run is not None and isinstance(cell_data.get("format"), dict):
+        before = etree.tostring(first_run)
+        apply_run_format(first_run, cell_data["format"], underline=False)
+        changed = changed or etree.tostring(first_run) != before
+    return changed
+
+
+def patch_table(tbl: etree._Element, table_data: List[Any]) -> bool:
+    """
+    Tabloyu read_word verisine göre güncelle
+
+    Birleştirilmiş hücre read_word'de kapladığı her konumda tekrarlanır;
+    kaynaktan farklı olan ilk kopya geçerlidir.
+    """
+    rows = list(iter_table_rows(tbl))
+    if len(rows) != len(table_data):
+        raise DocxPatchUnsupported("Tablo satır sayısı değişmiş")
+
+    edits: Dict[int, Dict[str, Any]] = {}
+    cells: Dict[int, etree._Element] = {}
+    for row, row_data in zip(rows, table_data):
+        if not isinstance(row_data, list) or len(row) != len(row_data):
+            raise DocxPatchUnsupported("Tablo sütun sayısı değişmiş")
+        for tc, value in zip(row, row_data):
+            key = id(tc)
+            cells[key] = tc
+            data = _cell_data(value)
+            if key not in edits:
+                edits[key] = data
+            elif edits[key].get("text", "") == cell_text(tc) and data.get("text", "") != cell_text(tc):
+                edits[key] = data
+
+    changed = False
+    for key, data in edits.items():
+        changed = patch_cell(cells[key], data) or changed
+    return changed
+
+
+def patch_docx(base_path: Path, target_path: Path, content: Dict[str, Any]):
+    """
+    base_path'i read_word formatındaki içerikle target_path'e yaz (base_path == target_path olabilir)
+
+    Args:
+        content: {"paragraphs": [...], "tables": [...]} - gövdedeki paragraf ve
+                 tablolarla aynı sayıda ve sırada olmalı
+
+    Raises:
+        DocxPatchUnsupported: Değişiklikler güvenle uygulanamıyorsa (dosyaya dokunulmaz)
+    """
+    try:
+        zin = zipfile.ZipFile(base_path)
+    except zipfile.BadZipFile as e:
+        raise DocxPatchUnsupported(f"Geçersiz docx: {e}")
+
+    with zin:
+        document, styles_path = package_parts(zin)
+        if document not in zin.namelist():
+            raise DocxPatchUnsupported(f"Doküman parçası bulunamadı: {document}")
+
+        root = etree.fromstring(zin.read(document))
+        body = root.find(BODY)
+        if body is None:
+            raise DocxPatchUnsupported("Doküman gövdesi bulunamadı")
+
+        paragraphs = body.findall(P)
+        tables = body.findall(TBL)
+        paragraphs_data = content.get("paragraphs", [])
+        tables_data = content.get("tables", [])
+        if len(paragraphs) != len(paragraphs_data) or len(tables) != len(tables_data):
+            raise DocxPatchUnsupported("Paragraf veya tablo sayısı değişmiş")
+
+        styles, default_style = paragraph_styles(zin, styles_path)
+        patcher = _ParagraphPatcher(styles, default_style)
+
+        changed = False
+        for p, para_data in zip(paragraphs, paragraphs_data):
+            if not isinstance(para_data, dict):
+                raise DocxPatchUnsupported("Geçersiz paragraf verisi")
+            changed = patcher.patch(p, para_data) or changed
+        for tbl, table_data in zip(tables, tables_data):
+            if not isinstance(table_data, list):
+                raise DocxPatchUnsupported("Geçersiz tablo verisi")
+            changed = patch_table(tbl, table_data) or changed
+
+        replaced: Dict[str, bytes] = {}
+        if changed:
+            replaced[document] = etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+        # Değişmeyen parçalar sıkıştırılmış halleriyle kopyalanır; geçici dosya atomik olarak yerine konur
+        write_package(base_path, zin, target_path, replaced)
@@ -0,0 +1,930 @@
+"""
+DOCX -> SFDT - Word dokümanlarını Syncfusion DocumentEditor formatına çevirir
+Editör .docx dosyasını kendisi okuyamaz; açma, yapıştırma gibi işlemler için
+serviceUrl'deki sunucuya gider. Bu modül o dönüşümü yerelde yapar: gövde,
+tablolar (birleştirilmiş hücreler, kenarlıklar), resimler, bölümler, üst/alt
+bilgiler, stiller ve listeler SFDT JSON'una çevrilir.
+
+Sayfa ölçüleri SFDT'de punto (pt) cinsindendir: docx twip (1/20 pt),
+yarım punto (yazı boyutu) ve EMU (resimler, 12700 = 1 pt) kullanır.
+"""
+
+import base64
+import re
+from html.parser import HTMLParser
+from io import BytesIO
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Union
+
+from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml.ns import qn
+from docx.styles import BabelFish
+
+EMU_PER_POINT = 12700
+
+# Letter (Word varsayılanı), 1 inç kenar boşlukları
+DEFAULT_SECTION_FORMAT = {
+    "pageWidth": 612,
+    "pageHeight": 792,
+    "leftMargin": 72,
+    "rightMargin": 72,
+    "topMargin": 72,
+    "bottomMargin": 72,
+    "headerDistance": 36,
+    "footerDistance": 36,
+    "differentFirstPage": False,
+    "differentOddAndEvenPages": False,
+}
+
+ALIGNMENTS = {
+    "left": "Left", "start": "Left", "center": "Center", "right": "Right", "end": "Right",
+    "both": "Justify", "distribute": "Justify",
+}
+
+UNDERLINES = {
+    "single": "Single", "double": "Double", "thick": "Thick", "dotted": "Dotted",
+    "dash": "Dash", "dotDash": "DotDash", "dotDotDash": "DotDotDash", "wave": "Wavy",
+    "words": "Words", "none": "None",
+}
+
+HIGHLIGHTS = {
+    "yellow": "Yellow", "green": "BrightGreen", "cyan": "Turquoise", "magenta": "Pink",
+    "blue": "Blue", "red": "Red", "darkBlue": "DarkBlue", "darkCyan": "Teal",
+    "darkGreen": "Green", "darkMagenta": "Violet", "darkRed": "DarkRed",
+    "darkYellow": "DarkYellow", "darkGray": "Gray50", "lightGray": "Gray25", "black": "Black",
+}
+
+BORDER_STYLES = {
+    "single": "Single", "thick": "Thick", "double": "Double", "dotted": "Dot",
+    "dashed": "DashLargeGap", "dashSmallGap": "DashSmallGap", "dotDash": "DashDot",
+    "dotDotDash": "DashDotDot", "triple": "Triple", "wave": "Wave",
+    "nil": "None", "none": "None",
+}
+
+LIST_PATTERNS = {
+    "decimal": "Arabic", "bullet": "Bullet", "lowerLetter": "LowLetter", "upperLetter": "UpLetter",
+    "lowerRoman": "LowRoman", "upperRoman": "UpRoman", "decimalZero": "LeadingZero", "none": "None",
+}
+
+TAB_ALIGNMENTS = {
+    "left": "Left", "start": "Left", "center": "Center", "right": "Right", "end": "Right",
+    "decimal": "Decimal", "bar": "Bar",
+}
+
+TAB_LEADERS = {"dot": "Dot", "hyphen": "Hyphen", "underscore": "Underscore", "middleDot": "Dot"}
+
+# Başlık/alt bilgi referans türü -> SFDT anahtarı
+HEADER_KEYS = {
+    ("header", "default"): "header", ("footer", "default"): "footer",
+    ("header", "first"): "firstPageHeader", ("footer", "first"): "firstPageFooter",
+    ("header", "even"): "evenHeader", ("footer", "even"): "evenFooter",
+}
+
+# Paragraf içinde içine girilip çalıştırmaları (run) okunan kapsayıcılar
+INLINE_CONTAINERS = {
+    qn("w:hyperlink"), qn("w:ins"), qn("w:smartTag"), qn("w:fldSimple"),
+    qn("w:customXml"), qn("w:sdtContent"), qn("w:dir"), qn("w:bdo"),
+}
+
+OFF_VALUES = {"0", "false", "off", "none"}
+
+
+# ----------------------------------------------------------------------
+# Yardımcılar
+# ----------------------------------------------------------------------
+
+def _attr(el, name: str) -> Optional[str]:
+    return el.get(qn(name)) if el is not None else None
+
+
+def _child(el, name: str):
+    return el.find(qn(name)) if el is not None else None
+
+
+def _val(el, name: str) -> Optional[str]:
+    return _attr(_child(el, name), "w:val")
+
+
+def _points(twips: Optional[str]) -> Optional[float]:
+    """Twip -> punto"""
+    try:
+        return int(float(twips)) / 20
+    except (TypeError, ValueError):
+        return None
+
+
+def _toggle(el, name: str) -> Optional[bool]:
+    """w:b gibi aç/kapa özellikleri (val yoksa açık)"""
+    child = _child(el, name)
+    if child is None:
+        return None
+    value = _attr(child, "w:val")
+    return value is None or value.lower() not in OFF_VALUES
+
+
+def _color(value: Optional[str]) -> Optional[str]:
+    if not value or value == "auto" or not re.fullmatch(r"[0-9A-Fa-f]{6}", value):
+        return None
+    return f"#{value.upper()}"
+
+
+def _empty_paragraph() -> Dict[str, Any]:
+    return {"paragraphFormat": {}, "characterFormat": {}, "inlines": []}
+
+
+# ----------------------------------------------------------------------
+# Biçim dönüşümleri
+# ----------------------------------------------------------------------
+
+def character_format(rPr, style_names: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """w:rPr -> SFDT characterFormat"""
+    fmt: Dict[str, Any] = {}
+    if rPr is None:
+        return fmt
+
+    style_id = _val(rPr, "w:rStyle")
+    if style_id and style_names and style_id in style_names:
+        fmt["styleName"] = style_names[style_id]
+
+    for name, key in (("w:b", "bold"), ("w:i", "italic"), ("w:caps", "allCaps")):
+        value = _toggle(rPr, name)
+        if value is not None:
+            fmt[key] = value
+
+    underline = _child(rPr, "w:u")
+    if underline is not None:
+        fmt["underline"] = UNDERLINES.get(_attr(underline, "w:val") or "single", "Single")
+
+    if _toggle(rPr, "w:strike"):
+        fmt["strikethrough"] = "SingleStrike"
+    elif _toggle(rPr, "w:dstrike"):
+        fmt["strikethrough"] = "DoubleStrike"
+
+    size = _val(rPr, "w:sz")
+    if size and size.isdigit():
+        fmt["fontSize"] = int(size) / 2
+
+    fonts = _child(rPr, "w:rFonts")
+    if fonts is not None:
+        family = _attr(fonts, "w:ascii") or _attr(fonts, "w:hAnsi") or _attr(fonts, "w:cs")
+        if family:
+            fmt["fontFamily"] = family
+
+    color = _color(_val(rPr, "w:color"))
+    if color:
+        fmt["fontColor"] = color
+
+    highlight = HIGHLIGHTS.get(_val(rPr, "w:highlight") or "")
+    if highlight:
+        fmt["highlightColor"] = highlight
+
+    vert_align = _val(rPr, "w:vertAlign")
+    if vert_align == "superscript":
+        fmt["baselineAlignment"] = "Superscript"
+    elif vert_align == "subscript":
+        fmt["baselineAlignment"] = "Subscript"
+
+    return fmt
+
+
+def paragraph_format(pPr, style_names: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """w:pPr -> SFDT paragraphFormat (liste bilgisi dahil)"""
+    fmt: Dict[str, Any] = {}
+    if pPr is None:
+        return fmt
+
+    style_id = _val(pPr, "w:pStyle")
+    if style_id and style_names and style_id in style_names:
+        fmt["styleName"] = style_names[style_id]
+
+    alignment = ALIGNMENTS.get(_val(pPr, "w:jc") or "")
+    if alignment:
+        fmt["textAlignment"] = alignment
+
+    ind = _child(pPr, "w:ind")
+    if ind is not None:
+        left = _points(_attr(ind, "w:left") or _attr(ind, "w:start"))
+        right = _points(_attr(ind, "w:right") or _attr(ind, "w:end"))
+        first_line = _points(_attr(ind, "w:firstLine"))
+        hanging = _points(_attr(ind, "w:hanging"))
+        if left is not None:
+            fmt["leftIndent"] = left
+        if right is not None:
+            fmt["rightIndent"] = right
+        if hanging is not None:
+            fmt["firstLineIndent"] = -hanging
+        elif first_line is not None:
+            fmt["firstLineIndent"] = first_line
+
+    spacing = _child(pPr, "w:spacing")
+    if spacing is not None:
+        before = _points(_attr(spacing, "w:before"))
+        after = _points(_attr(spacing, "w:after"))
+        if before is not None:
+            fmt["beforeSpacing"] = before
+        if after is not None:
+            fmt["afterSpacing"] = after
+        line = _attr(spacing, "w:line")
+        if line and line.lstrip("-").isdigit():
+            rule = _attr(spacing, "w:lineRule") or "auto"
+            if rule == "auto":
+                fmt["lineSpacing"] = int(line) / 240
+                fmt["lineSpacingType"] = "Multiple"
+            else:
+                fmt["lineSpacing"] = int(line) / 20
+                fmt["lineSpacingType"] = "Exactly" if rule == "exact" else "AtLeast"
+
+    for name, key in (("w:keepNext", "keepWithNext"), ("w:keepLines", "keepLinesTogether"),
+                      ("w:contextualSpacing", "contextualSpacing")):
+        value = _toggle(pPr, name)
+        if value is not None:
+            fmt[key] = value
+
+    num_pr = _child(pPr, "w:numPr")
+    if num_pr is not None:
+        num_id = _val(num_pr, "w:numId")
+        level = _val(num_pr, "w:ilvl") or "0"
+        if num_id and num_id.isdigit() and int(num_id) > 0:
+            fmt["listFormat"] = {"listId": int(num_id), "listLevelNumber": int(level) if level.isdigit() else 0}
+        elif num_id == "0":
+            fmt["listFormat"] = {}
+
+    tabs = _child(pPr, "w:tabs")
+    if tabs is not None:
+        fmt["tabs"] = []
+        for tab in tabs.iterchildren(qn("w:tab")):
+            position = _points(_attr(tab, "w:pos")) or 0
+            kind = _attr(tab, "w:val") or "left"
+            if kind == "clear":
+                fmt["tabs"].append({"position": 0, "deletePosition": position,
+                                    "tabJustification": "Left", "tabLeader": "None"})
+                continue
+            fmt["tabs"].append({
+                "position": position,
+                "deletePosition": 0,
+                "tabJustification": TAB_ALIGNMENTS.get(kind, "Left"),
+                "tabLeader": TAB_LEADERS.get(_attr(tab, "w:leader") or "", "None"),
+            })
+
+    return fmt
+
+
+def _border(el) -> Dict[str, Any]:
+    style = _attr(el, "w:val") or "single"
+    size = _attr(el, "w:sz")
+    border: Dict[str, Any] = {"lineStyle": BORDER_STYLES.get(style, "Single")}
+    if size and size.isdigit():
+        border["lineWidth"] = int(size) / 8
+    color = _color(_attr(el, "w:color"))
+    if color:
+        border["color"] = color
+    return border
+
+
+def borders(el) -> Dict[str, Any]:
+    """w:tblBorders / w:tcBorders -> SFDT borders"""
+    result: Dict[str, Any] = {}
+    if el is None:
+        return result
+    names = {
+        "top": "top", "bottom": "bottom", "left": "left", "start": "left",
+        "right": "right", "end": "right", "insideH": "horizontal", "insideV": "vertical",
+        "tl2br": "diagonalDown", "tr2bl": "diagonalUp",
+    }
+    for child in el:
+        key = names.get(child.tag.rsplit("}", 1)[-1])
+        if key:
+            result[key] = _border(child)
+    return result
+
+
+# ----------------------------------------------------------------------
+# Doküman dönüştürücü
+# ----------------------------------------------------------------------
+
+class _DocxConverter:
+    """Tek dokümanın dönüşüm durumu (stil adları, alan kodu durumu)"""
+
+    def __init__(self, document):
+        self.document = document
+        self.main_part = document.part
+        self.style_names: Dict[str, str] = {}
+        self.table_styles: Dict[str, Any] = {}
+        self.in_field_code = False
+
+        styles_element = document.styles.element
+        for style in styles_element.iterchildren(qn("w:style")):
+            style_id = _attr(style, "w:styleId")
+            name = _val(style, "w:name") or style_id
+            if style_id:
+                self.style_names[style_id] = BabelFish.internal2ui(name)
+                if _attr(style, "w:type") == "table":
+                    self.table_styles[style_id] = style
+
+    def convert(self) -> Dict[str, Any]:
+        body = self.document.element.body
+        settings = self.document.settings.element
+        tab_stop = _points(_val(settings, "w:defaultTabStop"))
+
+        sfdt: Dict[str, Any] = {
+            "sections": self.sections(body, _child(settings, "w:evenAndOddHeaders") is not None),
+            "characterFormat": {},
+            "paragraphFormat": {},
+            "defaultTabWidth": tab_stop or 36,
+            "background": {"color": "#FFFFFFFF"},
+            "styles": self.styles(),
+        }
+
+        defaults = _child(self.document.styles.element, "w:docDefaults")
+        if defaults is not None:
+            sfdt["characterFormat"] = character_format(_child(_child(defaults, "w:rPrDefault"), "w:rPr"))
+            sfdt["paragraphFormat"] = paragraph_format(_child(_child(defaults, "w:pPrDefault"), "w:pPr"))
+
+        sfdt["lists"], sfdt["abstractLists"] = self.lists()
+        return sfdt
+
+    # -- Bölümler ------------------------------------------------------
+
+    def sections(self, body, even_odd: bool) -> List[Dict[str, Any]]:
+        sections: List[Dict[str, Any]] = []
+        blocks: List[Dict[str, Any]] = []
+        headers: Dict[str, Any] = {}
+
+        def close(sect_pr):
+            nonlocal blocks, headers
+            headers = self.headers_footers(sect_pr, headers)
+            sections.append({
+                "sectionFormat": self.section_format(sect_pr, even_odd),
+                "blocks": blocks or [_empty_paragraph()],
+                "headersFooters": headers,
+            })
+            blocks = []
+
+        for child in body.iterchildren():
+            if child.tag == qn("w:sectPr"):
+                continue
+            for block in self.blocks([child], self.main_part):
+                blocks.append(block)
+            # Paragraf içindeki sectPr bölüm sonunu işaretler
+            if child.tag == qn("w:p"):
+                sect_pr = _child(_child(child, "w:pPr"), "w:sectPr")
+                if sect_pr is not None:
+                    close(sect_pr)
+
+        close(_child(body, "w:sectPr"))
+        return sections
+
+    def section_format(self, sect_pr, even_odd: bool) -> Dict[str, Any]:
+        fmt = dict(DEFAULT_SECTION_FORMAT, differentOddAndEvenPages=even_odd)
+        if sect_pr is None:
+            return fmt
+        size = _child(sect_pr, "w:pgSz")
+        if size is not None:
+            fmt["pageWidth"] = _points(_attr(size, "w:w")) or fmt["pageWidth"]
+            fmt["pageHeight"] = _points(_attr(size, "w:h")) or fmt["pageHeight"]
+        margins = _child(sect_pr, "w:pgMar")
+        if margins is not None:
+            for attr, key in (("w:left", "leftMargin"), ("w:right", "rightMargin"),
+                              ("w:top", "topMargin"), ("w:bottom", "bottomMargin"),
+                              ("w:header", "headerDistance"), ("w:footer", "footerDistance")):
+                value = _points(_attr(margins, attr))
+                if value is not None:
+                    # Negatif üst/alt boşluk "metnin üstüne binmesin" anlamındadır
+                    fmt[key] = abs(value)
+        fmt["differentFirstPage"] = bool(_toggle(sect_pr, "w:titlePg"))
+        return fmt
+
+    def headers_footers(self, sect_pr, previous: Dict[str, Any]) -> Dict[str, Any]:
+        """Bölümün üst/alt bilgileri; tanımlanmayanlar önceki bölümden devralınır"""
+        result = {key: {**value, "isLinkToPrevious": True} for key, value in previous.items()}
+        if sect_pr is None:
+            return result
+        for ref in sect_pr:
+            kind = ref.tag.rsplit("}", 1)[-1].replace("Reference", "")
+            key = HEADER_KEYS.get((kind, _attr(ref, "w:type") or "default"))
+            rel_id = _attr(ref, "r:id")
+            if not key or not rel_id:
+                continue
+            part = self.main_part.related_parts.get(rel_id)
+            if part is None:
+                continue
+            result[key] = {
+                "isLinkToPrevious": False,
+                "blocks": self.blocks(part.element.iterchildren(), part) or [_empty_paragraph()],
+            }
+        return result
+
+    # -- Bloklar -------------------------------------------------------
+
+    def blocks(self, elements: Iterable, part) -> List[Dict[str, Any]]:
+        result = []
+        for el in elements:
+            if el.tag == qn("w:p"):
+                result.append(self.paragraph(el, part))
+            elif el.tag == qn("w:tbl"):
+                result.append(self.table(el, part))
+            elif el.tag in (qn("w:sdt"), qn("w:customXml")):
+                content = _child(el, "w:sdtContent") if el.tag == qn("w:sdt") else el
+                if content is not None:
+                    result.extend(self.blocks(content.iterchildren(), part))
+        return result
+
+    def paragraph(self, p, part) -> Dict[str, Any]:
+        pPr = _child(p, "w:pPr")
+        inlines: List[Dict[str, Any]] = []
+        self.inlines(p, part, inlines)
+        return {
+            "paragraphFormat": paragraph_format(pPr, self.style_names),
+            "characterFormat": character_format(_child(pPr, "w:rPr"), self.style_names),
+            "inlines": inlines,
+        }
+
+    def inlines(self, parent, part, out: List[Dict[str, Any]]):
+        for child in parent.iterchildren():
+            if child.tag == qn("w:r"):
+                self.run(child, part, out)
+            elif child.tag == qn("w:sdt"):
+                content = _child(child, "w:sdtContent")
+                if content is not None:
+                    self.inlines(content, part, out)
+            elif child.tag in INLINE_CONTAINERS:
+                self.inlines(child, part, out)
+
+    def run(self, r, part, out: List[Dict[str, Any]]):
+        fmt = character_format(_child(r, "w:rPr"), self.style_names)
+        text: List[str] = []
+
+        def flush():
+            if text:
+                out.append({"characterFormat": fmt, "text": "".join(text)})
+                text.clear()
+
+        for child in r.iterchildren():
+            tag = child.tag
+            if tag == qn("w:fldChar"):
+                kind = _attr(child, "w:fldCharType")
+                # Alan kodu (örn. PAGE) gösterilmez, sadece son hesaplanan sonucu
+                self.in_field_code = kind == "begin"
+            elif self.in_field_code or tag == qn("w:instrText"):
+                continue
+            elif tag == qn("w:t"):
+                text.append(child.text or "")
+            elif tag == qn("w:tab"):
+                text.append("\t")
+            elif tag == qn("w:br"):
+                text.append("\f" if _attr(child, "w:type") == "page" else "\v")
+            elif tag == qn("w:cr"):
+                text.append("\v")
+            elif tag in (qn("w:noBreakHyphen"), qn("w:softHyphen")):
+                text.append("-")
+            elif tag == qn("w:sym"):
+                code = _attr(child, "w:char")
+                if code:
+                    try:
+                        text.append(chr(int(code, 16)))
+                    except ValueError:
+                        pass
+            elif tag in (qn("w:drawing"), qn("w:pict"), qn("w:object")):
+                image = self.image(child, part)
+                if image:
+                    flush()
+                    image["characterFormat"] = fmt
+                    out.append(image)
+        flush()
+
+    def image(self, el, part) -> Optional[Dict[str, Any]]:
+        """Çizimdeki ilk resmi base64 data URI olarak döndür (konumlu resimler satır içi gösterilir)"""
+        blip = next(el.iter(qn("a:blip")), None)
+        rel_id = _attr(blip, "r:embed") if blip is not None else None
+        width = height = None
+
+        if rel_id is not None:
+            extent = next(el.iter(qn("wp:extent")), None)
+            if extent is not None:
+                width = int(extent.get("cx", 0)) / EMU_PER_POINT
+                height = int(extent.get("cy", 0)) / EMU_PER_POINT
+        else:
+            # VML (eski Word): v:imagedata r:id, boyut style="width:..pt;height:..pt"
+            imagedata = next(el.iter("{urn:schemas-microsoft-com:vml}imagedata"), None)
+            rel_id = _attr(imagedata, "r:id") if imagedata is not None else None
+            shape = imagedata.getparent() if imagedata is not None else None
+            style = shape.get("style", "") if shape is not None else ""
+            sizes = dict(re.findall(r"(width|height):([\d.]+)pt", style))
+            width = float(sizes["width"]) if "width" in sizes else None
+            height = float(sizes["height"]) if "height" in sizes else None
+
+        image_part = part.related_parts.get(rel_id) if rel_id else None
+        if image_part is None:
+            return None
+        encoded = base64.b64encode(image_part.blob).decode("ascii")
+        return {
+            "imageString": f"data:{image_part.content_type};base64,{encoded}",
+            "width": width or 0,
+            "height": height or 0,
+            "isInlineImage": True,
+        }
+
+    # -- Tablolar ------------------------------------------------------
+
+    def table(self, tbl, part) -> Dict[str, Any]:
+        tblPr = _child(tbl, "w:tblPr")
+        grid = [_points(_attr(col, "w:w")) or 0
+                for col in _child(tbl, "w:tblGrid").iterchildren(qn("w:gridCol"))] \
+            if _child(tbl, "w:tblGrid") is not None else []
+
+        rows = [tr for tr in tbl.iterchildren(qn("w:tr"))]
+
+        # Hücrelerin ızgara sütunlarını ve dikey birleştirmelerini çıkar
+        layout = []
+        for tr in rows:
+            trPr = _child(tr, "w:trPr")
+            column = int(_val(trPr, "w:gridBefore") or 0)
+            cells = []
+            for tc in tr.iterchildren(qn("w:tc")):
+                tcPr = _child(tc, "w:tcPr")
+                span = int(_val(tcPr, "w:gridSpan") or 1)
+                v_merge = _child(tcPr, "w:vMerge")
+                merge = None
+                if v_merge is not None:
+                    merge = "restart" if _attr(v_merge, "w:val") == "restart" else "continue"
+                cells.append((tc, column, span, merge))
+                column += span
+            layout.append(cells)
+
+        def row_span(row_index: int, column: int) -> int:
+            span = 1
+            for cells in layout[row_index + 1:]:
+                if not any(c == column and merge == "continue" for _, c, _, merge in cells):
+                    break
+                span += 1
+            return span
+
+        table_borders = borders(_child(tblPr, "w:tblBorders"))
+        if not table_borders:
+            table_borders = self.table_style_borders(_val(tblPr, "w:tblStyle"))
+
+        sfdt_rows = []
+        for row_index, (tr, cells) in enumerate(zip(rows, layout)):
+            trPr = _child(tr, "w:trPr")
+            sfdt_cells = []
+            for tc, column, span, merge in cells:
+                if merge == "continue":
+                    continue
+                tcPr = _child(tc, "w:tcPr")
+                width = sum(grid[column:column + span]) if column + span <= len(grid) else None
+                if not width:
+                    width = _points(_attr(_child(tcPr, "w:tcW"), "w:w")) or 0
+                cell_format: Dict[str, Any] = {
+                    "columnSpan": span,
+                    "rowSpan": row_span(row_index, column) if merge == "restart" else 1,
+                    "preferredWidth": width,
+                    "preferredWidthType": "Point",
+                    "cellWidth": width,
+                    "verticalAlignment": {"center": "Center", "bottom": "Bottom"}.get(
+                        _val(tcPr, "w:vAlign") or "", "Top"),
+                    "borders": borders(_child(tcPr, "w:tcBorders")),
+                }
+                fill = _color(_attr(_child(tcPr, "w:shd"), "w:fill"))
+                if fill:
+                    cell_format["shading"] = {"backgroundColor": fill}
+                sfdt_cells.append({
+                    "columnIndex": column,
+                    "blocks": self.blocks(tc.iterchildren(), part) or [_empty_paragraph()],
+                    "cellFormat": cell_format,
+                })
+
+            row_format: Dict[str, Any] = {
+                "allowBreakAcrossPages": not _toggle(trPr, "w:cantSplit"),
+                "isHeader": bool(_toggle(trPr, "w:tblHeader")),
+            }
+            height = _child(trPr, "w:trHeight")
+            if height is not None:
+                row_format["height"] = _points(_attr(height, "w:val")) or 0
+                row_format["heightType"] = "Exactly" if _attr(height, "w:hRule") == "exact" else "AtLeast"
+            grid_before = int(_val(trPr, "w:gridBefore") or 0)
+            if grid_before:
+                row_format["gridBefore"] = grid_before
+                row_format["gridBeforeWidth"] = sum(grid[:grid_before])
+                row_format["gridBeforeWidthType"] = "Point"
+            sfdt_rows.append({"rowFormat": row_format, "cells": sfdt_cells})
+
+        table_format: Dict[str, Any] = {
+            "allowAutoFit": _attr(_child(tblPr, "w:tblLayout"), "w:type") != "fixed",
+            "leftIndent": _points(_attr(_child(tblPr, "w:tblInd"), "w:w")) or 0,
+            "tableAlignment": ALIGNMENTS.get(_val(tblPr, "w:jc") or "", "Left"),
+            "borders": table_borders,
+            "leftMargin": 5.4,
+            "rightMargin": 5.4,
+            "topMargin": 0,
+            "bottomMargin": 0,
+        }
+        margins = _child(tblPr, "w:tblCellMar")
+        if margins is not None:
+            for name, key in (("w:left", "leftMargin"), ("w:start", "leftMargin"),
+                              ("w:right", "rightMargin"), ("w:end", "rightMargin"),
+                              ("w:top", "topMargin"), ("w:bottom", "bottomMargin")):
+                value = _points(_attr(_child(margins, name), "w:w"))
+                if value is not None:
+                    table_format[key] = value
+        width = _child(tblPr, "w:tblW")
+        width_type = _attr(width, "w:type")
+        if width_type == "dxa":
+            table_format["preferredWidth"] = _points(_attr(width, "w:w")) or 0
+            table_format["preferredWidthType"] = "Point"
+        elif width_type == "pct":
+            # Yüzde değeri ya "50%" ya da 1/50 yüzde birimiyle ("2500") yazılır
+            raw = _attr(width, "w:w") or "0"
+            table_format["preferredWidth"] = float(raw[:-1]) if raw.endswith("%") else float(raw) / 50
+            table_format["preferredWidthType"] = "Percent"
+        else:
+            table_format["preferredWidthType"] = "Auto"
+
+        return {"tableFormat": table_format, "rows": sfdt_rows, "grid": grid, "columnCount": len(grid)}
+
+    def table_style_borders(self, style_id: Optional[str]) -> Dict[str, Any]:
+        """Tablo stilinden (ve temel aldığı stillerden) kenarlıklar (örn. "Table Grid")"""
+        seen = set()
+        while style_id and style_id not in seen and style_id in self.table_styles:
+            seen.add(style_id)
+            style = self.table_styles[style_id]
+            found = borders(_child(_child(style, "w:tblPr"), "w:tblBorders"))
+            if found:
+                return found
+            style_id = _val(style, "w:basedOn")
+        return {}
+
+    # -- Stiller ve listeler -------------------------------------------
+
+    def styles(self) -> List[Dict[str, Any]]:
+        result = []
+        for style in self.document.styles.element.iterchildren(qn("w:style")):
+            kind = _attr(style, "w:type")
+            if kind not in ("paragraph", "character"):
+                continue
+            style_id = _attr(style, "w:styleId")
+            entry: Dict[str, Any] = {
+                "name": self.style_names.get(style_id, style_id),
+                "type": "Paragraph" if kind == "paragraph" else "Character",
+                "characterFormat": character_format(_child(style, "w:rPr")),
+            }
+            if kind == "paragraph":
+                entry["paragraphFormat"] = paragraph_format(_child(style, "w:pPr"))
+            for name, key in (("w:basedOn", "basedOn"), ("w:next", "next"), ("w:link", "link")):
+                target = _val(style, name)
+                if target in self.style_names:
+                    entry[key] = self.style_names[target]
+            result.append(entry)
+        return result
+
+    def lists(self):
+        try:
+            numbering = self.main_part.part_related_by(RT.NUMBERING).element
+        except KeyError:
+            return [], []
+
+        abstract_lists = []
+        for abstract in numbering.iterchildren(qn("w:abstractNum")):
+            abstract_id = int(_attr(abstract, "w:abstractNumId") or 0)
+            levels = []
+            for lvl in abstract.iterchildren(qn("w:lvl")):
+                level_number = int(_attr(lvl, "w:ilvl") or len(levels))
+                pattern = LIST_PATTERNS.get(_val(lvl, "w:numFmt") or "decimal", "Arabic")
+                start = _val(lvl, "w:start")
+                restart = _val(lvl, "w:lvlRestart")
+                levels.append({
+                    "listLevelPattern": pattern,
+                    "numberFormat": _val(lvl, "w:lvlText") or "",
+                    "startAt": int(start) if start and start.isdigit() else (0 if pattern == "Bullet" else 1),
+                    "restartLevel": int(restart) - 1 if restart and restart.isdigit() else level_number,
+                    "followCharacter": {"space": "Space", "nothing": "None"}.get(_val(lvl, "w:suff") or "", "Tab"),
+                    "paragraphFormat": paragraph_format(_child(lvl, "w:pPr")),
+                    "characterFormat": character_format(_child(lvl, "w:rPr")),
+                })
+            abstract_lists.append({"abstractListId": abstract_id, "levels": levels})
+
+        lists = []
+        for num in numbering.iterchildren(qn("w:num")):
+            num_id = _attr(num, "w:numId")
+            abstract_id = _val(num, "w:abstractNumId")
+            if num_id and num_id.isdigit() and abstract_id and abstract_id.isdigit():
+                lists.append({"listId": int(num_id), "abstractListId": int(abstract_id)})
+        return lists, abstract_lists
+
+
+def docx_to_sfdt(source: Union[str, Path, BinaryIO, bytes]) -> Dict[str, Any]:
+    """
+    Word dokümanını SFDT'ye çevir
+
+    Args:
+        source: Dosya yolu, dosya nesnesi veya docx baytları
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+    return _DocxConverter(Document(source)).convert()
+
+
+# ----------------------------------------------------------------------
+# Pano (yapıştırma) dönüşümleri
+# ----------------------------------------------------------------------
+
+HTML_BLOCK_TAGS = {"p", "div", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6",
+                   "blockquote", "pre", "table", "ul", "ol", "section", "article"}
+HTML_SKIPPED_TAGS = {"script", "style", "head", "title", "xml"}
+
+
+class _HtmlToSfdt(HTMLParser):
+    """Panodaki HTML'i paragraf ve biçimli metin olarak SFDT'ye çevirir (tablolar düz metin olur)"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks: List[Dict[str, Any]] = []
+        self.inlines: List[Dict[str, Any]] = []
+        self.paragraph: Dict[str, Any] = {}
+        self.formats: List[Dict[str, Any]] = [{}]
+        self.tags: List[str] = []
+        self.skip = 0
+        self.pre = 0
+
+    def _flush(self):
+        if self.inlines or self.paragraph:
+            self.blocks.append({"paragraphFormat": self.paragraph, "characterFormat": {},
+                                "inlines": self.inlines})
+        self.inlines = []
+        self.paragraph = {}
+
+    def _style_format(self, style: str) -> Dict[str, Any]:
+        fmt: Dict[str, Any] = {}
+        for declaration in style.split(";"):
+            if ":" not in declaration:
+                continue
+            name, value = (part.strip().lower() for part in declaration.split(":", 1))
+            if name == "font-weight" and (value == "bold" or value.isdigit() and int(value) >= 600):
+                fmt["bold"] = True
+            elif name == "font-style" and value == "italic":
+                fmt["italic"] = True
+            elif name == "text-decoration" and "underline" in value:
+                fmt["underline"] = "Single"
+            elif name == "text-decoration" and "line-through" in value:
+                fmt["strikethrough"] = "SingleStrike"
+            elif name == "font-size":
+                match = re.match(r"([\d.]+)(pt|px)", value)
+                if match:
+                    size = float(match.group(1))
+                    fmt["fontSize"] = size if match.group(2) == "pt" else round(size * 0.75, 1)
+            elif name == "font-family":
+                fmt["fontFamily"] = value.split(",")[0].strip("'\" ").title()
+            elif name == "color":
+                match = re.fullmatch(r"#([0-9a-f]{6})", value)
+                rgb = re.fullmatch(r"rgb\((\d+),\s*(\d+),\s*(\d+)\)", value)
+                if match:
+                    fmt["fontColor"] = f"#{match.group(1).upper()}"
+                elif rgb:
+                    fmt["fontColor"] = "#" + "".join(f"{int(c):02X}" for c in rgb.groups())
+            elif name == "text-align" and value in ("left", "center", "right", "justify"):
+                self.paragraph["textAlignment"] = value.title()
+        return fmt
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in HTML_SKIPPED_TAGS:
+            self.skip += 1
+            return
+        if tag == "br":
+            self.inlines.append({"characterFormat": dict(self.formats[-1]), "text": "\v"})
+            return
+        if tag in ("img", "meta", "link", "hr", "input", "col"):
+            return
+        if tag in HTML_BLOCK_TAGS:
+            self._flush()
+            if tag[0] == "h" and tag[1:].isdigit():
+                self.paragraph["styleName"] = f"Heading {tag[1:]}"
+        if tag == "pre":
+            self.pre += 1
+
+        fmt = dict(self.formats[-1])
+        if tag in ("b", "strong"):
+            fmt["bold"] = True
+        elif tag in ("i", "em"):
+            fmt["italic"] = True
+        elif tag == "u":
+            fmt["underline"] = "Single"
+        elif tag in ("s", "strike", "del"):
+            fmt["strikethrough"] = "SingleStrike"
+        elif tag == "sup":
+            fmt["baselineAlignment"] = "Superscript"
+        elif tag == "sub":
+            fmt["baselineAlignment"] = "Subscript"
+        fmt.update(self._style_format(attrs.get("style") or ""))
+        self.formats.append(fmt)
+        self.tags.append(tag)
+
+    def handle_endtag(self, tag):
+        if tag in HTML_SKIPPED_TAGS:
+            self.skip = max(self.skip - 1, 0)
+            return
+        if tag not in self.tags:
+            return
+        # Kapanmamış iç etiketleri de kapat
+        while self.tags:
+            open_tag = self.tags.pop()
+            self.formats.pop()
+            if open_tag == tag:
+                break
+        if tag in ("td", "th"):
+            self.inlines.append({"characterFormat": {}, "text": "\t"})
+        if tag == "pre":
+            self.pre = max(self.pre - 1, 0)
+        if tag in HTML_BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if self.skip:
+            return
+        if not self.pre:
+            data = re.sub(r"\s+", " ", data)
+            if not self.inlines:
+                data = data.lstrip()
+        if data:
+            self.inlines.append({"characterFormat": dict(self.formats[-1]), "text": data})
+
+    def result(self) -> List[Dict[str, Any]]:
+        self._flush()
+        return self.blocks
+
+
+def _rtf_to_text(rtf: str) -> str:
+    """RTF'den düz metin (biçim atılır; Türkçe karakterler için cp1254 kod sayfası)"""
+    out: List[str] = []
+    skip_depth: List[int] = []
+    depth = 0
+    ignorable = {"fonttbl", "colortbl", "stylesheet", "info", "pict", "themedata",
+                 "colorschememapping", "latentstyles", "datastore", "listtable", "listoverridetable"}
+    token = re.compile(r"\\([a-zA-Z]+)(-?\d+)? ?|\\'([0-9a-fA-F]{2})|\\([^a-zA-Z])|([{}])|([^\\{}]+)", re.S)
+    pending_skip = False
+    for match in token.finditer(rtf):
+        word, arg, hex_char, symbol, brace, text = match.groups()
+        if brace == "{":
+            depth += 1
+            continue
+        if brace == "}":
+            if skip_depth and skip_depth[-1] == depth:
+                skip_depth.pop()
+            depth -= 1
+            continue
+        if symbol == "*":
+            pending_skip = True
+            continue
+        if word and (pending_skip or word in ignorable):
+            if not skip_depth or skip_depth[-1] != depth:
+                skip_depth.append(depth)
+            pending_skip = False
+            continue
+        pending_skip = False
+        if skip_depth:
+            continue
+        if word in ("par", "line"):
+            out.append("\n")
+        elif word == "tab":
+            out.append("\t")
+        elif word == "u" and arg:
+            out.append(chr(int(arg) % 65536))
+        elif hex_char:
+            out.append(bytes([int(hex_char, 16)]).decode("cp1254", errors="replace"))
+        elif symbol in ("\\", "{", "}"):
+            out.append(symbol)
+        elif text:
+            out.append(text.replace("\r", "").replace("\n", ""))
+    return "".join(out)
+
+
+def clipboard_to_sfdt(content: str, content_type: str) -> Dict[str, Any]:
+    """
+    Editörün panodan yapıştırdığı içeriği SFDT'ye çevir
+
+    content_type: ".html", ".rtf" veya düz metin için başka bir değer
+    """
+    if content_type == ".html":
+        parser = _HtmlToSfdt()
+        parser.feed(content)
+        parser.close()
+        blocks = parser.result()
+    else:
+        text = _rtf_to_text(content) if content_type == ".rtf" else content
+        blocks = [
+            {"paragraphFormat": {}, "characterFormat": {},
+             "inlines": [{"characterFormat": {}, "text": line}] if line else []}
+            for line in text.replace("\r\n", "\n").split("\n")
+        ]
+    return {
+        "sections": [{
+            "sectionFormat": dict(DEFAULT_SECTION_FORMAT),
+            "blocks": blocks or [_empty_paragraph()],
+            "headersFooters": {},
+        }],
+        "characterFormat": {},
+        "paragraphFormat": {},
+        "styles": [],
+        "lists": [],
+        "abstractLists": [],
+    }
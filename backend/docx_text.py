@@ -0,0 +1,351 @@
+"""
+DOCX Text - Word dosyalarını python-docx nesne ağacı kurmadan okuma
+word/document.xml zip içinden iterparse ile tek geçişte okunur; gövdedeki her
+paragraf ve tablo kapandığı anda işlenip bellekten atılır. python-docx'te
+para.runs[0] ve cell.paragraphs her erişimde XML'i yeniden dolaşır, birleştirilmiş
+hücreler de kapladıkları her ızgara sütunu için tekrar okunur; burada her
+eleman bir kez okunur.
+
+Görüntüleyici (read_word), arama (search_in_word) ve indeksleyici aynı okuyucuyu
+kullanır. read_docx çıktısı python-docx ile üretilen eski çıktıyla birebir aynıdır.
+"""
+
+import posixpath
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from docx.styles import BabelFish
+from lxml import etree
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+R_ID = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+
+BODY = W + 'body'
+P = W + 'p'
+TBL = W + 'tbl'
+TR = W + 'tr'
+TC = W + 'tc'
+R = W + 'r'
+HYPERLINK = W + 'hyperlink'
+PPR = W + 'pPr'
+RPR = W + 'rPr'
+TCPR = W + 'tcPr'
+TRPR = W + 'trPr'
+VAL = W + 'val'
+
+# Run içeriği -> metin (python-docx CT_R.text ile aynı eşleme)
+RUN_TEXT = {
+    W + 'tab': '\t',
+    W + 'ptab': '\t',
+    W + 'cr': '\n',
+    W + 'noBreakHyphen': '-',
+}
+
+# w:jc -> python-docx WD_PARAGRAPH_ALIGNMENT metni (LEFT yazılmaz, değeri 0'dır)
+ALIGNMENTS = {
+    'center': 'CENTER (1)',
+    'right': 'RIGHT (2)',
+    'end': 'RIGHT (2)',
+    'both': 'JUSTIFY (3)',
+    'distribute': 'DISTRIBUTE (4)',
+    'mediumKashida': 'JUSTIFY_MED (5)',
+    'highKashida': 'JUSTIFY_HI (7)',
+    'lowKashida': 'JUSTIFY_LOW (8)',
+    'thaiDistribute': 'THAI_JUSTIFY (9)',
+}
+
+ON_VALUES = {'1', 'true', 'on'}
+
+
+def _resolve(base_dir: str, target: str) -> str:
+    if target.startswith('/'):
+        return target.lstrip('/')
+    return posixpath.normpath(posixpath.join(base_dir, target))
+
+
+def package_parts(z: zipfile.ZipFile) -> Tuple[str, Optional[str]]:
+    """Ana doküman ve stil parçalarının yolları"""
+    names = set(z.namelist())
+    document = 'word/document.xml'
+    if '_rels/.rels' in names:
+        for rel in etree.fromstring(z.read('_rels/.rels')):
+            if rel.get('Type', '').endswith('/officeDocument') and rel.get('Target'):
+                document = _resolve('', rel.get('Target'))
+                break
+
+    styles = None
+    document_dir, document_name = posixpath.split(document)
+    rels_path = posixpath.join(document_dir, '_rels', document_name + '.rels')
+    if rels_path in names:
+        for rel in etree.fromstring(z.read(rels_path)):
+            if rel.get('Type', '').endswith('/styles') and rel.get('Target'):
+                styles = _resolve(document_dir, rel.get('Target'))
+                break
+    if styles not in names:
+        styles = None
+    return document, styles
+
+
+def paragraph_styles(z: zipfile.ZipFile, path: Optional[str]) -> Tuple[Dict[str, Optional[str]], Optional[str]]:
+    """
+    Paragraf stilleri: {stil kimliği: görünen ad} ve varsayılan stilin adı
+
+    Stili olmayan veya paragraf stili bulunamayan paragraflar varsayılan stili
+    alır; varsayılan stil de yoksa ad "Normal" kabul edilir.
+    """
+    names: Dict[str, Optional[str]] = {}
+    default = 'Normal'
+    if not path:
+        return names, default
+
+    for style in etree.fromstring(z.read(path)).iterchildren(W + 'style'):
+        if style.get(W + 'type') != 'paragraph':
+            continue
+        name_el = style.find(W + 'name')
+        raw_name = name_el.get(VAL) if name_el is not None else None
+        name = BabelFish.internal2ui(raw_name) if raw_name is not None else None
+        style_id = style.get(W + 'styleId')
+        if style_id is not None and style_id not in names:
+            names[style_id] = name
+        if (style.get(W + 'default') or '').lower() in ON_VALUES:
+            default = name
+    return names, default
+
+
+def _iter_body(z: zipfile.ZipFile, document: str) -> Iterator[etree._Element]:
+    """
+    Gövdenin doğrudan çocuğu olan paragraf ve tabloları sırayla üret
+
+    Eleman üretildikten sonra bırakılır; tüketici onu saklamamalıdır.
+    """
+    with z.open(document) as f:
+        depth = 0
+        for event, elem in etree.iterparse(f, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                continue
+            depth -= 1
+            # document (0) > body (1) > paragraf/tablo (2)
+            if depth == 2:
+                if elem.tag in (P, TBL):
+                    yield elem
+                elem.clear(keep_tail=True)
+                parent = elem.getparent()
+                while elem.getprevious() is not None:
+                    del parent[0]
+
+
+# ----------------------------------------------------------------------
+# Eleman okuyucular
+# ----------------------------------------------------------------------
+
+def run_text(r) -> str:
+    parts = []
+    for child in r:
+        tag = child.tag
+        if tag == W + 't':
+            parts.append(child.text or '')
+        elif tag in RUN_TEXT:
+            parts.append(RUN_TEXT[tag])
+        elif tag == W + 'br':
+            # Sadece satır sonu metindir; sayfa/sütun sonu boş
+            if child.get(W + 'type', 'textWrapping') == 'textWrapping':
+                parts.append('\n')
+    return ''.join(parts)
+
+
+def paragraph_text(p) -> str:
+    """Paragraf metni (doğrudan run'lar ve köprülerdeki run'lar)"""
+    parts = []
+    for child in p:
+        if child.tag == R:
+            parts.append(run_text(child))
+        elif child.tag == HYPERLINK:
+            parts.extend(run_text(r) for r in child.iterchildren(R))
+    return ''.join(parts)
+
+
+def cell_text(tc) -> str:
+    return '\n'.join(paragraph_text(p) for p in tc.iterchildren(P))
+
+
+def _on(rPr, name: str) -> bool:
+    el = rPr.find(W + name) if rPr is not None else None
+    if el is None:
+        return False
+    value = el.get(VAL)
+    return value is None or value in ON_VALUES
+
+
+def run_format(r, underline: bool) -> Dict[str, Any]:
+    """İlk run'un biçimi (read_word formatında)"""
+    rPr = r.find(RPR)
+
+    fmt: Dict[str, Any] = {
+        "bold": _on(rPr, 'b'),
+        "italic": _on(rPr, 'i'),
+    }
+    if underline:
+        u = rPr.find(W + 'u') if rPr is not None else None
+        value = u.get(VAL) if u is not None else None
+        fmt["underline"] = value is not None and value != 'none'
+
+    size = None
+    sz = rPr.find(W + 'sz') if rPr is not None else None
+    value = sz.get(VAL) if sz is not None else None
+    if value:
+        try:
+            size = float(value[:-2]) if value.endswith('pt') else int(value) / 2
+        except ValueError:
+            size = None
+    fmt["font_size"] = size or None
+
+    fonts = rPr.find(W + 'rFonts') if rPr is not None else None
+    fmt["font_name"] = (fonts.get(W + 'ascii') if fonts is not None else None) or None
+
+    color = rPr.find(W + 'color') if rPr is not None else None
+    value = color.get(VAL) if color is not None else None
+    fmt["font_color"] = value.upper() if value and value != 'auto' else "None"
+    return fmt
+
+
+def _grid_span(tc) -> int:
+    tcPr = tc.find(TCPR)
+    span = tcPr.find(W + 'gridSpan') if tcPr is not None else None
+    try:
+        return int(span.get(VAL)) if span is not None else 1
+    except (TypeError, ValueError):
+        return 1
+
+
+def _is_merge_continue(tc) -> bool:
+    """Dikey birleştirmenin devam hücresi mi (val yoksa varsayılan 'continue')"""
+    tcPr = tc.find(TCPR)
+    merge = tcPr.find(W + 'vMerge') if tcPr is not None else None
+    return merge is not None and merge.get(VAL, 'continue') == 'continue'
+
+
+def _grid_before(tr) -> int:
+    trPr = tr.find(TRPR)
+    before = trPr.find(W + 'gridBefore') if trPr is not None else None
+    try:
+        return int(before.get(VAL)) if before is not None else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def iter_table_rows(tbl) -> Iterator[List[Any]]:
+    """
+    Tablonun satırlarını python-docx row.cells ile aynı düzende üret
+
+    Her satır hücre elemanlarının (tc) listesidir: yatay birleştirilmiş hücre
+    kapladığı sütun sayısı kadar, dikey birleştirmenin devam hücresi üstteki
+    kök hücre olarak tekrarlanır. Aynı tc aynı nesnedir (içerik bir kez okunur).
+    """
+    previous: Optional[Dict[int, Any]] = None
+    for tr in tbl.iterchildren(TR):
+        offsets: Dict[int, Any] = {}
+        row: List[Any] = []
+        offset = _grid_before(tr)
+        for tc in tr.iterchildren(TC):
+            span = _grid_span(tc)
+            root = tc
+            if _is_merge_continue(tc) and previous is not None and offset in previous:
+                root = previous[offset]
+            offsets[offset] = root
+            row.extend([root] * _grid_span(root))
+            offset += span
+        previous = offsets
+        yield row
+
+
+# ----------------------------------------------------------------------
+# Kullanıcılar
+# ----------------------------------------------------------------------
+
+def read_paragraph(p, styles: Dict[str, Optional[str]], default_style: Optional[str]) -> Dict[str, Any]:
+    pPr = p.find(PPR)
+    style_el = pPr.find(W + 'pStyle') if pPr is not None else None
+    style_id = style_el.get(VAL) if style_el is not None else None
+    para_data: Dict[str, Any] = {
+        "text": paragraph_text(p),
+        "style": styles[style_id] if style_id in styles else default_style
+    }
+
+    first_run = p.find(R)
+    if first_run is not None:
+        # İlk run'un formatını al (genelde tüm paragraph aynı formatta)
+        para_data["format"] = run_format(first_run, underline=True)
+        jc = pPr.find(W + 'jc') if pPr is not None else None
+        alignment = ALIGNMENTS.get(jc.get(VAL)) if jc is not None else None
+        if alignment:
+            para_data["alignment"] = alignment
+    return para_data
+
+
+def read_table(tbl) -> List[List[Dict[str, Any]]]:
+    # Anahtar elemanın kendisi: id() kullanılsaydı serbest kalan satırların
+    # eleman vekillerinin id'leri sonraki hücrelere verilebilirdi
+    cells: Dict[Any, Dict[str, Any]] = {}
+    table_data = []
+    for row in iter_table_rows(tbl):
+        row_data = []
+        for tc in row:
+            cell_data = cells.get(tc)
+            if cell_data is None:
+                cell_data = {"text": cell_text(tc)}
+                first_para = tc.find(P)
+                first_run = first_para.find(R) if first_para is not None else None
+                if first_run is not None:
+                    cell_data["format"] = run_format(first_run, underline=False)
+                cells[tc] = cell_data
+            row_data.append(cell_data)
+        table_data.append(row_data)
+    return table_data
+
+
+def read_docx(file_path: Path) -> Dict[str, Any]:
+    """Word dosyasını oku ve JSON formatına çevir - stil bilgileriyle birlikte"""
+    paragraphs = []
+    tables = []
+
+    with zipfile.ZipFile(file_path) as z:
+        document, styles_path = package_parts(z)
+        styles, default_style = paragraph_styles(z, styles_path)
+        for elem in _iter_body(z, document):
+            if elem.tag == P:
+                paragraphs.append(read_paragraph(elem, styles, default_style))
+            else:
+                tables.append(read_table(elem))
+
+    return {
+        "type": "word",
+        "filename": file_path.name,
+        "paragraphs": paragraphs,
+        "tables": tables
+    }
+
+
+def iter_docx_text(file_path: Path) -> Iterator[str]:
+    """
+    Gövdedeki paragraf ve tablo hücresi metinlerini üret (arama/indeksleme için)
+
+    Birleştirilmiş hücreler bir kez üretilir.
+    """
+    with zipfile.ZipFile(file_path) as z:
+        document, _ = package_parts(z)
+        for elem in _iter_body(z, document):
+            if elem.tag == P:
+                yield paragraph_text(elem)
+            else:
+                for tr in elem.iterchildren(TR):
+                    for tc in tr.iterchildren(TC):
+                        if not _is_merge_continue(tc):
+                            yield cell_text(tc)
+
+
+def docx_contains(file_path: Path, query: str) -> bool:
+    """Paragraf veya hücre metinlerinden biri sorguyu içeriyor mu (ilk eşleşmede durur)"""
+    query = query.lower()
+    return any(query in text.lower() for text in iter_docx_text(file_path))
@@ -0,0 +1,708 @@
+"""
+File Index - Firma dosyaları için bellekte katalog
+Firma klasörleri başlangıçta bir kez taranır; her dosyanın adı, boyutu,
+değişiklik zamanı, uzantısı ve iş emri klasörü bellekte tutulur. Dosya adına
+göre arama ve firma/dosya listeleri diske gitmeden bu katalogdan verilir.
+Katalog kaydetme/silme/yeniden adlandırma endpoint'leri ve (watchfiles
+kuruluysa) dosya sistemi izleyicisi ile artımlı olarak güncellenir; her
+değişiklik firmanın nesil (generation) sayacını artırır, listeler bu sayaçtan
+türetilen ETag ile sunulur. Aynı ad farklı iş emri klasörlerinde bulunabilir;
+bu durumda yol belirtilmeden yapılan arama 409 döner.
+"""
+
+import base64
+import bisect
+import json
+import os
+import posixpath
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException
+
+from fs_walk import FileRecord, scan_dir, stat_record
+
+try:
+    from watchfiles import Change, watch
+except ImportError:  # İzleyici opsiyonel - endpoint bildirimleri yine çalışır
+    Change = None
+    watch = None
+
+COMPANIES_DIR = Path("firmalar")
+
+# Dış değişiklikler (Explorer'dan kopyalama vb.) için dosya sistemi izleyicisi
+FILE_INDEX_WATCH = os.getenv("FILE_INDEX_WATCH", "1") == "1"
+# İzleyici yokken firma listesinin (kök klasör) en sık kontrol aralığı (saniye)
+FILE_INDEX_ROOT_CHECK_INTERVAL = float(os.getenv("FILE_INDEX_ROOT_CHECK_INTERVAL", "2"))
+
+
+class AmbiguousFileError(HTTPException):
+    """Aynı isimde birden fazla firma dosyası var - istemci yolu (path) belirtmeli"""
+
+    def __init__(self, filename: str, paths: List[str]):
+        super().__init__(
+            status_code=409,
+            detail=f"'{filename}' adında birden fazla dosya var ({', '.join(paths)}), lütfen yolu (path) belirtin"
+        )
+        self.paths = paths
+
+
+def _parent(rel: str) -> str:
+    """Firma içi göreli yolun klasörü (firma kökü için '')"""
+    return posixpath.dirname(rel)
+
+
+def _under(rel: str, rel_dir: str) -> bool:
+    return rel == rel_dir or rel.startswith(rel_dir + '/')
+
+
+SORT_FIELDS = ("path", "mtime", "name")
+MAX_PAGE_SIZE = 1000
+_MAX_CHAR = '\U0010ffff'
+
+
+class ListingQuery(NamedTuple):
+    """Dosya listesi sorgusu (filtreler None ise uygulanmaz)"""
+    sort: str = "path"                     # path | mtime | name
+    order: str = "asc"                     # asc | desc
+    limit: Optional[int] = None            # None: tüm eşleşenler
+    cursor: Optional[str] = None           # Önceki sayfanın next_cursor değeri
+    extensions: Optional[frozenset] = None  # {".xlsx", ".docx"}
+    subfolder: Optional[str] = None        # İş emri klasörü ("" = sadece firma kökü)
+    name_prefix: Optional[str] = None      # Küçük harf
+    modified_from: Optional[float] = None  # Unix zamanı (dahil)
+    modified_to: Optional[float] = None
+
+    @property
+    def filtered(self) -> bool:
+        return any(value is not None for value in (
+            self.extensions, self.subfolder, self.name_prefix, self.modified_from, self.modified_to
+        ))
+
+
+class _ListingIndex:
+    """
+    (firma, göreli yol) kayıtları için sıralı anahtar listeleri
+
+    Her sıralama alanı için bir liste bisect ile güncel tutulur; bir sayfa
+    sorgusu aralığın başına ikili aramayla gider, arşivin tamamını dolaşmaz.
+    """
+
+    def __init__(self):
+        self.keys: Dict[str, List[tuple]] = {sort: [] for sort in SORT_FIELDS}
+
+    @staticmethod
+    def _keys(company: str, record: Dict[str, Any]) -> Dict[str, tuple]:
+        rel = record["full_path"]
+        return {
+            "path": (company, rel),
+            "mtime": (record["mtime"], company, rel),
+            "name": (record["name"].lower(), company, rel),
+        }
+
+    def add(self, company: str, record: Dict[str, Any]):
+        for sort, key in self._keys(company, record).items():
+            bisect.insort(self.keys[sort], key)
+
+    def remove(self, company: str, record: Dict[str, Any]):
+        for sort, key in self._keys(company, record).items():
+            keys = self.keys[sort]
+            idx = bisect.bisect_left(keys, key)
+            if idx < len(keys) and keys[idx] == key:
+                del keys[idx]
+
+    def scan(self, query: "ListingQuery", company: Optional[str]) -> Iterator[tuple]:
+        """
+        Sorgunun sıralamasına göre anahtarları üret (imleçten sonrası)
+
+        Sıralama alanına denk gelen filtre (mtime için tarih aralığı, name
+        için ad öneki) aralık olarak uygulanır; path sıralamasında aralık
+        firmayla sınırlanır.
+        """
+        keys = self.keys[query.sort]
+
+        if query.sort == "path":
+            low = (company,) if company is not None else ()
+            high = (company, _MAX_CHAR) if company is not None else (_MAX_CHAR,)
+        elif query.sort == "mtime":
+            low = (query.modified_from,) if query.modified_from is not None else ()
+            high = (query.modified_to, _MAX_CHAR) if query.modified_to is not None else (float('inf'),)
+        else:
+            prefix = query.name_prefix or ""
+            low = (prefix,)
+            high = (prefix + _MAX_CHAR,)
+
+        start = bisect.bisect_left(keys, low)
+        end = bisect.bisect_left(keys, high)
+
+        cursor_key = _decode_cursor(query)
+        if query.order == "asc":
+            if cursor_key is not None:
+                start = max(start, bisect.bisect_right(keys, cursor_key))
+            for idx in range(start, end):
+                yield keys[idx]
+        else:
+            if cursor_key is not None:
+                end = min(end, bisect.bisect_left(keys, cursor_key))
+            for idx in range(end - 1, start - 1, -1):
+                yield keys[idx]
+
+
+# Sıralama alanına göre anahtar elemanlarının türleri (_ListingIndex._keys)
+_CURSOR_KEY_TYPES = {
+    "path": (str, str),
+    "mtime": ((int, float), str, str),
+    "name": (str, str, str),
+}
+
+
+def _encode_cursor(query: ListingQuery, key: tuple) -> str:
+    raw = json.dumps([query.sort, query.order, list(key)], ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(query: ListingQuery) -> Optional[tuple]:
+    if not query.cursor:
+        return None
+    try:
+        padded = query.cursor + "=" * (-len(query.cursor) % 4)
+        sort, order, key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Geçersiz cursor")
+    if sort != query.sort or order != query.order:
+        raise HTTPException(status_code=400, detail="Cursor farklı bir sıralamaya ait")
+    # Anahtar, sıralama listesindeki anahtarlarla karşılaştırılabilir olmalı
+    types = _CURSOR_KEY_TYPES[query.sort]
+    if (not isinstance(key, list) or len(key) != len(types)
+            or any(isinstance(value, bool) or not isinstance(value, kind) for value, kind in zip(key, types))):
+        raise HTTPException(status_code=400, detail="Geçersiz cursor")
+    return tuple(key)
+
+
+def _matches(record: Dict[str, Any], query: ListingQuery) -> bool:
+    if query.extensions is not None and record["extension"].lower() not in query.extensions:
+        return False
+    if query.subfolder is not None:
+        # Kayıttaki iş emri klasörüyle aynı tanım (dosyanın bulunduğu klasörün adı)
+        if (record["subfolder"] or "") != query.subfolder:
+            return False
+    if query.name_prefix is not None and not record["name"].lower().startswith(query.name_prefix):
+        return False
+    if query.modified_from is not None and record["mtime"] < query.modified_from:
+        return False
+    if query.modified_to is not None and record["mtime"] > query.modified_to:
+        return False
+    return True
+
+
+class _Company:
+    """Tek firmanın katalog kaydı"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.files: Dict[str, Dict[str, Any]] = {}   # göreli yol -> dosya bilgisi
+        self.by_name: Dict[str, List[str]] = {}      # dosya adı -> göreli yollar
+        self.dirs: Dict[str, int] = {}               # göreli klasör -> mtime_ns
+        self.index = _ListingIndex()
+        self.root_count = 0                          # Doğrudan firma klasöründeki dosyalar
+        self.generation = 0
+
+
+class CompanyFileIndex:
+    """
+    Firma -> dosyalar kataloğu
+
+    Yollar firma klasörüne göredir (örn. "SM-128/BAYKAR_F.02.xlsx") ve
+    /companies/{firma}/files listesindeki full_path ile aynı biçimdedir.
+    """
+
+    def __init__(self, root: Path = COMPANIES_DIR):
+        self.root = Path(root)
+        self.watching = False
+
+        self._companies: Dict[str, _Company] = {}
+        # Tüm firmaların doğrudan firma klasöründeki dosyaları (/all-company-files)
+        self._root_index = _ListingIndex()
+        self._root_mtime: Optional[int] = None
+        self._root_checked = 0.0
+        self._generation = 0
+        # Süreç yeniden başladığında eski ETag'ler geçersiz olsun
+        self._token = uuid.uuid4().hex[:8]
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Yaşam döngüsü
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Tüm firmaları tara ve (mümkünse) izleyiciyi başlat"""
+        self.rebuild()
+
+        if FILE_INDEX_WATCH and watch is not None and not (self._thread and self._thread.is_alive()):
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="file-index-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5)
+        self._thread = None
+        self.watching = False
+
+    def rebuild(self):
+        with self._lock:
+            self._companies = {}
+            self._root_index = _ListingIndex()
+            self._refresh_root()
+            print(f"[FILE INDEX] {len(self._companies)} firma, "
+                  f"{sum(len(c.files) for c in self._companies.values())} dosya kataloglandı")
+
+    def _bump(self, company: _Company):
+        self._generation += 1
+        company.generation = self._generation
+
+    def _refresh_root(self):
+        """Firma klasörlerini yeniden listele: yeni firmalar taranır, silinenler çıkarılır"""
+        try:
+            self._root_checked = time.monotonic()
+            self._root_mtime = os.stat(self.root).st_mtime_ns
+            names = set(scan_dir(self.root, stat=False)[1])
+        except FileNotFoundError:
+            self._root_mtime = None
+            names = set()
+
+        for name in list(self._companies):
+            if name not in names:
+                self._discard_company(name)
+        for name in names:
+            if name not in self._companies:
+                company = _Company(name)
+                self._scan_tree(company, name, '')
+                self._companies[name] = company
+                self._bump(company)
+
+    def _scan_tree(self, company: _Company, name: str, rel_dir: str):
+        """Klasörü alt klasörleriyle birlikte kataloğa ekle"""
+        pending = [rel_dir]
+        while pending:
+            current = pending.pop()
+            dir_path = self.root / name / current if current else self.root / name
+            try:
+                mtime_ns = os.stat(dir_path).st_mtime_ns
+                files, subdirs = scan_dir(dir_path, current)
+            except FileNotFoundError:
+                company.dirs.pop(current, None)
+                continue
+
+            company.dirs[current] = mtime_ns
+            for record in files:
+                self._put(company, record)
+            pending.extend(subdirs)
+
+    def _refresh_dir(self, company: _Company, name: str, rel_dir: str):
+        """
+        Tek klasörü yeniden listele (artımlı)
+
+        Doğrudan içerdiği dosyalar güncellenir, yeni alt klasörler taranır,
+        kaybolan dosya ve alt klasörler katalogdan çıkarılır.
+        """
+        dir_path = self.root / name / rel_dir if rel_dir else self.root / name
+        try:
+            mtime_ns = os.stat(dir_path).st_mtime_ns
+            files, subdirs = scan_dir(dir_path, rel_dir)
+        except FileNotFoundError:
+            self._drop_tree(company, rel_dir)
+            return
+
+        seen_files = set()
+        for record in files:
+            seen_files.add(record.rel)
+            self._put(company, record)
+        for sub in subdirs:
+            if sub not in company.dirs:
+                self._scan_tree(company, name, sub)
+
+        seen_dirs = set(subdirs)
+        for rel in [r for r in company.files if _parent(r) == rel_dir and r not in seen_files]:
+            self._drop(company, rel)
+        for sub in [d for d in company.dirs if d and _parent(d) == rel_dir and d not in seen_dirs]:
+            self._drop_tree(company, sub)
+
+        company.dirs[rel_dir] = mtime_ns
+        self._bump(company)
+
+    def _revalidate(self, company_name: Optional[str] = None):
+        """
+        İzleyici yokken dış değişiklikleri yakala: sadece klasörlerin mtime'ı kontrol edilir,
+        değişen klasörler yeniden listelenir (dosyalar tek tek stat edilmez)
+
+        Args:
+            company_name: Sadece bu firmanın klasörleri kontrol edilir. None ise firma
+                listesi ve her firmanın kök klasörü kontrol edilir (firma listeleri
+                yalnızca kökteki dosyaları içerir).
+        """
+        if self.watching:
+            return
+
+        if company_name is None:
+            self._revalidate_root()
+            for name, company in list(self._companies.items()):
+                self._revalidate_dirs(company, name, [''])
+            return
+
+        company = self._companies.get(company_name)
+        if company is None:
+            # Dışarıdan oluşturulmuş firma klasörü olabilir
+            self._revalidate_root()
+            return
+        self._revalidate_dirs(company, company_name, list(company.dirs))
+
+    def _revalidate_root(self):
+        """Firma klasörleri listesini kontrol et (en fazla FILE_INDEX_ROOT_CHECK_INTERVAL saniyede bir)"""
+        if time.monotonic() - self._root_checked < FILE_INDEX_ROOT_CHECK_INTERVAL:
+            return
+        try:
+            root_mtime = os.stat(self.root).st_mtime_ns
+        except FileNotFoundError:
+            root_mtime = None
+        if root_mtime != self._root_mtime:
+            self._refresh_root()
+        self._root_checked = time.monotonic()
+
+    def _revalidate_dirs(self, company: _Company, name: str, rel_dirs: List[str]):
+        for rel_dir in rel_dirs:
+            if rel_dir not in company.dirs:
+                continue  # Üst klasörle birlikte çıkarıldı
+            dir_path = self.root / name / rel_dir if rel_dir else self.root / name
+            try:
+                changed = os.stat(dir_path).st_mtime_ns != company.dirs[rel_dir]
+            except FileNotFoundError:
+                changed = True
+            if changed:
+                self._refresh_dir(company, name, rel_dir)
+        if not company.dirs:
+            # Firma klasörü silinmiş
+            self._discard_company(name)
+
+    # ------------------------------------------------------------------
+    # Katalog kayıtları
+    # ------------------------------------------------------------------
+
+    def _put(self, company: _Company, record: FileRecord):
+        rel = record.rel
+        parent = record.parent
+        previous = company.files.get(rel)
+        if previous is not None:
+            self._unindex(company, previous)
+
+        entry = {
+            "name": record.name,
+            "size": record.size,
+            "mtime": record.mtime,
+            "extension": record.extension,
+            "subfolder": posixpath.basename(parent) if parent else None,  # İş emri no klasörü
+            "full_path": rel
+        }
+        company.files[rel] = entry
+        company.index.add(company.name, entry)
+        if not parent:
+            company.root_count += 1
+            self._root_index.add(company.name, entry)
+
+        paths = company.by_name.setdefault(record.name, [])
+        if rel not in paths:
+            paths.append(rel)
+            paths.sort()
+
+    def _unindex(self, company: _Company, entry: Dict[str, Any]):
+        company.index.remove(company.name, entry)
+        if '/' not in entry["full_path"]:
+            company.root_count -= 1
+            self._root_index.remove(company.name, entry)
+
+    def _drop(self, company: _Company, rel: str) -> bool:
+        entry = company.files.pop(rel, None)
+        if entry is None:
+            return False
+        self._unindex(company, entry)
+
+        filename = posixpath.basename(rel)
+        paths = company.by_name.get(filename, [])
+        if rel in paths:
+            paths.remove(rel)
+        if not paths:
+            company.by_name.pop(filename, None)
+        return True
+
+    def _discard_company(self, name: str):
+        company = self._companies.pop(name, None)
+        if company is None:
+            return
+        for entry in company.files.values():
+            if '/' not in entry["full_path"]:
+                self._root_index.remove(name, entry)
+        self._generation += 1
+
+    def _drop_tree(self, company: _Company, rel_dir: str):
+        for rel in [r for r in company.files if _under(r, rel_dir)]:
+            self._drop(company, rel)
+        for sub in [d for d in company.dirs if _under(d, rel_dir)]:
+            del company.dirs[sub]
+        self._bump(company)
+
+    # ------------------------------------------------------------------
+    # Arama ve listeler
+    # ------------------------------------------------------------------
+
+    def find(self, company_name: str, filename: str, rel_path: Optional[str] = None) -> Optional[Path]:
+        """
+        Firma dosyasını bul
+
+        Args:
+            rel_path: Firma klasörüne göreli yol (aynı isimde birden fazla dosya varsa gerekli)
+
+        Raises:
+            AmbiguousFileError: rel_path verilmedi ve ad birden fazla dosyaya karşılık geliyor
+        """
+        company_dir = self.root / company_name
+
+        if rel_path:
+            return self._resolve_rel_path(company_dir, filename, rel_path)
+
+        with self._lock:
+            company = self._companies.get(company_name)
+            paths = list(company.by_name.get(filename, ())) if company else []
+
+            existing = [p for p in paths if (company_dir / p).is_file()]
+            # İzleyici yoksa dışarıdan yapılan değişiklikler ancak eksik/eski kayıtta fark edilir
+            if not self.watching and (not existing or len(existing) != len(paths)):
+                self._revalidate(company_name)
+                company = self._companies.get(company_name)
+                paths = list(company.by_name.get(filename, ())) if company else []
+                existing = [p for p in paths if (company_dir / p).is_file()]
+
+        if len(existing) > 1:
+            raise AmbiguousFileError(filename, existing)
+        return company_dir / existing[0] if existing else None
+
+    @staticmethod
+    def _resolve_rel_path(company_dir: Path, filename: str, rel_path: str) -> Optional[Path]:
+        """İstemciden gelen göreli yolu doğrula (firma klasörü dışına çıkamaz)"""
+        candidate = (company_dir / rel_path.replace('\\', '/')).resolve()
+        try:
+            candidate.relative_to(company_dir.resolve())
+        except ValueError:
+            return None
+        if candidate.name != filename or not candidate.is_file():
+            return None
+        return candidate
+
+    def _etag(self, generation: int) -> str:
+        return f'W/"{self._token}-{generation}"'
+
+    def companies_etag(self) -> str:
+        with self._lock:
+            self._revalidate()
+            return self._etag(self._generation)
+
+    def list_companies(self) -> List[Dict[str, Any]]:
+        """Firmalar ve doğrudan firma klasöründeki dosya sayıları"""
+        with self._lock:
+            return [
+                {"name": name, "file_count": company.root_count}
+                for name, company in sorted(self._companies.items())
+            ]
+
+    def company_etag(self, company_name: str) -> Optional[str]:
+        """Firmanın liste ETag'i (firma yoksa None)"""
+        with self._lock:
+            self._revalidate(company_name)
+            company = self._companies.get(company_name)
+            return self._etag(company.generation) if company else None
+
+    def list_company_files(self, company_name: str,
+                           query: ListingQuery = ListingQuery()) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Firmanın dosyaları (alt klasörler dahil)
+
+        Returns:
+            (sayfadaki dosyalar, sonraki sayfanın cursor'ı - son sayfada None)
+        """
+        with self._lock:
+            company = self._companies.get(company_name)
+            if company is None:
+                return [], None
+            return self._page(company.index, query, company_name,
+                              lambda key: dict(company.files[key[-1]]))
+
+    def list_direct_files(self, query: ListingQuery = ListingQuery()) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Tüm firmaların doğrudan firma klasöründeki dosyaları (sayfalı)"""
+
+        def build(key: tuple) -> Dict[str, Any]:
+            name, rel = key[-2], key[-1]
+            entry = self._companies[name].files[rel]
+            return {
+                "name": entry["name"],
+                "size": entry["size"],
+                "mtime": entry["mtime"],
+                "extension": entry["extension"],
+                "company": name,
+                "full_path": f"{name}/{rel}"
+            }
+
+        # Firma kökündeki dosyaların iş emri klasörü yoktur
+        if query.subfolder:
+            return [], None
+        with self._lock:
+            return self._page(self._root_index, query, None, build)
+
+    def _page(self, index: _ListingIndex, query: ListingQuery, company: Optional[str],
+              build) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        files = []
+        for key in index.scan(query, company):
+            name, rel = key[-2], key[-1]
+            if not _matches(self._companies[name].files[rel], query):
+                continue
+            if query.limit is not None and len(files) == query.limit:
+                # Sayfa doldu ve en az bir eşleşme daha var
+                return files, _encode_cursor(query, last_key)
+            files.append(build(key))
+            last_key = key
+        return files, None
+
+    def company_file_count(self, company_name: str) -> int:
+        with self._lock:
+            company = self._companies.get(company_name)
+            return len(company.files) if company else 0
+
+    # ------------------------------------------------------------------
+    # Değişiklik bildirimleri (endpoint'lerden çağrılır)
+    # ------------------------------------------------------------------
+
+    def notify_changed(self, file_path: Path):
+        """Dosya oluşturuldu veya üzerine yazıldı"""
+        located = self._locate(file_path)
+        if not located or not located[1]:
+            return
+        name, rel = located
+        record = stat_record(file_path, rel)
+        if record is None:
+            self.notify_removed(file_path)
+            return
+
+        with self._lock:
+            company = self._companies.get(name)
+            if company is None:
+                # Yeni firma klasörü (kaydetme sırasında oluşturuldu)
+                company = _Company(name)
+                self._scan_tree(company, name, '')
+                self._companies[name] = company
+            else:
+                # Yeni iş emri klasörü de kataloğa girer
+                parent = _parent(rel)
+                if parent not in company.dirs:
+                    self._refresh_dir(company, name, _parent(parent) if parent else '')
+                self._put(company, record)
+            self._bump(company)
+
+    def notify_removed(self, file_path: Path):
+        located = self._locate(file_path)
+        if not located or not located[1]:
+            return
+        with self._lock:
+            company = self._companies.get(located[0])
+            if company is not None and self._drop(company, located[1]):
+                self._bump(company)
+
+    def notify_renamed(self, old_path: Path, new_path: Path):
+        self.notify_removed(old_path)
+        self.notify_changed(new_path)
+
+    def notify_company_created(self, company_name: str):
+        with self._lock:
+            if company_name not in self._companies:
+                company = _Company(company_name)
+                self._scan_tree(company, company_name, '')
+                self._companies[company_name] = company
+                self._bump(company)
+
+    def notify_company_removed(self, company_name: str):
+        with self._lock:
+            self._discard_company(company_name)
+
+    def _locate(self, file_path: Path) -> Optional[Tuple[str, Optional[str]]]:
+        """Yolu (firma, firma içi göreli yol) olarak ayır; firma klasörünün kendisi için göreli yol None"""
+        try:
+            rel = Path(os.path.abspath(file_path)).relative_to(os.path.abspath(self.root))
+        except ValueError:
+            return None
+        parts = rel.parts
+        if not parts:
+            return None
+        return parts[0], ('/'.join(parts[1:]) or None)
+
+    # ------------------------------------------------------------------
+    # Dosya sistemi izleyicisi
+    # ------------------------------------------------------------------
+
+    def _watch(self):
+        try:
+            self.root.mkdir(exist_ok=True)
+            self.watching = True
+            for changes in watch(self.root, stop_event=self._stop, recursive=True):
+                with self._lock:
+                    self._apply_changes(changes)
+        except Exception as e:
+            print(f"[FILE INDEX] İzleyici durdu, klasör kontrolüyle devam ediliyor: {e}")
+        finally:
+            self.watching = False
+
+    def _apply_changes(self, changes):
+        stale_root = False
+        stale_dirs = set()
+        for change, raw_path in changes:
+            located = self._locate(Path(raw_path))
+            if not located:
+                continue
+            name, rel = located
+            company = self._companies.get(name)
+
+            if rel is None or company is None:
+                # Firma klasörü eklendi/silindi
+                stale_root = True
+            elif os.path.isdir(raw_path) or (change == Change.deleted and rel in company.dirs):
+                # Alt klasör eklendi/silindi/taşındı: üst klasör yeniden listelenir
+                stale_dirs.add((name, _parent(rel)))
+            elif change == Change.deleted:
+                if self._drop(company, rel):
+                    self._bump(company)
+            else:
+                record = stat_record(raw_path, rel)
+                if record is None:
+                    continue
+                if record.parent not in company.dirs:
+                    stale_dirs.add((name, record.parent))
+                    continue
+                self._put(company, record)
+                self._bump(company)
+
+        if stale_root:
+            self._refresh_root()
+        for name, rel_dir in stale_dirs:
+            company = self._companies.get(name)
+            if company is None:
+                continue
+            # Üst klasör henüz katalogda değilse en yakın bilinen klasörden başlanır
+            while rel_dir and rel_dir not in company.dirs:
+                rel_dir = _parent(rel_dir)
+            self._refresh_dir(company, name, rel_dir)
+
+
+# Süreç genelinde paylaşılan katalog
+company_files = CompanyFileIndex()
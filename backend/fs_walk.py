@@ -0,0 +1,236 @@
+"""
+FS Walk - os.scandir tabanlı dosya sistemi taraması
+Path.iterdir/rglob + is_file() + stat() her dosya için ayrı sistem çağrıları
+yapar. Burada dizin listesinden gelen DirEntry tür bilgisi ve önbellekli stat
+sonucu kullanılır: Linux'ta dosya başına en fazla bir stat, Windows'ta hiç
+(bilgi FindNextFile ile gelir). Ağ paylaşımındaki firmalar/ klasöründe
+gecikmenin çoğu bu çağrılardan gelir.
+
+Benchmark: python fs_walk.py [klasör]
+"""
+
+import os
+import posixpath
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+PathLike = Union[str, Path]
+
+
+class FileRecord(NamedTuple):
+    """Taramada bulunan dosya (stat=False ile taranırsa size ve mtime_ns -1)"""
+    rel: str        # Tarama köküne göre '/' ayraçlı yol
+    name: str
+    size: int
+    mtime_ns: int
+
+    @property
+    def extension(self) -> str:
+        return os.path.splitext(self.name)[1]
+
+    @property
+    def mtime(self) -> float:
+        return self.mtime_ns / 1e9
+
+    @property
+    def parent(self) -> str:
+        """Köke göre klasör ('' kök için)"""
+        return posixpath.dirname(self.rel)
+
+
+def _join(rel_dir: str, name: str) -> str:
+    return f"{rel_dir}/{name}" if rel_dir else name
+
+
+def scan_dir(dir_path: PathLike, rel_dir: str = "", stat: bool = True,
+             extensions: Optional[Iterable[str]] = None) -> Tuple[List[FileRecord], List[str]]:
+    """
+    Tek klasörü listele
+
+    Args:
+        rel_dir: Klasörün tarama köküne göre yolu (kayıtların rel alanına önek olur)
+        stat: Boyut/mtime gerekmiyorsa False (Linux'ta hiç stat yapılmaz)
+        extensions: Sadece bu uzantılar (küçük harf, noktalı) - filtre stat'tan önce uygulanır
+
+    Returns:
+        (dosya kayıtları, alt klasörlerin göreli yolları). Sembolik bağlantılı
+        klasörlere girilmez (döngü olmaması için).
+
+    Raises:
+        FileNotFoundError: Klasör yoksa
+    """
+    wanted = {ext.lower() for ext in extensions} if extensions is not None else None
+    files: List[FileRecord] = []
+    subdirs: List[str] = []
+
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(_join(rel_dir, entry.name))
+                    continue
+                if wanted is not None and os.path.splitext(entry.name)[1].lower() not in wanted:
+                    continue
+                if not entry.is_file():
+                    continue
+                if stat:
+                    st = entry.stat()
+                    files.append(FileRecord(_join(rel_dir, entry.name), entry.name, st.st_size, st.st_mtime_ns))
+                else:
+                    files.append(FileRecord(_join(rel_dir, entry.name), entry.name, -1, -1))
+            except FileNotFoundError:
+                # Listeleme ile stat arasında silinmiş
+                continue
+
+    return files, subdirs
+
+
+def walk(root: PathLike, recursive: bool = True, stat: bool = True,
+         extensions: Optional[Iterable[str]] = None) -> Iterator[FileRecord]:
+    """
+    Klasördeki dosyaları (recursive ise alt klasörlerle) kayıt olarak üret
+
+    Kök yoksa hiçbir şey üretmez; tarama sırasında silinen alt klasörler atlanır.
+    """
+    extensions = list(extensions) if extensions is not None else None
+    pending = [""]
+    while pending:
+        rel_dir = pending.pop()
+        try:
+            files, subdirs = scan_dir(os.path.join(root, rel_dir) if rel_dir else root,
+                                      rel_dir, stat=stat, extensions=extensions)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        yield from files
+        if recursive:
+            pending.extend(reversed(subdirs))
+
+
+def stat_record(file_path: PathLike, rel: str) -> Optional[FileRecord]:
+    """Tek dosyanın kaydı (dosya yoksa None)"""
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return FileRecord(rel, posixpath.basename(rel), st.st_size, st.st_mtime_ns)
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+
+class _CountingEntry:
+    """DirEntry vekili: stat() çağrılarını sayar (DirEntry sonucu önbelleklediği için sadece ilk çağrı)"""
+
+    def __init__(self, entry: os.DirEntry, counts: dict):
+        self._entry = entry
+        self._counts = counts
+        self._stated = set()
+
+    def __getattr__(self, name):
+        return getattr(self._entry, name)
+
+    def stat(self, *, follow_symlinks: bool = True):
+        if follow_symlinks not in self._stated:
+            self._stated.add(follow_symlinks)
+            self._counts["entry_stat"] += 1
+        return self._entry.stat(follow_symlinks=follow_symlinks)
+
+
+class _CountingScandir:
+    """os.scandir yineleyicisi vekili: girdileri _CountingEntry olarak üretir"""
+
+    def __init__(self, iterator, counts: dict):
+        self._iterator = iterator
+        self._counts = counts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._iterator.close()
+
+    def __iter__(self):
+        for entry in self._iterator:
+            yield _CountingEntry(entry, self._counts)
+
+
+class _SyscallCounter:
+    """
+    os.stat/os.lstat/os.scandir ve DirEntry.stat çağrılarını say
+
+    pathlib bu fonksiyonları os modülü üzerinden çağırır. DirEntry.stat() C
+    tarafında olduğu için os.scandir'in döndürdüğü girdiler sarılarak sayılır
+    (Windows'ta bu çağrılar çoğunlukla dizin listesinden yanıtlanır, sistem
+    çağrısı yapmaz).
+    """
+
+    NAMES = ("stat", "lstat", "scandir")
+
+    def __init__(self):
+        self.counts = dict.fromkeys(self.NAMES + ("entry_stat",), 0)
+        self._originals = {}
+
+    def __enter__(self):
+        for name in self.NAMES:
+            original = getattr(os, name)
+            self._originals[name] = original
+
+            def counted(*args, _name=name, _original=original, **kwargs):
+                self.counts[_name] += 1
+                result = _original(*args, **kwargs)
+                return _CountingScandir(result, self.counts) if _name == "scandir" else result
+
+            setattr(os, name, counted)
+        return self
+
+    def __exit__(self, *exc):
+        for name, original in self._originals.items():
+            setattr(os, name, original)
+
+
+def _legacy_listing(root: Path) -> int:
+    """Eski yöntem: rglob + is_file() + stat()"""
+    count = 0
+    for file_path in root.rglob("*"):
+        if file_path.is_file():
+            file_path.stat()
+            count += 1
+    return count
+
+
+def _walk_listing(root: Path) -> int:
+    """Yeni yöntem: fs_walk.walk"""
+    count = 0
+    for _ in walk(root):
+        count += 1
+    return count
+
+
+def benchmark(root: Path, repeat: int = 3):
+    results = {}
+    for label, run in (("rglob + is_file + stat", _legacy_listing), ("fs_walk.walk", _walk_listing)):
+        best = None
+        for _ in range(repeat):
+            with _SyscallCounter() as counter:
+                started = time.perf_counter()
+                files = run(root)
+                elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+
+        stats = counter.counts["stat"] + counter.counts["lstat"]
+        results[label] = stats + counter.counts["entry_stat"] + counter.counts["scandir"]
+        print(f"{label:24} {files:7} dosya  {best * 1000:9.1f} ms  "
+              f"stat: {stats:7}  DirEntry.stat: {counter.counts['entry_stat']:7}  "
+              f"scandir: {counter.counts['scandir']:6}  "
+              f"dosya başına çağrı: {results[label] / max(files, 1):.2f}")
+
+    legacy, new = results.values()
+    if new:
+        print(f"Sistem çağrısı azalması: {legacy / new:.1f}x")
+
+
+if __name__ == "__main__":
+    benchmark(Path(sys.argv[1] if len(sys.argv) > 1 else "firmalar"))
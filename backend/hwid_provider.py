@@ -0,0 +1,462 @@
+"""
+HWID Provider - Donanım kimliği (HWID) üretimi
+Donanım bileşenlerini okuyan probe'lar bir kayıt defterinde tutulur, eşzamanlı
+çalıştırılır ve üretilen HWID süreç boyunca bellekte saklanır.
+"""
+
+import hashlib
+import os
+import platform
+import subprocess
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Tüm probe'lar için toplam süre bütçesi (saniye)
+HWID_PROBE_BUDGET = float(os.getenv("HWID_PROBE_BUDGET", "30"))
+
+
+class HwidProbe(NamedTuple):
+    """Tek bir donanım bileşenini okuyan probe"""
+    name: str
+    func: Callable[[], str]
+    fallback: str
+    hardware: bool = True  # HWID geçerliliği için sayılan donanım bileşeni mi
+
+
+class HwidProvider:
+    """
+    Probe'ları eşzamanlı çalıştırıp HWID üreten ve sonucu saklayan sağlayıcı
+    
+    Bileşenler kayıt sırasıyla birleştirilir; sıra HWID'nin parçasıdır,
+    mevcut lisansların geçerli kalması için değiştirilmemelidir.
+    """
+    
+    def __init__(self, budget_seconds: float = HWID_PROBE_BUDGET):
+        self.budget_seconds = budget_seconds
+        self._probes: List[HwidProbe] = []
+        self._lock = threading.Lock()
+        self._hwid: Optional[str] = None
+        self.last_report: Dict[str, Dict] = {}
+    
+    def register(self, name: str, func: Callable[[], str], fallback: str, hardware: bool = True):
+        """Yeni bir probe kaydet (sıra korunur)"""
+        self._probes.append(HwidProbe(name, func, fallback, hardware))
+        self._hwid = None
+    
+    def get_hwid(self) -> str:
+        """
+        Sistemin Hardware ID'sini döndür (ilk çağrıda üretilir, sonra bellekten)
+        
+        Returns:
+            SHA-256 hash'lenmiş HWID string
+        """
+        return self.resolve()[0]
+    
+    def resolve(self) -> Tuple[str, bool]:
+        """
+        HWID'yi ve tam olup olmadığını döndür
+        
+        Süre bütçesini aşan probe varsa bileşeni fallback değeriyle üretilir;
+        bu HWID gerçek HWID'den farklı olabilir, saklanmaz ve tam sayılmaz.
+        
+        Returns:
+            (hwid, tam_mı) tuple
+        """
+        if self._hwid is not None:
+            return self._hwid, True
+        
+        with self._lock:
+            if self._hwid is not None:
+                return self._hwid, True
+            
+            started = time.perf_counter()
+            components, complete = self._collect()
+            hwid = hashlib.sha256("|".join(components).encode()).hexdigest()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            
+            # En az bir donanım bileşeni "UNKNOWN" değilse HWID geçerli sayılır
+            hardware = [comp for probe, comp in zip(self._probes, components) if probe.hardware]
+            if hardware and all("UNKNOWN" in comp for comp in hardware):
+                error_msg = f"Yeterli donanım bilgisi alınamadı. Tüm donanım bileşenleri UNKNOWN. Bileşenler: {components}"
+                print(f"[HATA] {error_msg}")
+                raise ValueError(error_msg)
+            
+            print(f"[HWID] Üretildi ({elapsed_ms:.0f} ms): {hwid[:16]}...")
+            
+            # Süre bütçesini aşan probe varsa sonuç saklanmaz; bir sonraki
+            # çağrı tekrar dener (yarım kalan okuma HWID'yi değiştirmesin)
+            if complete:
+                self._hwid = hwid
+            else:
+                print("[HWID] Eksik bileşenle üretildi, saklanmadı")
+            return hwid, complete
+    
+    def refresh(self) -> str:
+        """Saklanan HWID'yi at ve yeniden üret"""
+        with self._lock:
+            self._hwid = None
+        return self.get_hwid()
+    
+    def _collect(self) -> Tuple[List[str], bool]:
+        """Tüm probe'ları eşzamanlı çalıştır, (bileşenler, tamamlandı_mı) döndür"""
+        report: Dict[str, Dict] = {}
+        executor = ThreadPoolExecutor(max_workers=max(len(self._probes), 1), thread_name_prefix="hwid-probe")
+        try:
+            futures = [executor.submit(_timed, probe.func) for probe in self._probes]
+            done, _ = wait(futures, timeout=self.budget_seconds)
+        finally:
+            # Bütçeyi aşan probe'lar beklenmez (kendi subprocess timeout'ları ile biter)
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        components = []
+        complete = True
+        for probe, future in zip(self._probes, futures):
+            if future not in done:
+                complete = False
+                report[probe.name] = {"status": "timeout"}
+                print(f"[HATA] {probe.name} süre bütçesini aştı ({self.budget_seconds} sn)")
+                components.append(probe.fallback)
+                continue
+            
+            try:
+                value, elapsed_ms = future.result()
+                if value is None:
+                    value = probe.fallback
+                report[probe.name] = {
+                    "status": "unknown" if "UNKNOWN" in value else "ok",
+                    "elapsed_ms": round(elapsed_ms, 1)
+                }
+            except Exception as e:
+                print(f"[HATA] {probe.name} okunamadı: {type(e).__name__}: {e}")
+                report[probe.name] = {"status": "error", "error": str(e)}
+                value = probe.fallback
+            components.append(value)
+        
+        self.last_report = report
+        return components, complete
+
+
+def _timed(func: Callable[[], str]) -> Tuple[str, float]:
+    """Probe'u çalıştır ve süresini ölç"""
+    started = time.perf_counter()
+    value = func()
+    return value, (time.perf_counter() - started) * 1000
+
+
+def _read_text(path: str) -> Optional[str]:
+    """Dosyayı metin olarak oku (okunamazsa None)"""
+    try:
+        with open(path, 'r', errors='replace') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _read_udev_property(device: str, key: str) -> Optional[str]:
+    """
+    udev veritabanından (/run/udev/data) blok cihaz özelliğini oku
+    `udevadm info --query=property` ile aynı değerleri döndürür.
+    """
+    dev_numbers = _read_text(f'/sys/block/{device}/dev')
+    if not dev_numbers:
+        return None
+    
+    data = _read_text(f'/run/udev/data/b{dev_numbers.strip()}')
+    if data is None:
+        return None
+    
+    prefix = f'E:{key}='
+    for line in data.split('\n'):
+        if line.startswith(prefix):
+            return line[len(prefix):].split('=')[0].strip()
+    return None
+
+
+def probe_mac_address() -> str:
+    """MAC Address'i al (fallback için)"""
+    try:
+        mac = ':'.join(['{:02x}'.format((uuid.getnode() >> elements) & 0xff) 
+                       for elements in range(0,2*6,2)][::-1])
+        return mac
+    except Exception:
+        return "UNKNOWN_MAC"
+
+def probe_cpu_serial() -> str:
+    """CPU Serial Number'ı al"""
+    system = platform.system()
+
+    if system == "Windows":
+        # Yöntem 1: wmic cpu get ProcessorId
+        try:
+            result = subprocess.run(
+                ['wmic', 'cpu', 'get', 'ProcessorId'],
+                capture_output=True,
+                text=True,
+                timeout=10,
+                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+            )
+            if result.returncode == 0 and result.stdout:
+                lines = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
+                for line in lines[1:]:  # İlk satır başlık
+                    if line and line.upper() != 'PROCESSORID':
+                        return line
+        except Exception as e:
+            print(f"WMI CPU yöntemi 1 başarısız: {e}")
+
+        # Yöntem 2: wmic path win32_processor get ProcessorId
+        try:
+            result = subprocess.run(
+                ['wmic', 'path', 'win32_processor', 'get', 'ProcessorId'],
+                capture_output=True,
+                text=True,
+                timeout=10,
+                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+            )
+            if result.returncode == 0 and result.stdout:
+                lines = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
+                for line in lines[1:]:
+                    if line and line.upper() != 'PROCESSORID':
+                        return line
+        except Exception as e:
+            print(f"WMI CPU yöntemi 2 başarısız: {e}")
+
+        # Yöntem 3: PowerShell ile
+        try:
+            ps_cmd = 'Get-WmiObject Win32_Processor | Select-Object -ExpandProperty ProcessorId'
+            result = subprocess.run(
+                ['powershell', '-Command', ps_cmd],
+                capture_output=True,
+                text=True,
+                timeout=10,
+                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+            )
+            if result.returncode == 0 and result.stdout.strip():
+                cpu_id = result.stdout.strip()
+                if cpu_id:
+                    return cpu_id
+        except Exception as e:
+            print(f"PowerShell CPU yöntemi başarısız: {e}")
+
+    elif system == "Linux":
+        # /proc/cpuinfo doğrudan okunur (cat süreci başlatmadan)
+        cpuinfo = _read_text('/proc/cpuinfo')
+        if cpuinfo is not None:
+            # CPU ID veya serial number bul
+            for line in cpuinfo.split('\n'):
+                if 'Serial' in line or 'serial' in line:
+                    parts = line.split(':')
+                    if len(parts) > 1:
+                        return parts[1].strip()
+
+    elif system == "Darwin":  # macOS
+        try:
+            result = subprocess.run(
+                ['sysctl', '-n', 'machdep.cpu.brand_string'],
+                capture_output=True,
+                text=True,
+                timeout=5
+            )
+            if result.returncode == 0:
+                return result.stdout.strip()
+        except Exception:
+            pass
+
+    return "UNKNOWN_CPU"
+
+def probe_motherboard_serial() -> str:
+    """Motherboard Serial Number'ı al"""
+    system = platform.system()
+
+    if system == "Windows":
+        # Yöntem 1: wmic baseboard get SerialNumber
+        try:
+            result = subprocess.run(
+                ['wmic', 'baseboard', 'get', 'SerialNumber'],
+                capture_output=True,
+                text=True,
+                timeout=10,
+                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+            )
+            if result.returncode == 0 and result.stdout:
+                lines = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
+                for line in lines[1:]:
+                    if line and line.upper() != 'SERIALNUMBER' and line != "To be filled by O.E.M.":
+                        return line
+        except Exception as e:
+            print(f"WMI MB yöntemi 1 başarısız: {e}")
+
+        # Yöntem 2: wmic path win32_baseboard get SerialNumber
+        try:
+            result = subprocess.run(
+                ['wmic', 'path', 'win32_baseboard', 'get', 'SerialNumber'],
+                capture_output=True,
+                text=True,
+                timeout=10,
+                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+            )
+            if result.returncode == 0 and result.stdout:
+                lines = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
+                for line in lines[1:]:
+                    if line and line.upper() != 'SERIALNUMBER' and line != "To be filled by O.E.M.":
+                        return line
+        except Exception as e:
+            print(f"WMI MB yöntemi 2 başarısız: {e}")
+
+        # Yöntem 3: PowerShell ile
+        try:
+            ps_cmd = 'Get-WmiObject Win32_BaseBoard | Select-Object -ExpandProperty SerialNumber'
+            result = subprocess.run(
+                ['powershell', '-Command', ps_cmd],
+                capture_output=True,
+                text=True,
+                timeout=10,
+                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+            )
+            if result.returncode == 0 and result.stdout.strip():
+                mb_serial = result.stdout.strip()
+                if mb_serial and mb_serial != "To be filled by O.E.M.":
+                    return mb_serial
+        except Exception as e:
+            print(f"PowerShell MB yöntemi başarısız: {e}")
+
+    elif system == "Linux":
+        board_serial = _read_text('/sys/class/dmi/id/board_serial')
+        if board_serial is not None:
+            serial = board_serial.strip()
+            if serial:
+                return serial
+
+    elif system == "Darwin":  # macOS
+        try:
+            result = subprocess.run(
+                ['system_profiler', 'SPHardwareDataType'],
+                capture_output=True,
+                text=True,
+                timeout=5
+            )
+            if result.returncode == 0:
+                # Serial Number satırını bul
+                for line in result.stdout.split('\n'):
+                    if 'Serial Number' in line:
+                        parts = line.split(':')
+                        if len(parts) > 1:
+                            return parts[1].strip()
+        except Exception:
+            pass
+
+    return "UNKNOWN_MB"
+
+def probe_disk_serial() -> str:
+    """Disk Serial Number'ı al (ilk disk)"""
+    system = platform.system()
+
+    if system == "Windows":
+        # Yöntem 1: wmic diskdrive get SerialNumber
+        try:
+            result = subprocess.run(
+                ['wmic', 'diskdrive', 'get', 'SerialNumber'],
+                capture_output=True,
+                text=True,
+                timeout=10,
+                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+            )
+            if result.returncode == 0 and result.stdout:
+                lines = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
+                for line in lines[1:]:
+                    if line and line.upper() != 'SERIALNUMBER':
+                        return line
+        except Exception as e:
+            print(f"WMI Disk yöntemi 1 başarısız: {e}")
+
+        # Yöntem 2: wmic path win32_diskdrive get SerialNumber
+        try:
+            result = subprocess.run(
+                ['wmic', 'path', 'win32_diskdrive', 'get', 'SerialNumber'],
+                capture_output=True,
+                text=True,
+                timeout=10,
+                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+            )
+            if result.returncode == 0 and result.stdout:
+                lines = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
+                for line in lines[1:]:
+                    if line and line.upper() != 'SERIALNUMBER':
+                        return line
+        except Exception as e:
+            print(f"WMI Disk yöntemi 2 başarısız: {e}")
+
+        # Yöntem 3: PowerShell ile
+        try:
+            ps_cmd = 'Get-WmiObject Win32_DiskDrive | Select-Object -First 1 -ExpandProperty SerialNumber'
+            result = subprocess.run(
+                ['powershell', '-Command', ps_cmd],
+                capture_output=True,
+                text=True,
+                timeout=10,
+                creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+            )
+            if result.returncode == 0 and result.stdout.strip():
+                disk_serial = result.stdout.strip()
+                if disk_serial:
+                    return disk_serial
+        except Exception as e:
+            print(f"PowerShell Disk yöntemi başarısız: {e}")
+
+    elif system == "Linux":
+        # Önce udev veritabanından oku (udevadm ile aynı kaynak, süreç başlatmadan)
+        serial = _read_udev_property('sda', 'ID_SERIAL')
+        if serial is not None:
+            return serial
+        
+        try:
+            # /dev/sda için serial number
+            result = subprocess.run(
+                ['udevadm', 'info', '--query=property', '--name=/dev/sda'],
+                capture_output=True,
+                text=True,
+                timeout=5
+            )
+            if result.returncode == 0:
+                for line in result.stdout.split('\n'):
+                    if 'ID_SERIAL=' in line:
+                        return line.split('=')[1].strip()
+        except Exception:
+            pass
+
+    elif system == "Darwin":  # macOS
+        try:
+            result = subprocess.run(
+                ['system_profiler', 'SPStorageDataType'],
+                capture_output=True,
+                text=True,
+                timeout=5
+            )
+            if result.returncode == 0:
+                # Serial Number bul
+                for line in result.stdout.split('\n'):
+                    if 'Serial Number' in line:
+                        parts = line.split(':')
+                        if len(parts) > 1:
+                            return parts[1].strip()
+        except Exception:
+            pass
+
+    return "UNKNOWN_DISK"
+
+
+def probe_hostname() -> str:
+    """Hostname'i al (fallback için)"""
+    return platform.node()
+
+
+# Varsayılan sağlayıcı - süreç başına tek HWID
+default_hwid_provider = HwidProvider()
+default_hwid_provider.register("CPU Serial", probe_cpu_serial, "UNKNOWN_CPU")
+default_hwid_provider.register("Motherboard Serial", probe_motherboard_serial, "UNKNOWN_MB")
+default_hwid_provider.register("Disk Serial", probe_disk_serial, "UNKNOWN_DISK")
+# Fallback: MAC Address ve Hostname ekle (daha güvenilir HWID için)
+default_hwid_provider.register("MAC Address", probe_mac_address, "UNKNOWN_MAC", hardware=False)
+default_hwid_provider.register("Hostname", probe_hostname, "UNKNOWN_HOST", hardware=False)
@@ -0,0 +1,156 @@
+"""
+JSON Response - Doküman endpoint'leri için hızlı serileştirilmiş, sıkıştırılmış yanıtlar
+Yanıt FastAPI'nin jsonable_encoder dolaşmasından geçmeden orjson ile (yoksa
+stdlib json) tek seferde baytlara çevrilir. Belirli bir boyutun üzerindeki
+gövdeler istemcinin kabul ettiği en iyi kodlamayla (zstd / br / gzip) sıkıştırılır;
+sıkıştırılmış baytlar parse önbelleğinin yanında saklanır, değişmemiş dosyanın
+yanıtı tekrar serileştirilmez ve sıkıştırılmaz.
+
+brotli ve zstandard paketleri opsiyoneldir; kurulu değillerse gzip kullanılır.
+"""
+
+import gzip
+import json
+import os
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from document_cache import document_cache
+from workers import io_pool
+
+try:
+    import orjson
+except ImportError:  # Opsiyonel - stdlib json kullanılır
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # Opsiyonel - br kodlaması sunulmaz
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # Opsiyonel - zstd kodlaması sunulmaz
+    zstandard = None
+
+# Bu boyutun altındaki gövdeler sıkıştırılmaz
+JSON_COMPRESS_MIN_BYTES = int(os.getenv("JSON_COMPRESS_MIN_BYTES", "1024"))
+JSON_GZIP_LEVEL = int(os.getenv("JSON_GZIP_LEVEL", "6"))
+JSON_BROTLI_QUALITY = int(os.getenv("JSON_BROTLI_QUALITY", "5"))
+JSON_ZSTD_LEVEL = int(os.getenv("JSON_ZSTD_LEVEL", "3"))
+
+
+def _available_encodings() -> List[str]:
+    """Sunucunun tercih sırasıyla desteklediği kodlamalar"""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+ENCODINGS = _available_encodings()
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Accept-Encoding başlığından kullanılacak kodlama (sıkıştırma yoksa None)
+
+    En yüksek q değerli kodlama seçilir; eşitlikte sunucu tercihi (zstd > br > gzip)
+    geçerlidir. q=0 olan kodlamalar kullanılmaz, "*" listelenmeyenleri kapsar.
+    """
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+
+    best = None
+    best_q = 0.0
+    for encoding in ENCODINGS:
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def dumps(content: Any) -> bytes:
+    """JSON baytları (FastAPI'nin varsayılan çıktısıyla aynı: UTF-8, boşluksuz)"""
+    if orjson is not None:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def compress(payload: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=JSON_ZSTD_LEVEL).compress(payload)
+    if encoding == "br":
+        return brotli.compress(payload, quality=JSON_BROTLI_QUALITY)
+    return gzip.compress(payload, compresslevel=JSON_GZIP_LEVEL, mtime=0)
+
+
+def encode(content: Any, encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+    """Serileştir, eşiğin üzerindeyse sıkıştır: (gövde, kullanılan kodlama)"""
+    payload = dumps(content)
+    if encoding is None or len(payload) < JSON_COMPRESS_MIN_BYTES:
+        return payload, None
+    return compress(payload, encoding), encoding
+
+
+def _response(body: bytes, encoding: Optional[str]) -> Response:
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def json_response(request: Request, content: Any) -> Response:
+    """İçeriği serileştirip (gerekirse sıkıştırarak) yanıt olarak döndür"""
+    body, encoding = encode(content, negotiate_encoding(request.headers.get("accept-encoding")))
+    return _response(body, encoding)
+
+
+async def cached_json_response(request: Request, cache_key: Optional[str],
+                               produce: Callable[[], Awaitable[Any]]) -> Response:
+    """
+    Önbellekli JSON yanıtı
+
+    Sıkıştırılmış gövde, kaynak kaydın anahtarı + istek adresi + kodlama ile
+    saklanır; önbellekte varsa produce hiç çağrılmaz. Sıkıştırılmayan (küçük
+    veya kodlamasız) gövdeler saklanmaz.
+
+    Args:
+        cache_key: Kaynak dosyanın parse önbelleği anahtarı (None: önbellek kullanılmaz)
+        produce: Yanıt içeriğini üreten coroutine fonksiyonu
+    """
+    requested = negotiate_encoding(request.headers.get("accept-encoding"))
+
+    entry_key = None
+    if cache_key is not None and requested is not None:
+        entry_key = document_cache.derived_key(cache_key, f"{request.url.path}?{request.url.query}|{requested}")
+        body = await io_pool.run(document_cache.get_bytes, entry_key)
+        if body is not None:
+            return _response(body, requested)
+
+    content = await produce()
+    body, encoding = await io_pool.run(encode, content, requested)
+    if entry_key is not None and encoding is not None:
+        await io_pool.run(document_cache.put_bytes, entry_key, body)
+    return _response(body, encoding)
@@ -3,19 +3,18 @@ License Manager - Offline Hardware-Locked Licensing System
 HWID üretimi ve RSA tabanlı lisans doğrulama sistemi
 """
 
-import hashlib
 import base64
 import json
 import os
 import platform
-import uuid
+import threading
+import time
 from pathlib import Path
 from typing import Optional, Tuple
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import padding, rsa
 from cryptography.hazmat.backends import default_backend
-import subprocess
-import re
+from hwid_provider import HwidProvider, default_hwid_provider
 
 # Gömülü Public Key
 PUBLIC_KEY_PEM = """-----BEGIN PUBLIC KEY-----
@@ -29,15 +28,21 @@ oQIDAQAB
 -----END PUBLIC KEY-----"""
 
 
+# Olumsuz doğrulama sonucunun önbellekte kalma süresi (saniye); geçici bir
+# hata (örn. okunamayan donanım bileşeni) yeniden başlatmadan düzelebilsin
+LICENSE_NEGATIVE_TTL = float(os.getenv("LICENSE_NEGATIVE_TTL", "30"))
+
+
 class LicenseManager:
     """Hardware-locked lisans yönetim sistemi"""
     
-    def __init__(self, license_file: Optional[str] = None):
+    def __init__(self, license_file: Optional[str] = None, hwid_provider: Optional[HwidProvider] = None):
         """
         LicenseManager'ı başlat
         
         Args:
             license_file: Lisans dosyasının yolu. None ise varsayılan konum kullanılır.
+            hwid_provider: HWID sağlayıcısı. None ise süreç genelindeki varsayılan sağlayıcı kullanılır.
         """
         if license_file is None:
             # Varsayılan lisans dosyası konumu (kullanıcı dizininde gizli)
@@ -51,6 +56,19 @@ class LicenseManager:
         
         self.license_file = license_file
         self.public_key = self._load_public_key()
+        self.hwid_provider = hwid_provider or default_hwid_provider
+        
+        # Lisans durumu önbelleği: doğrulama sonucu bellekte tutulur,
+        # license.dat'ın mtime'ı değişince veya aktivasyonda yenilenir;
+        # olumsuz sonuç ayrıca LICENSE_NEGATIVE_TTL sonunda tekrar doğrulanır
+        self._state_lock = threading.Lock()
+        self._cached_state: Optional[bool] = None
+        self._cached_mtime: Optional[int] = None
+        self._cached_at = 0.0
+        
+        # Periyodik arka plan doğrulaması (opsiyonel)
+        self._recheck_thread: Optional[threading.Thread] = None
+        self._recheck_stop = threading.Event()
     
     def _load_public_key(self):
         """Public key'i yükle"""
@@ -64,362 +82,14 @@ class LicenseManager:
     
     def get_hwid(self) -> str:
         """
-        Sistemin Hardware ID'sini üret
+        Sistemin Hardware ID'sini döndür
+        
+        HWID süreç başına bir kez üretilir ve bellekte tutulur.
         
         Returns:
             SHA-256 hash'lenmiş HWID string
         """
-        print(f"\n[DEBUG] HWID üretimi başlatıldı - Platform: {platform.system()}")
-        hw_components = []
-        
-        try:
-            # CPU Serial Number
-            print("[DEBUG] CPU Serial okunuyor...")
-            cpu_serial = self._get_cpu_serial()
-            print(f"[DEBUG] CPU Serial: {cpu_serial}")
-            hw_components.append(cpu_serial)
-        except Exception as e:
-            print(f"[HATA] CPU Serial okunamadı: {type(e).__name__}: {e}")
-            hw_components.append("UNKNOWN_CPU")
-        
-        try:
-            # Motherboard Serial Number
-            print("[DEBUG] Motherboard Serial okunuyor...")
-            mb_serial = self._get_motherboard_serial()
-            print(f"[DEBUG] Motherboard Serial: {mb_serial}")
-            hw_components.append(mb_serial)
-        except Exception as e:
-            print(f"[HATA] Motherboard Serial okunamadı: {type(e).__name__}: {e}")
-            hw_components.append("UNKNOWN_MB")
-        
-        try:
-            # Disk Serial Number
-            print("[DEBUG] Disk Serial okunuyor...")
-            disk_serial = self._get_disk_serial()
-            print(f"[DEBUG] Disk Serial: {disk_serial}")
-            hw_components.append(disk_serial)
-        except Exception as e:
-            print(f"[HATA] Disk Serial okunamadı: {type(e).__name__}: {e}")
-            hw_components.append("UNKNOWN_DISK")
-        
-        # Fallback: MAC Address ve Hostname ekle (daha güvenilir HWID için)
-        try:
-            print("[DEBUG] MAC Address okunuyor...")
-            mac_address = self._get_mac_address()
-            print(f"[DEBUG] MAC Address: {mac_address}")
-            hw_components.append(mac_address)
-        except Exception as e:
-            print(f"[HATA] MAC Address okunamadı: {type(e).__name__}: {e}")
-            hw_components.append("UNKNOWN_MAC")
-        
-        try:
-            print("[DEBUG] Hostname okunuyor...")
-            hostname = platform.node()
-            print(f"[DEBUG] Hostname: {hostname}")
-            hw_components.append(hostname)
-        except Exception as e:
-            print(f"[HATA] Hostname okunamadı: {type(e).__name__}: {e}")
-            hw_components.append("UNKNOWN_HOST")
-        
-        # Tüm bileşenleri birleştir ve hash'le
-        hw_string = "|".join(hw_components)
-        print(f"[DEBUG] HW String: {hw_string[:100]}...")  # İlk 100 karakter
-        hwid = hashlib.sha256(hw_string.encode()).hexdigest()
-        print(f"[DEBUG] HWID üretildi: {hwid[:16]}...")
-        
-        # En az bir bileşen "UNKNOWN" değilse HWID geçerli sayılır
-        # İlk 3 bileşen (CPU, MB, Disk) kontrolü
-        unknown_count = sum(1 for comp in hw_components[:3] if "UNKNOWN" in comp)
-        print(f"[DEBUG] UNKNOWN bileşen sayısı (ilk 3): {unknown_count}/3")
-        
-        if unknown_count == 3:
-            error_msg = f"Yeterli donanım bilgisi alınamadı. Tüm donanım bileşenleri UNKNOWN. Bileşenler: {hw_components}"
-            print(f"[HATA] {error_msg}")
-            raise ValueError(error_msg)
-        
-        print(f"[DEBUG] HWID başarıyla üretildi!")
-        return hwid
-    
-    def _get_mac_address(self) -> str:
-        """MAC Address'i al (fallback için)"""
-        try:
-            mac = ':'.join(['{:02x}'.format((uuid.getnode() >> elements) & 0xff) 
-                           for elements in range(0,2*6,2)][::-1])
-            return mac
-        except Exception:
-            return "UNKNOWN_MAC"
-    
-    def _get_cpu_serial(self) -> str:
-        """CPU Serial Number'ı al"""
-        system = platform.system()
-        
-        if system == "Windows":
-            # Yöntem 1: wmic cpu get ProcessorId
-            try:
-                result = subprocess.run(
-                    ['wmic', 'cpu', 'get', 'ProcessorId'],
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                    creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                )
-                if result.returncode == 0 and result.stdout:
-                    lines = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
-                    for line in lines[1:]:  # İlk satır başlık
-                        if line and line.upper() != 'PROCESSORID':
-                            return line
-            except Exception as e:
-                print(f"WMI CPU yöntemi 1 başarısız: {e}")
-            
-            # Yöntem 2: wmic path win32_processor get ProcessorId
-            try:
-                result = subprocess.run(
-                    ['wmic', 'path', 'win32_processor', 'get', 'ProcessorId'],
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                    creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                )
-                if result.returncode == 0 and result.stdout:
-                    lines = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
-                    for line in lines[1:]:
-                        if line and line.upper() != 'PROCESSORID':
-                            return line
-            except Exception as e:
-                print(f"WMI CPU yöntemi 2 başarısız: {e}")
-            
-            # Yöntem 3: PowerShell ile
-            try:
-                ps_cmd = 'Get-WmiObject Win32_Processor | Select-Object -ExpandProperty ProcessorId'
-                result = subprocess.run(
-                    ['powershell', '-Command', ps_cmd],
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                    creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                )
-                if result.returncode == 0 and result.stdout.strip():
-                    cpu_id = result.stdout.strip()
-                    if cpu_id:
-                        return cpu_id
-            except Exception as e:
-                print(f"PowerShell CPU yöntemi başarısız: {e}")
-        
-        elif system == "Linux":
-            try:
-                result = subprocess.run(
-                    ['cat', '/proc/cpuinfo'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if result.returncode == 0:
-                    # CPU ID veya serial number bul
-                    for line in result.stdout.split('\n'):
-                        if 'Serial' in line or 'serial' in line:
-                            parts = line.split(':')
-                            if len(parts) > 1:
-                                return parts[1].strip()
-            except Exception:
-                pass
-        
-        elif system == "Darwin":  # macOS
-            try:
-                result = subprocess.run(
-                    ['sysctl', '-n', 'machdep.cpu.brand_string'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if result.returncode == 0:
-                    return result.stdout.strip()
-            except Exception:
-                pass
-        
-        return "UNKNOWN_CPU"
-    
-    def _get_motherboard_serial(self) -> str:
-        """Motherboard Serial Number'ı al"""
-        system = platform.system()
-        
-        if system == "Windows":
-            # Yöntem 1: wmic baseboard get SerialNumber
-            try:
-                result = subprocess.run(
-                    ['wmic', 'baseboard', 'get', 'SerialNumber'],
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                    creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                )
-                if result.returncode == 0 and result.stdout:
-                    lines = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
-                    for line in lines[1:]:
-                        if line and line.upper() != 'SERIALNUMBER' and line != "To be filled by O.E.M.":
-                            return line
-            except Exception as e:
-                print(f"WMI MB yöntemi 1 başarısız: {e}")
-            
-            # Yöntem 2: wmic path win32_baseboard get SerialNumber
-            try:
-                result = subprocess.run(
-                    ['wmic', 'path', 'win32_baseboard', 'get', 'SerialNumber'],
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                    creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                )
-                if result.returncode == 0 and result.stdout:
-                    lines = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
-                    for line in lines[1:]:
-                        if line and line.upper() != 'SERIALNUMBER' and line != "To be filled by O.E.M.":
-                            return line
-            except Exception as e:
-                print(f"WMI MB yöntemi 2 başarısız: {e}")
-            
-            # Yöntem 3: PowerShell ile
-            try:
-                ps_cmd = 'Get-WmiObject Win32_BaseBoard | Select-Object -ExpandProperty SerialNumber'
-                result = subprocess.run(
-                    ['powershell', '-Command', ps_cmd],
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                    creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                )
-                if result.returncode == 0 and result.stdout.strip():
-                    mb_serial = result.stdout.strip()
-                    if mb_serial and mb_serial != "To be filled by O.E.M.":
-                        return mb_serial
-            except Exception as e:
-                print(f"PowerShell MB yöntemi başarısız: {e}")
-        
-        elif system == "Linux":
-            try:
-                result = subprocess.run(
-                    ['cat', '/sys/class/dmi/id/board_serial'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if result.returncode == 0:
-                    serial = result.stdout.strip()
-                    if serial:
-                        return serial
-            except Exception:
-                pass
-        
-        elif system == "Darwin":  # macOS
-            try:
-                result = subprocess.run(
-                    ['system_profiler', 'SPHardwareDataType'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if result.returncode == 0:
-                    # Serial Number satırını bul
-                    for line in result.stdout.split('\n'):
-                        if 'Serial Number' in line:
-                            parts = line.split(':')
-                            if len(parts) > 1:
-                                return parts[1].strip()
-            except Exception:
-                pass
-        
-        return "UNKNOWN_MB"
-    
-    def _get_disk_serial(self) -> str:
-        """Disk Serial Number'ı al (ilk disk)"""
-        system = platform.system()
-        
-        if system == "Windows":
-            # Yöntem 1: wmic diskdrive get SerialNumber
-            try:
-                result = subprocess.run(
-                    ['wmic', 'diskdrive', 'get', 'SerialNumber'],
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                    creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                )
-                if result.returncode == 0 and result.stdout:
-                    lines = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
-                    for line in lines[1:]:
-                        if line and line.upper() != 'SERIALNUMBER':
-                            return line
-            except Exception as e:
-                print(f"WMI Disk yöntemi 1 başarısız: {e}")
-            
-            # Yöntem 2: wmic path win32_diskdrive get SerialNumber
-            try:
-                result = subprocess.run(
-                    ['wmic', 'path', 'win32_diskdrive', 'get', 'SerialNumber'],
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                    creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                )
-                if result.returncode == 0 and result.stdout:
-                    lines = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
-                    for line in lines[1:]:
-                        if line and line.upper() != 'SERIALNUMBER':
-                            return line
-            except Exception as e:
-                print(f"WMI Disk yöntemi 2 başarısız: {e}")
-            
-            # Yöntem 3: PowerShell ile
-            try:
-                ps_cmd = 'Get-WmiObject Win32_DiskDrive | Select-Object -First 1 -ExpandProperty SerialNumber'
-                result = subprocess.run(
-                    ['powershell', '-Command', ps_cmd],
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                    creationflags=subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
-                )
-                if result.returncode == 0 and result.stdout.strip():
-                    disk_serial = result.stdout.strip()
-                    if disk_serial:
-                        return disk_serial
-            except Exception as e:
-                print(f"PowerShell Disk yöntemi başarısız: {e}")
-        
-        elif system == "Linux":
-            try:
-                # /dev/sda için serial number
-                result = subprocess.run(
-                    ['udevadm', 'info', '--query=property', '--name=/dev/sda'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if result.returncode == 0:
-                    for line in result.stdout.split('\n'):
-                        if 'ID_SERIAL=' in line:
-                            return line.split('=')[1].strip()
-            except Exception:
-                pass
-        
-        elif system == "Darwin":  # macOS
-            try:
-                result = subprocess.run(
-                    ['system_profiler', 'SPStorageDataType'],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if result.returncode == 0:
-                    # Serial Number bul
-                    for line in result.stdout.split('\n'):
-                        if 'Serial Number' in line:
-                            parts = line.split(':')
-                            if len(parts) > 1:
-                                return parts[1].strip()
-            except Exception:
-                pass
-        
-        return "UNKNOWN_DISK"
+        return self.hwid_provider.get_hwid()
     
     def verify_license(self, license_key: str) -> Tuple[bool, Optional[str]]:
         """
@@ -431,12 +101,24 @@ class LicenseManager:
         Returns:
             (is_valid, error_message) tuple
         """
+        is_valid, error_msg, _ = self._verify_with_hwid(license_key)
+        return is_valid, error_msg
+    
+    def _verify_with_hwid(self, license_key: str) -> Tuple[bool, Optional[str], bool]:
+        """
+        Lisans anahtarını mevcut HWID ile doğrula
+        
+        Returns:
+            (is_valid, error_message, hwid_tam_mı) tuple - HWID eksikse olumsuz
+            sonuç kesin değildir (bileşen süre bütçesini aşmış olabilir)
+        """
+        complete = True
         try:
             # Base64 decode
             signature_bytes = base64.b64decode(license_key)
             
             # Mevcut HWID'yi al
-            current_hwid = self.get_hwid()
+            current_hwid, complete = self.hwid_provider.resolve()
             
             # RSA doğrulama
             try:
@@ -446,12 +128,12 @@ class LicenseManager:
                     padding.PKCS1v15(),
                     hashes.SHA256()
                 )
-                return True, None
+                return True, None, complete
             except Exception as e:
-                return False, f"Lisans doğrulama hatası: {str(e)}"
+                return False, f"Lisans doğrulama hatası: {str(e)}", complete
         
         except Exception as e:
-            return False, f"Lisans anahtarı geçersiz: {str(e)}"
+            return False, f"Lisans anahtarı geçersiz: {str(e)}", complete
     
     def save_license(self, license_key: str) -> bool:
         """
@@ -512,16 +194,112 @@ class LicenseManager:
         """
         Sistemin lisanslı olup olmadığını kontrol et
         
+        Sonuç önbellekten döner; license.dat'ın mtime'ı değiştiyse, henüz
+        doğrulama yapılmadıysa veya olumsuz sonucun süresi (LICENSE_NEGATIVE_TTL)
+        dolduysa HWID + RSA doğrulaması tekrar çalışır.
+        
         Returns:
             Lisanslı ise True
         """
+        mtime = self._license_mtime()
+        with self._state_lock:
+            if self._cached_state is not None and self._cached_mtime == mtime:
+                if self._cached_state or time.monotonic() - self._cached_at < LICENSE_NEGATIVE_TTL:
+                    return self._cached_state
+        
+        return self.refresh_license_state()
+    
+    def refresh_license_state(self) -> bool:
+        """
+        Kayıtlı lisansı yeniden doğrula ve önbelleği güncelle
+        
+        Returns:
+            Lisanslı ise True
+        """
+        # mtime doğrulamadan önce alınır; doğrulama sırasında dosya
+        # değişirse bir sonraki is_licensed çağrısı tekrar doğrular
+        mtime = self._license_mtime()
+        is_valid = self._verify_saved_license()
+        if is_valid is None:
+            # Eksik HWID ile verilen olumsuz sonuç saklanmaz; bir sonraki istek tekrar doğrular
+            self.invalidate_license_state()
+            return False
+        self._publish_state(is_valid, mtime)
+        return is_valid
+    
+    def _verify_saved_license(self) -> Optional[bool]:
+        """
+        Kaydedilmiş lisansı dosyadan okuyup doğrula (önbelleksiz)
+        
+        Returns:
+            Lisanslı ise True, değilse False; HWID eksik üretildiği için
+            sonuç belirsizse None
+        """
         license_key = self.load_license()
         if not license_key:
             return False
         
-        is_valid, _ = self.verify_license(license_key)
+        is_valid, _, complete = self._verify_with_hwid(license_key)
+        if not is_valid and not complete:
+            print("[LISANS] HWID eksik üretildi, olumsuz sonuç önbelleğe alınmadı")
+            return None
         return is_valid
     
+    def _license_mtime(self) -> Optional[int]:
+        """license.dat'ın mtime'ını döndür (dosya yoksa None)"""
+        try:
+            return os.stat(self.license_file).st_mtime_ns
+        except OSError:
+            return None
+    
+    def _publish_state(self, is_valid: bool, mtime: Optional[int]):
+        """Doğrulama sonucunu önbelleğe yaz"""
+        with self._state_lock:
+            self._cached_state = is_valid
+            self._cached_mtime = mtime
+            self._cached_at = time.monotonic()
+    
+    def invalidate_license_state(self):
+        """Önbelleği temizle - bir sonraki kontrol tam doğrulama yapar"""
+        with self._state_lock:
+            self._cached_state = None
+            self._cached_mtime = None
+    
+    def start_background_verification(self, interval_seconds: float):
+        """
+        Lisansı belirli aralıklarla arka planda yeniden doğrula
+        
+        Args:
+            interval_seconds: Doğrulama aralığı (saniye). 0 veya negatifse başlatılmaz.
+        """
+        if interval_seconds <= 0:
+            return
+        if self._recheck_thread and self._recheck_thread.is_alive():
+            return
+        
+        self._recheck_stop.clear()
+        
+        def _loop():
+            while not self._recheck_stop.wait(interval_seconds):
+                try:
+                    self.refresh_license_state()
+                except Exception as e:
+                    print(f"Arka plan lisans doğrulaması başarısız: {e}")
+        
+        self._recheck_thread = threading.Thread(
+            target=_loop,
+            name="license-recheck",
+            daemon=True
+        )
+        self._recheck_thread.start()
+    
+    def stop_background_verification(self):
+        """Arka plan doğrulamasını durdur"""
+        self._recheck_stop.set()
+        if self._recheck_thread:
+            self._recheck_thread.join(timeout=5)
+            self._recheck_thread = None
+    
     def activate_license(self, license_key: str) -> Tuple[bool, str]:
         """
         Lisansı aktifleştir ve kaydet
@@ -539,7 +317,29 @@ class LicenseManager:
         
         # Kaydet
         if self.save_license(license_key):
+            # Yeni durumu önbelleğe yaz (middleware tekrar doğrulama yapmaz)
+            self._publish_state(True, self._license_mtime())
             return True, "Lisans başarıyla aktifleştirildi"
         else:
             return False, "Lisans kaydedilemedi"
 
+
+
+# Süreç genelinde paylaşılan LicenseManager (main.py, api/license.py, api/debug.py)
+_shared_license_manager: Optional[LicenseManager] = None
+_shared_lock = threading.Lock()
+
+
+def get_license_manager() -> LicenseManager:
+    """
+    Paylaşılan LicenseManager instance'ını döndür
+    
+    FastAPI dependency olarak kullanılır; tüm endpoint'ler ve middleware
+    aynı lisans durumu ve HWID önbelleğini görür.
+    """
+    global _shared_license_manager
+    if _shared_license_manager is None:
+        with _shared_lock:
+            if _shared_license_manager is None:
+                _shared_license_manager = LicenseManager()
+    return _shared_license_manager
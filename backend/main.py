@@ -1,13 +1,43 @@
-from fastapi import FastAPI, Request, HTTPException
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from api.upload import router as upload_router
 from api.files import router as files_router
 from api.companies import router as companies_router
 from api.license import router as license_router
-from license_manager import LicenseManager
+from api.documenteditor import router as documenteditor_router
+from license_manager import get_license_manager
+from workers import document_pool, shutdown_pools
+from search_index import search_index
+from file_index import company_files
 
-app = FastAPI(title="Form Yönetim Sistemi", version="1.0.0")
+# Paylaşılan LicenseManager instance (lisans endpoint'leri ile aynı önbellek)
+license_manager = get_license_manager()
+
+# Lisansın arka planda periyodik olarak yeniden doğrulanma aralığı (saniye, 0 = kapalı)
+LICENSE_RECHECK_INTERVAL = float(os.getenv("LICENSE_RECHECK_INTERVAL", "0"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Lisans durumu başlangıçta bir kez doğrulanır, middleware önbellekten okur
+    license_manager.refresh_license_state()
+    license_manager.start_background_verification(LICENSE_RECHECK_INTERVAL)
+    # Arama indeksi arka planda dosya sistemiyle senkronize edilir
+    search_index.start()
+    # Firma dosyaları ada göre indekslenir (her istekte klasör taranmaz)
+    company_files.start()
+    # Doküman süreçleri önceden açılır (ilk arama/parse süreç başlatmayı beklemez)
+    document_pool.warm_up(["api.files"])
+    yield
+    company_files.stop()
+    search_index.stop()
+    license_manager.stop_background_verification()
+    shutdown_pools()
+
+app = FastAPI(title="Form Yönetim Sistemi", version="1.0.0", lifespan=lifespan)
+app.state.license_manager = license_manager
 
 # CORS yapılandırması - frontend'den gelen isteklere izin ver
 app.add_middleware(
@@ -23,19 +53,18 @@ app.include_router(license_router, prefix="/api", tags=["license"])
 app.include_router(upload_router, prefix="/api", tags=["upload"])
 app.include_router(files_router, prefix="/api", tags=["files"])
 app.include_router(companies_router, prefix="/api", tags=["companies"])
+app.include_router(documenteditor_router, prefix="/api", tags=["documenteditor"])
 
 # Debug router (sorun giderme için)
 from api.debug import router as debug_router
 app.include_router(debug_router, prefix="/api", tags=["debug"])
 
-# LicenseManager instance
-license_manager = LicenseManager()
-
 # Korunması gereken endpoint'ler (lisans kontrolü yapılacak)
 PROTECTED_PATHS = [
     "/api/upload",
     "/api/files",
-    "/api/companies"
+    "/api/companies",
+    "/api/documenteditor"
 ]
 
 @app.get("/")
@@ -48,25 +77,44 @@ async def health():
 
 
 # Lisans kontrolü middleware
-@app.middleware("http")
-async def license_check_middleware(request: Request, call_next):
-    """Korumalı endpoint'ler için lisans kontrolü"""
-    path = request.url.path
-    
-    # Lisans endpoint'leri ve health check hariç
-    if path.startswith("/api/license") or path in ["/", "/health", "/docs", "/openapi.json", "/redoc"]:
-        return await call_next(request)
-    
-    # Korumalı path'ler için lisans kontrolü
-    if any(path.startswith(protected) for protected in PROTECTED_PATHS):
-        if not license_manager.is_licensed():
-            return JSONResponse(
-                status_code=403,
-                content={
-                    "error": "Lisans gerekli",
-                    "message": "Bu özelliği kullanmak için lisans gerekli. Lütfen lisansınızı aktifleştirin.",
-                    "hwid": license_manager.get_hwid()
-                }
-            )
-    
-    return await call_next(request)
+class LicenseCheckMiddleware:
+    """
+    Korumalı endpoint'ler için lisans kontrolü
+
+    Saf ASGI middleware: yanıt mesajlarına dokunmaz, dosya yanıtları sunucunun
+    zero-copy (sendfile) aktarımını kullanabilir.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+
+        # Lisans endpoint'leri ve health check hariç
+        if path.startswith("/api/license") or path in ["/", "/health", "/docs", "/openapi.json", "/redoc"]:
+            await self.app(scope, receive, send)
+            return
+
+        # Korumalı path'ler için lisans kontrolü
+        if any(path.startswith(protected) for protected in PROTECTED_PATHS):
+            license_manager = scope["app"].state.license_manager
+            if not license_manager.is_licensed():
+                response = JSONResponse(
+                    status_code=403,
+                    content={
+                        "error": "Lisans gerekli",
+                        "message": "Bu özelliği kullanmak için lisans gerekli. Lütfen lisansınızı aktifleştirin.",
+                        "hwid": license_manager.get_hwid()
+                    }
+                )
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
+
+app.add_middleware(LicenseCheckMiddleware)
@@ -0,0 +1,112 @@
+"""
+Media Store - Doküman resimleri için içerik adresli depo
+Resimler SHA-256 özetiyle adlandırılarak diske yazılır; parse edilen JSON sadece
+bu kimliği taşır, resim baytları ayrı bir endpoint'ten (ETag + immutable) sunulur.
+Aynı resim kaç dokümanda geçerse geçsin bir kez saklanır.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+MEDIA_CACHE_DIR = Path(os.getenv("MEDIA_CACHE_DIR", ".cache/media"))
+
+# Kimlik formatı: <sha256>.<uzantı>
+MEDIA_ID_PATTERN = re.compile(r'^[0-9a-f]{64}\.[a-z0-9]{1,8}$')
+
+
+class MediaStore:
+    """
+    İçerik adresli resim deposu
+
+    Kimlik içerikten türetildiği için bir kimliğin baytları asla değişmez;
+    farklı süreçler aynı resmi aynı anda yazsa bile sonuç aynıdır.
+    """
+
+    def __init__(self, root: Path = MEDIA_CACHE_DIR):
+        self.root = Path(root)
+
+    def put(self, data: bytes, extension: str) -> str:
+        """Baytları sakla, kimliği döndür"""
+        media_id = f"{hashlib.sha256(data).hexdigest()}.{self._normalize_extension(extension)}"
+        target = self._target(media_id)
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            self._write_atomic(target, lambda f: f.write(data))
+        return media_id
+
+    def put_stream(self, source: BinaryIO, extension: str) -> str:
+        """
+        Akıştaki resmi tamamını belleğe almadan sakla
+
+        Özet kopyalama sırasında hesaplanır, dosya sonra kimliğiyle yeniden adlandırılır.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in iter(lambda: source.read(1024 * 1024), b""):
+                    digest.update(chunk)
+                    tmp.write(chunk)
+
+            media_id = f"{digest.hexdigest()}.{self._normalize_extension(extension)}"
+            target = self._target(media_id)
+            if target.exists():
+                os.remove(tmp_name)
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_name, target)
+            return media_id
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+            raise
+
+    def path(self, media_id: str) -> Optional[Path]:
+        """Kimliğe ait dosya yolu (kimlik geçersizse veya dosya yoksa None)"""
+        if not MEDIA_ID_PATTERN.match(media_id):
+            return None
+        target = self._target(media_id)
+        return target if target.is_file() else None
+
+    def read(self, media_id: str) -> Optional[bytes]:
+        target = self.path(media_id)
+        if target is None:
+            return None
+        return target.read_bytes()
+
+    def open(self, media_id: str) -> Optional[BinaryIO]:
+        target = self.path(media_id)
+        if target is None:
+            return None
+        return open(target, "rb")
+
+    @staticmethod
+    def digest(media_id: str) -> str:
+        return media_id.split('.', 1)[0]
+
+    @staticmethod
+    def _normalize_extension(extension: str) -> str:
+        extension = (extension or "bin").lower().lstrip('.')
+        if extension == 'jpeg':
+            extension = 'jpg'
+        return extension if re.match(r'^[a-z0-9]{1,8}$', extension) else "bin"
+
+    def _target(self, media_id: str) -> Path:
+        # İlk iki karakterle alt klasörlere bölünür (tek klasörde çok dosya olmaması için)
+        return self.root / media_id[:2] / media_id
+
+    def _write_atomic(self, target: Path, write):
+        tmp_path = target.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as f:
+            write(f)
+        os.replace(tmp_path, target)
+
+
+# Süreç genelinde paylaşılan depo
+media_store = MediaStore()
@@ -0,0 +1,92 @@
+"""
+Package Writer - Office (zip) paketini değişen parçalarla yeniden yazar
+Değişmeyen parçaların sıkıştırılmış baytları açılmadan kopyalanır (CRC ve
+boyutlar kaynaktan alınır); sadece değişen parçalar sıkıştırılır. Kaydetme
+süresi paketin boyutuna (resimler, gömülü nesneler) değil değişikliğe bağlıdır.
+Sonuç geçici dosyaya yazılır ve atomik olarak hedefin yerine konur.
+"""
+
+import os
+import struct
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterable
+
+_LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+_LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+_DATA_DESCRIPTOR_FLAG = 0x08
+_COPY_BLOCK = 1024 * 1024
+
+
+def _copy_raw(src, info: zipfile.ZipInfo, zout: zipfile.ZipFile):
+    """Parçayı sıkıştırılmış haliyle kopyala (açılmaz, yeniden sıkıştırılmaz)"""
+    src.seek(info.header_offset)
+    header = src.read(_LOCAL_HEADER.size)
+    if len(header) != _LOCAL_HEADER.size or header[:4] != _LOCAL_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(f"Bozuk yerel başlık: {info.filename}")
+    name_length, extra_length = _LOCAL_HEADER.unpack(header)[-2:]
+    src.seek(name_length + extra_length, os.SEEK_CUR)
+
+    out_info = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    out_info.compress_type = info.compress_type
+    out_info.external_attr = info.external_attr
+    out_info.create_system = info.create_system
+    # Boyutlar başlığa yazıldığı için veri tanımlayıcısı (data descriptor) gerekmez
+    out_info.flag_bits = info.flag_bits & ~_DATA_DESCRIPTOR_FLAG
+    out_info.CRC = info.CRC
+    out_info.compress_size = info.compress_size
+    out_info.file_size = info.file_size
+
+    # zipfile.ZipFile.write ile aynı kayıt adımları
+    zip64 = info.file_size > zipfile.ZIP64_LIMIT or info.compress_size > zipfile.ZIP64_LIMIT
+    zout.fp.seek(zout.start_dir)
+    out_info.header_offset = zout.fp.tell()
+    zout._didModify = True
+    zout.filelist.append(out_info)
+    zout.NameToInfo[out_info.filename] = out_info
+    zout.fp.write(out_info.FileHeader(zip64))
+
+    remaining = info.compress_size
+    while remaining > 0:
+        block = src.read(min(_COPY_BLOCK, remaining))
+        if not block:
+            raise zipfile.BadZipFile(f"Parça verisi eksik: {info.filename}")
+        zout.fp.write(block)
+        remaining -= len(block)
+    zout.start_dir = zout.fp.tell()
+
+
+def write_package(base_path: Path, zin: zipfile.ZipFile, target_path: Path,
+                  replaced: Dict[str, bytes], removed: Iterable[str] = ()):
+    """
+    base_path paketini target_path'e yaz (base_path == target_path olabilir)
+
+    Args:
+        zin: base_path üzerinde açık arşiv (parça listesi ve sırası buradan alınır)
+        replaced: Parça yolu -> yeni içerik (kaynaktaki sıkıştırma yöntemiyle yazılır)
+        removed: Pakete alınmayacak parçalar
+    """
+    removed = set(removed)
+
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=target_path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        with open(base_path, 'rb') as src, zipfile.ZipFile(tmp_name, 'w') as zout:
+            for info in zin.infolist():
+                if info.filename in removed:
+                    continue
+
+                if info.filename in replaced:
+                    out_info = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+                    out_info.compress_type = info.compress_type
+                    out_info.external_attr = info.external_attr
+                    zout.writestr(out_info, replaced[info.filename])
+                else:
+                    _copy_raw(src, info, zout)
+        os.replace(tmp_name, target_path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        raise
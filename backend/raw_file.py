@@ -0,0 +1,220 @@
+"""
+Raw File - Ham dosya yanıtları (koşullu GET, byte aralığı, sıfır kopya aktarım)
+Şablon ve firma dosyaları güçlü ETag ve Last-Modified ile sunulur; değişmemiş
+dosyayı yeniden açan istemci 304 alır ve gövde gönderilmez. Range istekleri
+(tek aralık) 206 ile yanıtlanır. Sunucu ASGI zero-copy eklentisini sunuyorsa
+gövde sendfile ile çekirdekte aktarılır, sunmuyorsa parça parça okunur.
+"""
+
+import mimetypes
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from fastapi import Request
+from fastapi.responses import Response
+
+# Zero-copy yoksa okuma parça boyutu
+RAW_FILE_CHUNK_SIZE = int(os.getenv("RAW_FILE_CHUNK_KB", "256")) * 1024
+
+# Sistem mime tablosunda olmayabilen Office türleri
+CONTENT_TYPES = {
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    '.doc': 'application/msword',
+    '.xls': 'application/vnd.ms-excel',
+}
+
+
+class RangeNotSatisfiable(Exception):
+    """İstenen aralık dosyanın dışında"""
+
+
+def content_type(filename: str) -> str:
+    """Uzantıya göre içerik türü"""
+    extension = Path(filename).suffix.lower()
+    return CONTENT_TYPES.get(extension) or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+def file_etag(stat_result: os.stat_result) -> str:
+    """
+    Güçlü ETag: inode, nanosaniye mtime ve boyut
+
+    Kaydetmeler dosyayı atomik olarak değiştirdiği (os.replace) için her yeni
+    sürüm yeni bir inode ve mtime alır.
+    """
+    return f'"{stat_result.st_ino:x}-{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+
+
+def _etag_matches(header: str, etag: str, weak: bool) -> bool:
+    """If-None-Match (zayıf karşılaştırma) / If-Range (güçlü karşılaştırma)"""
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            if not weak:
+                continue
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def _not_modified_since(header: str, stat_result: os.stat_result) -> bool:
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return int(stat_result.st_mtime) <= since
+
+
+def _byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Range başlığından tek aralık (başlangıç, bitiş dahil)
+
+    Anlaşılamayan veya çoklu aralıklarda None döner (tüm dosya gönderilir).
+
+    Raises:
+        RangeNotSatisfiable: Aralık dosyanın dışındaysa
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    start, sep, end = spec.strip().partition('-')
+    if not sep:
+        return None
+    try:
+        if not start:
+            # bytes=-N: son N bayt
+            length = int(end)
+            if length <= 0:
+                raise RangeNotSatisfiable()
+            return max(size - length, 0), size - 1
+        first = int(start)
+        last = int(end) if end else size - 1
+    except ValueError:
+        return None
+    if first >= size:
+        raise RangeNotSatisfiable()
+    if last < first:
+        return None
+    return first, min(last, size - 1)
+
+
+class RawFileResponse(Response):
+    """Dosyanın [offset, offset + length) bölümünü gönderir"""
+
+    def __init__(self, path: Path, offset: int, length: int, status_code: int,
+                 headers: dict, media_type: str):
+        self.path = path
+        self.offset = offset
+        self.length = length
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.init_headers(headers)
+
+    async def __call__(self, scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+
+        if scope["method"].upper() == "HEAD" or self.length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if "http.response.zerocopy" in scope.get("extensions", {}):
+            # Sunucu baytları sendfile ile doğrudan sokete aktarır
+            with open(self.path, "rb") as f:
+                await send({
+                    "type": "http.response.zerocopy",
+                    "file": f,
+                    "offset": self.offset,
+                    "count": self.length,
+                    "more_body": False,
+                })
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as f:
+            await f.seek(self.offset)
+            remaining = self.length
+            while remaining > 0:
+                chunk = await f.read(min(RAW_FILE_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": remaining > 0,
+                })
+            if remaining > 0:
+                # Dosya okunurken kısaldı; yanıt yine de kapatılır
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def raw_file_response(file_path: Path, request: Request, filename: str) -> Response:
+    """
+    Ham dosya yanıtı: 304 / 206 / 416 / 200
+
+    İstemci her açılışta doğrular (no-cache); dosya değişmediyse tek bir
+    gövdesiz 304 turu yeterlidir.
+    """
+    stat_result = os.stat(file_path)
+    size = stat_result.st_size
+    etag = file_etag(stat_result)
+    last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": "private, no-cache",
+        "Accept-Ranges": "bytes",
+    }
+
+    # Koşullu GET: If-None-Match varsa If-Modified-Since yok sayılır
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag, weak=True):
+            return Response(status_code=304, headers=headers)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and _not_modified_since(if_modified_since, stat_result):
+            return Response(status_code=304, headers=headers)
+
+    encoded_name = quote(filename)
+    if encoded_name != filename:
+        headers["Content-Disposition"] = f"attachment; filename*=utf-8''{encoded_name}"
+    else:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    media_type = content_type(filename)
+
+    # Range yalnızca If-Range (varsa) güncel sürümü gösteriyorsa uygulanır
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and if_range:
+        if if_range.strip().startswith(('"', 'W/')):
+            range_header = range_header if _etag_matches(if_range, etag, weak=False) else None
+        else:
+            range_header = range_header if if_range.strip() == last_modified else None
+
+    if range_header:
+        try:
+            byte_range = _byte_range(range_header, size)
+        except RangeNotSatisfiable:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return RawFileResponse(file_path, start, end - start + 1, 206, headers, media_type)
+
+    headers["Content-Length"] = str(size)
+    return RawFileResponse(file_path, 0, size, 200, headers, media_type)
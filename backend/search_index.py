@@ -0,0 +1,415 @@
+"""
+Search Index - Firma dosyaları için kalıcı tam metin arama indeksi
+Hücre değerleri, paragraf/tablo metinleri, dosya adları, iş emri numaraları ve
+firma adları SQLite FTS5 (trigram) tablosunda tutulur. İndeks başlangıçta
+dosya sistemiyle senkronize edilir, sonra kaydetme/silme/yeniden adlandırma
+işlemleriyle artımlı olarak güncellenir.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import BrokenExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from docx_text import iter_docx_text
+from fs_walk import walk
+from workers import PoolBusyError, document_pool
+from xlsx_text import iter_xlsx_text
+
+SEARCH_INDEX_PATH = Path(os.getenv("SEARCH_INDEX_PATH", ".cache/search_index.db"))
+COMPANIES_DIR = Path("firmalar")
+
+INDEXED_EXTENSIONS = {'.xlsx', '.xls', '.docx', '.doc'}
+
+# Metin çıkarma mantığı değiştiğinde artırılır (indeks yeniden oluşturulur)
+INDEX_VERSION = "3"
+
+# Doküman havuzu dolu/bozuk olduğu için indekslenemeyen dosyalar yeniden denenir:
+# ilk bekleme INDEX_RETRY_SECONDS, her denemede iki katı, en fazla INDEX_RETRY_LIMIT deneme
+INDEX_RETRY_SECONDS = float(os.getenv("INDEX_RETRY_SECONDS", "2"))
+INDEX_RETRY_LIMIT = int(os.getenv("INDEX_RETRY_LIMIT", "6"))
+_RETRYABLE_ERRORS = (PoolBusyError, BrokenExecutor)
+
+
+def extract_text(file_path: Path) -> str:
+    """Dokümandaki aranabilir metni çıkar (küçük harfe çevrilmiş)"""
+    extension = file_path.suffix.lower()
+    parts: List[str] = []
+
+    try:
+        if extension in ['.xlsx', '.xls']:
+            parts.extend(iter_xlsx_text(file_path))
+        elif extension in ['.docx', '.doc']:
+            parts.extend(iter_docx_text(file_path))
+    except Exception as e:
+        print(f"[INDEX] Metin çıkarılamadı ({file_path.name}): {e}")
+
+    return "\n".join(parts).lower()
+
+
+class SearchIndex:
+    """
+    SQLite FTS5 tabanlı arama indeksi
+
+    Tüm yazma işlemleri tek bir arka plan thread'inde sırayla yapılır;
+    endpoint'ler sadece değişikliği bildirir (notify_*), beklemez.
+    """
+
+    def __init__(self, db_path: Path = SEARCH_INDEX_PATH, root: Path = COMPANIES_DIR):
+        self.db_path = Path(db_path)
+        self.root = Path(root)
+        self.ready = False
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        # Göreli yol -> (dosya, deneme zamanı, deneme sayısı); sadece indeksleyici thread'i kullanır
+        self._retries: Dict[str, Tuple[Path, float, int]] = {}
+        # İlk senkronizasyonda yeniden denemeye kalan dosyalar (bitince ready olur)
+        self._sync_pending: Set[str] = set()
+
+    # ------------------------------------------------------------------
+    # Yaşam döngüsü
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Veritabanını aç, arka plan indeksleyicisini başlat ve ilk senkronizasyonu kuyruğa ekle"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        try:
+            self._open()
+        except sqlite3.Error as e:
+            # Örn. SQLite 3.34'ten eski: trigram tokenizer yok. Aramalar dosya taramasıyla yapılır
+            print(f"[INDEX] Arama indeksi açılamadı, indeksleme devre dışı: {e}")
+            return
+
+        self._thread = threading.Thread(target=self._worker, name="search-indexer", daemon=True)
+        self._thread.start()
+        self._queue.put(("sync",))
+
+    def stop(self):
+        if self._thread and self._thread.is_alive():
+            self._queue.put(("stop",))
+            self._thread.join(timeout=5)
+        self._thread = None
+
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+
+    def _open(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if not row or row[0] != INDEX_VERSION:
+                conn.execute("DROP TABLE IF EXISTS files")
+                conn.execute("DROP TABLE IF EXISTS file_text")
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT NOT NULL UNIQUE,
+                    company TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    work_order TEXT,
+                    extension TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL
+                )
+            """)
+            # Metinler küçük harfle saklanır; trigram tokenizer alt dize aramasını indeksler
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS file_text USING fts5(
+                    filename, company, work_order, body,
+                    tokenize = 'trigram case_sensitive 1'
+                )
+            """)
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (INDEX_VERSION,))
+            conn.commit()
+        except sqlite3.Error:
+            conn.close()
+            raise
+
+        with self._lock:
+            self._conn = conn
+
+    # ------------------------------------------------------------------
+    # Değişiklik bildirimleri (endpoint'lerden çağrılır, bloklamaz)
+    # ------------------------------------------------------------------
+
+    def notify_changed(self, file_path: Path):
+        """Dosya oluşturuldu veya değişti"""
+        self._notify("index", file_path)
+
+    def notify_removed(self, file_path: Path):
+        """Dosya silindi"""
+        self._notify("remove", file_path)
+
+    def notify_removed_tree(self, dir_path: Path):
+        """Klasör (örn. firma) tüm içeriğiyle silindi"""
+        self._notify("remove_tree", dir_path)
+
+    def notify_renamed(self, old_path: Path, new_path: Path):
+        self.notify_removed(old_path)
+        self.notify_changed(new_path)
+
+    def _notify(self, action: str, path: Path):
+        # İndeksleyici çalışmıyorsa (indeks açılamadı) kuyruk birikmez
+        if self._thread is not None:
+            self._queue.put((action, Path(path)))
+
+    # ------------------------------------------------------------------
+    # Arama
+    # ------------------------------------------------------------------
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        """
+        İndekste ara (query küçük harfli olmalı)
+
+        Returns:
+            /search endpoint'inin döndürdüğü formatta sonuç listesi
+        """
+        if len(query) >= 3:
+            # Trigram indeksi ile alt dize araması
+            sql = """
+                SELECT f.path, f.company, f.filename, f.work_order, f.extension
+                FROM file_text JOIN files f ON f.id = file_text.rowid
+                WHERE file_text MATCH ?
+                ORDER BY f.company, f.path
+            """
+            params = ('"' + query.replace('"', '""') + '"',)
+        else:
+            # 3 karakterden kısa sorgular trigram ile indekslenemez - tablo taranır
+            sql = """
+                SELECT f.path, f.company, f.filename, f.work_order, f.extension
+                FROM file_text JOIN files f ON f.id = file_text.rowid
+                WHERE instr(file_text.filename, ?) > 0 OR instr(file_text.company, ?) > 0
+                   OR instr(file_text.work_order, ?) > 0 OR instr(file_text.body, ?) > 0
+                ORDER BY f.company, f.path
+            """
+            params = (query,) * 4
+
+        with self._lock:
+            if self._conn is None:
+                return []
+            rows = self._conn.execute(sql, params).fetchall()
+
+        results = []
+        for path, company, filename, work_order, extension in rows:
+            # İndeks güncellemesi henüz işlenmemiş silinmiş dosyaları atla
+            if not (self.root / path).exists():
+                continue
+
+            if query in filename.lower():
+                reason = "Dosya adı eşleşti"
+            elif work_order and query in work_order.lower():
+                reason = "İş emri no eşleşti"
+            elif query in company.lower():
+                reason = "Firma adı eşleşti"
+            else:
+                reason = "Dosya içeriği eşleşti"
+
+            results.append({
+                "filename": filename,
+                "company": company,
+                "path": path.split('/', 1)[1] if '/' in path else path,
+                "reason": reason,
+                "extension": extension
+            })
+        return results
+
+    # ------------------------------------------------------------------
+    # Arka plan indeksleyici
+    # ------------------------------------------------------------------
+
+    def _worker(self):
+        while True:
+            try:
+                task = self._queue.get(timeout=self._retry_wait())
+            except queue.Empty:
+                self._run_retries()
+                continue
+
+            action = task[0]
+            try:
+                if action == "stop":
+                    return
+                elif action == "sync":
+                    self._sync()
+                elif action == "index":
+                    self._try_index(task[1])
+                elif action == "remove":
+                    rel = self._rel_path(task[1])
+                    self._forget_retry(rel)
+                    self._remove(rel)
+                elif action == "remove_tree":
+                    rel = self._rel_path(task[1])
+                    for path in [p for p in self._retries if rel and p.startswith(rel + '/')]:
+                        self._forget_retry(path)
+                    self._remove_tree(rel)
+            except Exception as e:
+                print(f"[INDEX] İndeks güncellenemedi ({action}): {e}")
+            self._run_retries()
+
+    # ------------------------------------------------------------------
+    # Yeniden deneme (havuz dolu/bozuk)
+    # ------------------------------------------------------------------
+
+    def _retry_wait(self) -> Optional[float]:
+        """Kuyrukta beklenecek süre: en yakın yeniden denemeye kadar (yoksa süresiz)"""
+        if not self._retries:
+            return None
+        due = min(due for _, due, _ in self._retries.values())
+        return max(due - time.monotonic(), 0)
+
+    def _run_retries(self):
+        now = time.monotonic()
+        for rel, (file_path, due, attempt) in list(self._retries.items()):
+            if due <= now:
+                del self._retries[rel]
+                self._try_index(file_path, attempt)
+
+    def _try_index(self, file_path: Path, attempt: int = 0):
+        """
+        Dosyayı indeksle; doküman havuzu dolu veya bozuksa bekleyip yeniden dene
+
+        Diğer hatalar loglanır, dosya bir sonraki değişiklik bildirimine kadar atlanır.
+        """
+        rel = self._rel_path(file_path)
+        try:
+            self._index_file(file_path)
+        except _RETRYABLE_ERRORS as e:
+            if rel and attempt < INDEX_RETRY_LIMIT:
+                delay = INDEX_RETRY_SECONDS * (2 ** attempt)
+                self._retries[rel] = (file_path, time.monotonic() + delay, attempt + 1)
+                return
+            print(f"[INDEX] {file_path.name} indekslenemedi, {attempt} denemeden sonra vazgeçildi: {e}")
+        except Exception as e:
+            print(f"[INDEX] {file_path.name} indekslenemedi: {e}")
+        self._forget_retry(rel)
+
+    def _forget_retry(self, rel: Optional[str]):
+        self._retries.pop(rel, None)
+        if rel in self._sync_pending:
+            self._sync_pending.discard(rel)
+            self._mark_ready()
+
+    def _mark_ready(self):
+        """İlk senkronizasyon (yeniden denemeleriyle birlikte) bittiyse aramaları indekse aç"""
+        if not self.ready and not self._sync_pending:
+            self.ready = True
+            print("[INDEX] Arama indeksi hazır")
+
+    def _rel_path(self, file_path: Path) -> Optional[str]:
+        try:
+            return file_path.resolve().relative_to(self.root.resolve()).as_posix()
+        except (ValueError, OSError):
+            return None
+
+    def _sync(self):
+        """İndeksi dosya sistemiyle karşılaştır, değişen dosyaları yeniden indeksle"""
+        with self._lock:
+            known = {
+                path: (size, mtime_ns)
+                for path, size, mtime_ns in self._conn.execute("SELECT path, size, mtime_ns FROM files")
+            }
+
+        seen = set()
+        updated = 0
+        for record in walk(self.root, extensions=INDEXED_EXTENSIONS):
+            rel = record.rel
+            if '/' not in rel:
+                continue  # Firma klasörü dışındaki dosyalar aranmaz
+            seen.add(rel)
+
+            if known.get(rel) == (record.size, record.mtime_ns):
+                continue
+            self._try_index(self.root / rel)
+            updated += 1
+
+        removed = [path for path in known if path not in seen]
+        for path in removed:
+            self._forget_retry(path)
+            self._remove(path)
+
+        # Havuz dolu olduğu için kalanlar arka planda yeniden denenir; ready onlar bitince
+        self._sync_pending = set(self._retries)
+        print(f"[INDEX] Senkronizasyon tamamlandı: {len(seen)} dosya, {updated} güncellendi, "
+              f"{len(removed)} silindi, {len(self._sync_pending)} yeniden denenecek")
+        self._mark_ready()
+
+    def _index_file(self, file_path: Path):
+        rel = self._rel_path(file_path)
+        if not rel or '/' not in rel or file_path.suffix.lower() not in INDEXED_EXTENSIONS:
+            return
+
+        try:
+            stat = file_path.stat()
+        except OSError:
+            self._remove(rel)
+            return
+
+        # Metin çıkarma doküman havuzunda çalışır (event loop ve istekler etkilenmez);
+        # metin doğrudan indekse yazılır, parse önbelleğinde yer kaplamaz
+        body = document_pool.call(extract_text, file_path)
+
+        parts = rel.split('/')
+        company = parts[0]
+        work_order = parts[-2] if len(parts) > 2 else None
+
+        with self._lock:
+            conn = self._conn
+            row = conn.execute("SELECT id FROM files WHERE path = ?", (rel,)).fetchone()
+            if row:
+                conn.execute("DELETE FROM file_text WHERE rowid = ?", (row[0],))
+                conn.execute("DELETE FROM files WHERE id = ?", (row[0],))
+
+            cursor = conn.execute(
+                "INSERT INTO files (path, company, filename, work_order, extension, size, mtime_ns) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (rel, company, file_path.name, work_order, file_path.suffix.lower(), stat.st_size, stat.st_mtime_ns)
+            )
+            conn.execute(
+                "INSERT INTO file_text (rowid, filename, company, work_order, body) VALUES (?, ?, ?, ?, ?)",
+                (cursor.lastrowid, file_path.name.lower(), company.lower(), (work_order or "").lower(), body)
+            )
+            conn.commit()
+
+    def _remove(self, rel: Optional[str]):
+        if not rel:
+            return
+        with self._lock:
+            row = self._conn.execute("SELECT id FROM files WHERE path = ?", (rel,)).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM file_text WHERE rowid = ?", (row[0],))
+                self._conn.execute("DELETE FROM files WHERE id = ?", (row[0],))
+                self._conn.commit()
+
+    def _remove_tree(self, rel: Optional[str]):
+        if not rel:
+            return
+        prefix = rel.rstrip('/') + '/'
+        with self._lock:
+            ids = [row[0] for row in self._conn.execute(
+                "SELECT id FROM files WHERE substr(path, 1, ?) = ?", (len(prefix), prefix)
+            )]
+            for file_id in ids:
+                self._conn.execute("DELETE FROM file_text WHERE rowid = ?", (file_id,))
+                self._conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+            self._conn.commit()
+
+
+# Süreç genelinde paylaşılan indeks
+search_index = SearchIndex()
@@ -0,0 +1,14 @@
+"""
+Test yapılandırması - backend modülleri düz (paket değil) olduğu için
+backend klasörü import yoluna eklenir.
+
+Çalıştırma (backend klasöründen): python -m pytest -q tests
+"""
+
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
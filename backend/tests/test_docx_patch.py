@@ -0,0 +1,172 @@
+"""
+docx_patch gidiş-dönüş testleri: read_word verisi düzenlenip yazılır, sonuç
+python-docx ve docx_text ile okunur
+"""
+
+import copy
+import zipfile
+
+import docx
+import pytest
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import Pt, RGBColor
+
+from docx_patch import DocxPatchUnsupported, patch_docx
+from docx_text import read_docx
+
+
+def _parts(path):
+    with zipfile.ZipFile(path) as z:
+        return {name: z.read(name) for name in z.namelist()}
+
+
+@pytest.fixture
+def document(tmp_path):
+    doc = docx.Document()
+    section = doc.sections[0]
+    section.header.paragraphs[0].text = "SAKA Kalite - Üst Bilgi"
+    section.footer.paragraphs[0].text = "Sayfa alt bilgisi"
+
+    doc.add_heading("Prosedür", level=1)
+    bold = doc.add_paragraph().add_run("Kalın metin")
+    bold.bold = True
+    doc.add_paragraph("İş emri: SM-100")
+
+    # 3x3 tablo: üst satırda yatay, ilk sütunda dikey birleştirme
+    table = doc.add_table(rows=3, cols=3)
+    table.cell(0, 0).text = "Başlık"
+    table.cell(0, 1).merge(table.cell(0, 2)).text = "Yatay"
+    table.cell(1, 0).merge(table.cell(2, 0)).text = "Dikey"
+    table.cell(1, 1).text = "x"
+    table.cell(2, 2).text = "y"
+
+    path = tmp_path / "P.01.docx"
+    doc.save(path)
+    return path
+
+
+def test_unchanged_content_keeps_document_bytes(document, tmp_path):
+    target = tmp_path / "out.docx"
+    patch_docx(document, target, read_docx(document))
+
+    assert _parts(target) == _parts(document)
+
+
+def test_paragraph_text_round_trip(document, tmp_path):
+    content = read_docx(document)
+    content["paragraphs"][2]["text"] = "İş emri: SM-200"
+    content["paragraphs"][1]["text"] = "  baştaki ve sondaki boşluk  "
+
+    target = tmp_path / "out.docx"
+    patch_docx(document, target, content)
+
+    paragraphs = docx.Document(target).paragraphs
+    assert paragraphs[2].text == "İş emri: SM-200"
+    assert paragraphs[1].text == "  baştaki ve sondaki boşluk  "
+    # İlk run'ın biçimi yeni metinde korunur
+    assert paragraphs[1].runs[0].bold
+    assert paragraphs[0].style.name == "Heading 1"
+
+
+def test_header_footer_preserved(document, tmp_path):
+    content = read_docx(document)
+    content["paragraphs"][0]["text"] = "Yeni başlık"
+
+    target = tmp_path / "out.docx"
+    patch_docx(document, target, content)
+
+    base_parts, out_parts = _parts(document), _parts(target)
+    assert set(out_parts) == set(base_parts)
+    for name in base_parts:
+        if name != "word/document.xml":
+            assert out_parts[name] == base_parts[name], name
+
+    section = docx.Document(target).sections[0]
+    assert section.header.paragraphs[0].text == "SAKA Kalite - Üst Bilgi"
+    assert section.footer.paragraphs[0].text == "Sayfa alt bilgisi"
+
+
+def test_format_and_alignment_round_trip(document, tmp_path):
+    content = read_docx(document)
+    para = content["paragraphs"][2]
+    para["format"].update(bold=True, italic=True, underline=True, font_size=14,
+                          font_name="Arial", font_color="FF336699")
+    para["alignment"] = "CENTER (1)"
+    content["paragraphs"][1]["format"]["bold"] = False
+
+    target = tmp_path / "out.docx"
+    patch_docx(document, target, content)
+
+    paragraphs = docx.Document(target).paragraphs
+    run = paragraphs[2].runs[0]
+    assert run.bold and run.italic and run.underline
+    assert run.font.size == Pt(14)
+    assert run.font.name == "Arial"
+    assert run.font.color.rgb == RGBColor(0x33, 0x66, 0x99)
+    assert paragraphs[2].alignment == WD_ALIGN_PARAGRAPH.CENTER
+    assert not paragraphs[1].runs[0].bold
+
+    # Okunan veri yazılanla aynı
+    assert read_docx(target)["paragraphs"][2]["format"]["font_color"] == "336699"
+
+
+def test_merged_cells_preserved(document, tmp_path):
+    content = read_docx(document)
+    table = content["tables"][0]
+    # Birleştirilmiş hücre kapladığı her konumda tekrarlanır; düzenlenen kopya geçerlidir
+    table[0][2] = dict(table[0][2], text="Yatay yeni")
+    table[2][0] = dict(table[2][0], text="Dikey yeni")
+    table[1][1] = dict(table[1][1], text="satır 1\nsatır 2")
+
+    target = tmp_path / "out.docx"
+    patch_docx(document, target, content)
+
+    result = docx.Document(target).tables[0]
+    assert result.cell(0, 1)._tc is result.cell(0, 2)._tc
+    assert result.cell(1, 0)._tc is result.cell(2, 0)._tc
+    assert result.cell(0, 1).text == "Yatay yeni"
+    assert result.cell(1, 0).text == "Dikey yeni"
+    assert [p.text for p in result.cell(1, 1).paragraphs] == ["satır 1", "satır 2"]
+    assert result.cell(2, 2).text == "y"
+
+    reread = read_docx(target)["tables"][0]
+    assert [cell["text"] for cell in reread[0]] == ["Başlık", "Yatay yeni", "Yatay yeni"]
+    assert [row[0]["text"] for row in reread] == ["Başlık", "Dikey yeni", "Dikey yeni"]
+
+
+def test_patch_in_place(document):
+    content = read_docx(document)
+    content["paragraphs"][2]["text"] = "yerinde"
+
+    patch_docx(document, document, content)
+
+    assert docx.Document(document).paragraphs[2].text == "yerinde"
+    assert not list(document.parent.glob("*.tmp"))
+
+
+@pytest.mark.parametrize("change", [
+    lambda content: content["paragraphs"].append(copy.deepcopy(content["paragraphs"][-1])),
+    lambda content: content["tables"][0].pop(),
+    lambda content: content["tables"][0][1].append({"text": "fazla"}),
+    lambda content: content["tables"].append([]),
+    lambda content: content["paragraphs"].__setitem__(0, "metin"),
+])
+def test_structure_change_rejected(document, change):
+    before = document.read_bytes()
+    content = read_docx(document)
+    change(content)
+
+    with pytest.raises(DocxPatchUnsupported):
+        patch_docx(document, document, content)
+
+    # Dosyaya dokunulmaz, geçici dosya kalmaz
+    assert document.read_bytes() == before
+    assert not list(document.parent.glob("*.tmp"))
+
+
+def test_invalid_package_rejected(tmp_path):
+    path = tmp_path / "broken.docx"
+    path.write_bytes(b"not a zip")
+
+    with pytest.raises(DocxPatchUnsupported):
+        patch_docx(path, tmp_path / "out.docx", {"paragraphs": [], "tables": []})
@@ -0,0 +1,29 @@
+"""
+docx_text testleri: read_docx tabloları python-docx ile aynı okumalı
+"""
+
+import docx
+
+from docx_text import iter_docx_text, read_docx
+
+
+def test_large_table_matches_python_docx(tmp_path):
+    doc = docx.Document()
+    table = doc.add_table(rows=60, cols=6)
+    for i in range(60):
+        for j in range(6):
+            table.cell(i, j).text = f"{i}-{j}"
+    table.cell(0, 0).merge(table.cell(0, 1)).text = "yatay"
+    table.cell(10, 2).merge(table.cell(14, 2)).text = "dikey"
+    path = tmp_path / "tablo.docx"
+    doc.save(path)
+
+    expected = [[cell.text for cell in row.cells] for row in docx.Document(path).tables[0].rows]
+    # Hücre önbelleği eleman kimliğine bağlı; tekrarlı okumalar aynı sonucu vermeli
+    for _ in range(5):
+        table_data = read_docx(path)["tables"][0]
+        assert [[cell["text"] for cell in row] for row in table_data] == expected
+
+    texts = list(iter_docx_text(path))
+    assert texts.count("yatay") == 1
+    assert texts.count("dikey") == 1
@@ -0,0 +1,78 @@
+"""
+package_writer testleri: değişmeyen parçalar sıkıştırılmış baytlarıyla aynen kopyalanır
+"""
+
+import os
+import zipfile
+
+import pytest
+
+from package_writer import write_package
+
+
+def _raw_members(path):
+    """Parça adı -> (sıkıştırma yöntemi, CRC, sıkıştırılmış baytlar)"""
+    members = {}
+    with zipfile.ZipFile(path) as z, open(path, "rb") as f:
+        for info in z.infolist():
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = int.from_bytes(f.read(2), "little"), int.from_bytes(f.read(2), "little")
+            f.seek(name_length + extra_length, os.SEEK_CUR)
+            members[info.filename] = (info.compress_type, info.CRC, f.read(info.compress_size))
+    return members
+
+
+@pytest.fixture
+def package(tmp_path):
+    path = tmp_path / "paket.xlsx"
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr(zipfile.ZipInfo("[Content_Types].xml", (2024, 1, 15, 10, 0, 0)), b"<Types/>",
+                   compress_type=zipfile.ZIP_DEFLATED)
+        z.writestr("xl/workbook.xml", b"<workbook>" + b"<sheet/>" * 1000 + b"</workbook>",
+                   compress_type=zipfile.ZIP_DEFLATED)
+        z.writestr("xl/calcChain.xml", b"<calcChain/>", compress_type=zipfile.ZIP_DEFLATED)
+        z.writestr("xl/media/image1.png", os.urandom(256 * 1024), compress_type=zipfile.ZIP_STORED)
+        z.writestr("xl/media/image2.emf", b"\x01\x02" * 50000, compress_type=zipfile.ZIP_DEFLATED)
+    return path
+
+
+def test_unchanged_parts_copied_raw(package, tmp_path):
+    target = tmp_path / "out.xlsx"
+    write_package(package, zipfile.ZipFile(package), target,
+                  {"xl/workbook.xml": b"<workbook/>"}, removed=["xl/calcChain.xml"])
+
+    with zipfile.ZipFile(target) as z:
+        assert z.testzip() is None
+        assert z.namelist() == ["[Content_Types].xml", "xl/workbook.xml",
+                                "xl/media/image1.png", "xl/media/image2.emf"]
+        assert z.read("xl/workbook.xml") == b"<workbook/>"
+        assert z.getinfo("xl/workbook.xml").compress_type == zipfile.ZIP_DEFLATED
+        assert z.getinfo("[Content_Types].xml").date_time == (2024, 1, 15, 10, 0, 0)
+
+    base, out = _raw_members(package), _raw_members(target)
+    for name in ("[Content_Types].xml", "xl/media/image1.png", "xl/media/image2.emf"):
+        assert out[name] == base[name], name
+
+
+def test_in_place(package):
+    before = zipfile.ZipFile(package).read("xl/media/image1.png")
+    with zipfile.ZipFile(package) as zin:
+        write_package(package, zin, package, {"xl/calcChain.xml": b"<calcChain></calcChain>"})
+
+    with zipfile.ZipFile(package) as z:
+        assert z.testzip() is None
+        assert z.read("xl/media/image1.png") == before
+        assert z.read("xl/calcChain.xml") == b"<calcChain></calcChain>"
+    assert not list(package.parent.glob("*.tmp"))
+
+
+def test_failure_leaves_target_untouched(package, tmp_path):
+    target = tmp_path / "out.xlsx"
+    target.write_bytes(b"eski")
+
+    with zipfile.ZipFile(package) as zin:
+        with pytest.raises(TypeError):
+            write_package(package, zin, target, {"xl/workbook.xml": object()})
+
+    assert target.read_bytes() == b"eski"
+    assert not list(tmp_path.glob("*.tmp"))
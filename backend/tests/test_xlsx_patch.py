@@ -0,0 +1,176 @@
+"""
+xlsx_patch gidiş-dönüş testleri: yama yazılır, sonuç openpyxl ile okunur
+"""
+
+import zipfile
+
+import openpyxl
+import pytest
+from openpyxl.styles import Font, PatternFill
+from openpyxl.worksheet.formula import ArrayFormula
+
+from xlsx_patch import XlsxPatchUnsupported, patch_xlsx
+
+
+def _parts(path):
+    with zipfile.ZipFile(path) as z:
+        return {name: z.read(name) for name in z.namelist()}
+
+
+def _rewrite_part(path, part, replace):
+    """Paket içindeki tek bir XML parçasını değiştir (openpyxl'in yazamadığı yapılar için)"""
+    parts = _parts(path)
+    parts[part] = replace(parts[part].decode("utf-8")).encode("utf-8")
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        for name, data in parts.items():
+            z.writestr(name, data)
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Form"
+    ws["A1"] = "İş Emri No"
+    ws["B1"] = "SM-100"
+    ws["A2"] = 3
+    ws["A3"] = 4
+    ws["A4"] = "=SUM(A2:A3)"
+    ws["B2"] = 1.5
+    ws["B2"].font = Font(bold=True, color="FFFF0000")
+    ws["B2"].fill = PatternFill("solid", fgColor="FFFFFF00")
+    ws["B2"].number_format = "0.00"
+    ws.merge_cells("C1:D1")
+    ws.column_dimensions["A"].width = 30
+
+    second = wb.create_sheet("Ikinci")
+    second["A1"] = "ikinci sayfa"
+
+    path = tmp_path / "form.xlsx"
+    wb.save(path)
+    return path
+
+
+def test_values_round_trip(workbook, tmp_path):
+    target = tmp_path / "out.xlsx"
+    patch_xlsx(workbook, target, [
+        {"sheet": "Form", "coordinate": "B1", "value": "SM-200"},
+        {"sheet": "Form", "coordinate": "A2", "value": 10},
+        {"sheet": "Form", "coordinate": "A3", "value": 2.25},
+        {"sheet": "Form", "coordinate": "C5", "value": True},
+        {"sheet": "Form", "coordinate": "A1", "value": None},
+        {"sheet": "Form", "coordinate": "E10", "value": "  boşluklu metin "},
+        {"sheet": "Olmayan", "coordinate": "A1", "value": "atlanır"},
+    ])
+
+    ws = openpyxl.load_workbook(target)["Form"]
+    assert ws["B1"].value == "SM-200"
+    assert ws["A2"].value == 10
+    assert ws["A3"].value == 2.25
+    assert ws["C5"].value is True
+    assert ws["A1"].value is None
+    assert ws["E10"].value == "  boşluklu metin "
+    assert ws.max_row == 10 and ws.max_column == 5
+
+    # Yamalanmayan sayfa değişmeden kopyalanır
+    base_parts, out_parts = _parts(workbook), _parts(target)
+    assert out_parts["xl/worksheets/sheet2.xml"] == base_parts["xl/worksheets/sheet2.xml"]
+
+
+def test_patch_in_place(workbook):
+    patch_xlsx(workbook, workbook, [{"sheet": "Ikinci", "coordinate": "A1", "value": "güncel"}])
+
+    assert openpyxl.load_workbook(workbook)["Ikinci"]["A1"].value == "güncel"
+    assert not list(workbook.parent.glob("*.tmp"))
+
+
+def test_formulas_round_trip(workbook, tmp_path):
+    target = tmp_path / "out.xlsx"
+    patch_xlsx(workbook, target, [
+        {"sheet": "Form", "coordinate": "A4", "value": None, "formula": "=A2*A3"},
+        {"sheet": "Form", "coordinate": "B3", "value": "=A2+1"},
+        {"sheet": "Form", "coordinate": "B4", "value": "="},
+    ])
+
+    ws = openpyxl.load_workbook(target)["Form"]
+    assert ws["A4"].value == "=A2*A3"
+    assert ws["B3"].value == "=A2+1"
+    # Tek başına '=' formül değil, metindir
+    assert ws["B4"].value == "="
+
+    # Önbellekteki formül sonuçları eskidiği için açılışta yeniden hesaplanır
+    assert b'fullCalcOnLoad="1"' in _parts(target)["xl/workbook.xml"]
+
+
+def test_styles_preserved(workbook, tmp_path):
+    target = tmp_path / "out.xlsx"
+    patch_xlsx(workbook, target, [{"sheet": "Form", "coordinate": "B2", "value": 7.5}])
+
+    ws = openpyxl.load_workbook(target)["Form"]
+    cell = ws["B2"]
+    assert cell.value == 7.5
+    assert cell.font.bold
+    assert cell.font.color.rgb == "FFFF0000"
+    assert cell.fill.fgColor.rgb == "FFFFFF00"
+    assert cell.number_format == "0.00"
+    assert "C1:D1" in {str(r) for r in ws.merged_cells.ranges}
+    assert ws.column_dimensions["A"].width == 30
+
+    assert _parts(target)["xl/styles.xml"] == _parts(workbook)["xl/styles.xml"]
+
+
+def test_active_sheet(workbook, tmp_path):
+    target = tmp_path / "out.xlsx"
+    patch_xlsx(workbook, target, [], active_sheet="Ikinci")
+
+    wb = openpyxl.load_workbook(target)
+    assert wb.active.title == "Ikinci"
+    assert not wb["Form"].sheet_view.tabSelected
+
+
+def test_array_formula_rejected(tmp_path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws["A1"], ws["A2"] = 1, 2
+    ws["B1"] = ArrayFormula("B1:B2", "=A1:A2*2")
+    path = tmp_path / "array.xlsx"
+    wb.save(path)
+    before = path.read_bytes()
+
+    with pytest.raises(XlsxPatchUnsupported):
+        patch_xlsx(path, path, [{"sheet": "Sheet", "coordinate": "B1", "value": 5}])
+
+    # Dosyaya dokunulmaz, geçici dosya kalmaz
+    assert path.read_bytes() == before
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_shared_formula_master_rejected(tmp_path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    for row in range(1, 4):
+        ws.cell(row, 1, row)
+    ws["B1"] = "=A1*2"
+    ws["B2"] = "=A2*2"
+    path = tmp_path / "shared.xlsx"
+    wb.save(path)
+    # openpyxl paylaşılan formül yazmaz; Excel'in yazdığı biçime çevrilir
+    _rewrite_part(path, "xl/worksheets/sheet1.xml", lambda xml: xml
+                  .replace('<f>A1*2</f>', '<f t="shared" ref="B1:B2" si="0">A1*2</f>')
+                  .replace('<f>A2*2</f>', '<f t="shared" si="0"/>'))
+
+    with pytest.raises(XlsxPatchUnsupported):
+        patch_xlsx(path, tmp_path / "out.xlsx", [{"sheet": "Sheet", "coordinate": "B1", "value": 1}])
+    assert not (tmp_path / "out.xlsx").exists()
+
+    # Bağlı hücre (ref'siz) yazılabilir
+    patch_xlsx(path, tmp_path / "out.xlsx", [{"sheet": "Sheet", "coordinate": "B2", "value": 9}])
+    assert openpyxl.load_workbook(tmp_path / "out.xlsx")["Sheet"]["B2"].value == 9
+
+
+def test_invalid_package_rejected(tmp_path):
+    path = tmp_path / "broken.xlsx"
+    path.write_bytes(b"not a zip")
+
+    with pytest.raises(XlsxPatchUnsupported):
+        patch_xlsx(path, tmp_path / "out.xlsx", [{"sheet": "Sheet", "coordinate": "A1", "value": 1}])
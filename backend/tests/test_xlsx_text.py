@@ -0,0 +1,98 @@
+"""
+xlsx_text testleri: çıkarılan metinler openpyxl'deki str(cell.value) ile aynı olmalı
+"""
+
+import datetime
+import zipfile
+
+import openpyxl
+import pytest
+
+from xlsx_text import iter_xlsx_text, xlsx_contains
+
+
+def _openpyxl_texts(path):
+    wb = openpyxl.load_workbook(path)
+    return sorted(str(cell.value) for ws in wb for row in ws.iter_rows() for cell in row
+                  if cell.value is not None and str(cell.value) != "")
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws["A1"] = "Kontrol Tarihi"
+    ws["B1"] = datetime.datetime(2024, 1, 15)
+    ws["B2"] = datetime.datetime(2024, 3, 5, 14, 30)
+    ws["B3"] = datetime.date(2023, 12, 31)
+    ws["B4"] = datetime.time(8, 45)
+    ws["B5"] = datetime.timedelta(hours=30, minutes=15)
+    ws["C1"] = 42
+    ws["C2"] = 3.5
+    ws["C3"] = True
+    ws["C4"] = "=SUM(C1:C2)"
+    wb.create_sheet("Ikinci")["A1"] = "SM-128"
+
+    path = tmp_path / "form.xlsx"
+    wb.save(path)
+    return path
+
+
+def test_texts_match_openpyxl(workbook):
+    assert sorted(iter_xlsx_text(workbook)) == _openpyxl_texts(workbook)
+
+
+def test_date_cells_searchable(workbook):
+    texts = list(iter_xlsx_text(workbook))
+    assert "2024-01-15 00:00:00" in texts
+    assert "45306" not in texts
+
+    assert xlsx_contains(workbook, "2024-01-15")
+    assert xlsx_contains(workbook, "2024-03-05 14:30")
+    assert xlsx_contains(workbook, "08:45")
+    assert xlsx_contains(workbook, "1 day, 6:15")
+    assert not xlsx_contains(workbook, "2025-01-15")
+
+
+def test_date1904_epoch(tmp_path):
+    wb = openpyxl.Workbook()
+    wb.epoch = openpyxl.utils.datetime.CALENDAR_MAC_1904
+    wb.active["A1"] = datetime.datetime(2024, 1, 15)
+    path = tmp_path / "mac.xlsx"
+    wb.save(path)
+
+    assert list(iter_xlsx_text(path)) == ["2024-01-15 00:00:00"]
+    assert xlsx_contains(path, "2024-01-15")
+
+
+def test_unreferenced_shared_strings_ignored(workbook, tmp_path):
+    with zipfile.ZipFile(workbook) as z:
+        parts = {name: z.read(name).decode("utf-8") for name in z.namelist()}
+
+    # A1 paylaşılan metne taşınır; ikinci metni (şablonda kalmış) hiçbir hücre kullanmaz
+    parts["xl/worksheets/sheet1.xml"] = parts["xl/worksheets/sheet1.xml"].replace(
+        '<c r="A1" t="inlineStr"><is><t>Kontrol Tarihi</t></is></c>', '<c r="A1" t="s"><v>0</v></c>')
+    parts["xl/sharedStrings.xml"] = (
+        '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" count="1" uniqueCount="2">'
+        '<si><t>Kontrol Tarihi</t></si><si><t>eski şablon metni</t></si></sst>'
+    )
+    parts["xl/_rels/workbook.xml.rels"] = parts["xl/_rels/workbook.xml.rels"].replace(
+        "</Relationships>",
+        '<Relationship Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings"'
+        ' Target="sharedStrings.xml" Id="rIdSst"/></Relationships>')
+    parts["[Content_Types].xml"] = parts["[Content_Types].xml"].replace(
+        "</Types>",
+        '<Override PartName="/xl/sharedStrings.xml"'
+        ' ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/></Types>')
+
+    path = tmp_path / "stale.xlsx"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        for name, data in parts.items():
+            z.writestr(name, data)
+
+    texts = list(iter_xlsx_text(path))
+    assert "Kontrol Tarihi" in texts
+    assert "eski şablon metni" not in texts
+    assert xlsx_contains(path, "kontrol tarihi")
+    assert not xlsx_contains(path, "eski şablon")
+    assert sorted(texts) == _openpyxl_texts(path)
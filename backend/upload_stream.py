@@ -0,0 +1,496 @@
+"""
+Upload Stream - Şablon yüklemelerini diske doğrudan akıtan yükleme katmanı
+FastAPI'nin UploadFile yolu her dosyayı önce geçici dosyaya (SpooledTemporaryFile)
+yazar, endpoint de onu tekrar hedefe kopyalar: her bayt diske iki kez yazılır.
+Burada multipart gövdesi istek akışından parça parça çözülür ve her dosyanın
+parçaları, hedef klasördeki geçici dosyaya aiofiles ile doğrudan yazılır; dosya
+bitince os.replace ile yerine taşınır (yarım dosya hiçbir zaman görünmez).
+
+Her dosyanın kendi yazıcı görevi vardır: ağdan okuma bir sonraki dosyaya
+geçerken önceki dosyanın diske yazılması ve kapanışı paralel devam eder.
+Dosya başına ve istek başına boyut sınırları akış sırasında uygulanır.
+
+Büyük şablon paketleri için devam ettirilebilir oturumlar (UploadSessionStore):
+istemci oturum açar, dosyayı offset'li parçalar halinde gönderir, bağlantı
+koparsa kaldığı yerden devam eder.
+"""
+
+import asyncio
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+import aiofiles
+import aiofiles.os
+from fastapi import HTTPException
+
+from workers import io_pool
+
+try:
+    import multipart
+    from multipart.multipart import parse_options_header
+except ModuleNotFoundError:  # pragma: nocover
+    parse_options_header = None
+    multipart = None
+
+TEMPLATES_DIR = Path("form_sablonlari")
+
+# Boyut sınırları (MB)
+UPLOAD_MAX_FILE_MB = int(os.getenv("UPLOAD_MAX_FILE_MB", "200"))
+UPLOAD_MAX_REQUEST_MB = int(os.getenv("UPLOAD_MAX_REQUEST_MB", "1024"))
+# Yazıcı başına bekleyen parça sayısı (ağ diskten hızlıysa okuma burada yavaşlar)
+UPLOAD_WRITE_QUEUE = int(os.getenv("UPLOAD_WRITE_QUEUE", "16"))
+
+# İçerik doğrulayıcı: (dosya yolu, dosya adı) -> hata mesajı veya None
+Validator = Callable[[str, str], Optional[str]]
+
+# Devam ettirilebilir oturumlar
+UPLOAD_SESSION_DIR = Path(os.getenv("UPLOAD_SESSION_DIR", ".cache/uploads"))
+UPLOAD_CHUNK_MB = int(os.getenv("UPLOAD_CHUNK_MB", "8"))
+UPLOAD_SESSION_TTL_HOURS = float(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24"))
+
+MAX_FILE_SIZE = UPLOAD_MAX_FILE_MB * 1024 * 1024
+MAX_REQUEST_SIZE = UPLOAD_MAX_REQUEST_MB * 1024 * 1024
+CHUNK_SIZE = UPLOAD_CHUNK_MB * 1024 * 1024
+
+SESSION_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+class UploadTooLarge(HTTPException):
+    """İstek veya parça boyut sınırını aşıyor"""
+
+    def __init__(self, detail: str):
+        super().__init__(status_code=413, detail=f"Yükleme boyut sınırı aşıldı: {detail}")
+
+
+def safe_filename(filename: str) -> str:
+    """İstemcinin gönderdiği addan klasör kısmını at (../ ile dışarı yazılamaz)"""
+    name = filename.replace("\\", "/").rsplit("/", 1)[-1].strip()
+    return "" if name in (".", "..") else name
+
+
+def _format_mb(size: int) -> str:
+    return f"{size / (1024 * 1024):.0f} MB"
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# ----------------------------------------------------------------------
+# Multipart akışı
+# ----------------------------------------------------------------------
+
+_END = object()
+_ABORT = object()
+
+
+class _FileWriter:
+    """
+    Tek dosyanın yazıcı görevi
+
+    Parçalar kuyruktan alınıp hedef klasördeki geçici dosyaya yazılır; bitince
+    (doğrulayıcı varsa içerik kontrolünden sonra) hedefin üzerine taşınır. Disk hatasında kuyruk boşaltılmaya devam eder
+    (okuyan taraf kuyrukta takılı kalmaz), hata sonuçta raporlanır.
+    """
+
+    def __init__(self, filename: str, target: Path, validate: Optional[Validator] = None):
+        self.filename = filename
+        self.target = target
+        self.validate = validate
+        self.size = 0
+        self.error: Optional[str] = None
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(UPLOAD_WRITE_QUEUE, 1))
+        self._task = asyncio.create_task(self._run())
+
+    async def write(self, data: bytes):
+        self.size += len(data)
+        await self._queue.put(data)
+
+    async def finish(self):
+        await self._queue.put(_END)
+
+    async def abort(self, reason: Optional[str] = None):
+        if reason and not self.error:
+            self.error = reason
+        await self._queue.put(_ABORT)
+
+    async def wait(self):
+        await self._task
+
+    async def _run(self):
+        fd, tmp_name = tempfile.mkstemp(dir=self.target.parent, prefix=".upload-", suffix=".part")
+        os.close(fd)
+        completed = False
+        try:
+            async with aiofiles.open(tmp_name, "wb") as out:
+                while True:
+                    item = await self._queue.get()
+                    if item is _END:
+                        completed = self.error is None
+                        break
+                    if item is _ABORT:
+                        break
+                    if self.error is None:
+                        try:
+                            await out.write(item)
+                        except OSError as e:
+                            self.error = f"Dosya yazma hatası: {str(e)}"
+            if completed and self.validate is not None:
+                self.error = await io_pool.run(self.validate, tmp_name, self.filename)
+            if completed and not self.error:
+                await aiofiles.os.replace(tmp_name, self.target)
+        except OSError as e:
+            self.error = f"Dosya yazma hatası: {str(e)}"
+        finally:
+            if not completed or self.error:
+                _remove_quietly(tmp_name)
+
+
+class _Part:
+    """Multipart gövdesindeki bir bölüm (dosya değilse veya reddedildiyse writer None)"""
+
+    def __init__(self):
+        self.disposition = b""
+        self.filename: Optional[str] = None
+        self.writer: Optional[_FileWriter] = None
+        self.error: Optional[str] = None
+        self.ended = False
+
+
+async def stream_multipart(headers, stream: AsyncIterator[bytes], target_dir: Path,
+                           check_filename: Callable[[str], Optional[str]],
+                           validate: Optional[Validator] = None) -> List[dict]:
+    """
+    Multipart istek gövdesindeki dosyaları hedef klasöre akıt
+
+    Args:
+        headers: İstek başlıkları (Content-Type, Content-Length)
+        stream: İstek gövdesi (request.stream())
+        target_dir: Dosyaların yazılacağı klasör
+        check_filename: Dosya adı kabul edilmiyorsa hata mesajı döndürür
+        validate: Dosya yerine taşınmadan önce içeriği kontrol eder (thread havuzunda)
+
+    Returns:
+        Gövdedeki sırayla her dosya için {"filename", "path", "size"} veya
+        {"filename", "error"}. Dosya sınırını aşan dosya hata olarak raporlanır,
+        diğer dosyalar yüklenmeye devam eder.
+
+    Raises:
+        HTTPException: Gövde multipart değilse (400)
+        UploadTooLarge: İstek sınırı aşılırsa; yarım kalan dosyalar silinir
+    """
+    if multipart is None:
+        raise HTTPException(status_code=500, detail="python-multipart kurulu değil")
+
+    content_type, params = parse_options_header(headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="multipart/form-data bekleniyor")
+
+    content_length = headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_REQUEST_SIZE:
+        raise UploadTooLarge(f"istek en fazla {_format_mb(MAX_REQUEST_SIZE)} olabilir")
+
+    parts: List[_Part] = []
+    # Parser callback'leri senkron çalışır; olaylar burada biriktirilip her ağ
+    # parçasından sonra async olarak işlenir
+    events: list = []
+    header_state = {"field": b"", "value": b""}
+
+    def on_part_begin():
+        parts.append(_Part())
+
+    def on_header_field(data, start, end):
+        header_state["field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        header_state["value"] += data[start:end]
+
+    def on_header_end():
+        if header_state["field"].lower() == b"content-disposition":
+            parts[-1].disposition = header_state["value"]
+        header_state["field"] = b""
+        header_state["value"] = b""
+
+    def on_headers_finished():
+        events.append(("open", parts[-1], None))
+
+    def on_part_data(data, start, end):
+        events.append(("data", parts[-1], data[start:end]))
+
+    def on_part_end():
+        events.append(("end", parts[-1], None))
+
+    callbacks = {
+        "on_part_begin": on_part_begin,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+    }
+    parser = multipart.MultipartParser(boundary, callbacks)
+
+    async def open_part(part: _Part):
+        _, options = parse_options_header(part.disposition)
+        if b"filename" not in options:
+            return  # Form alanı, dosya değil
+        raw_name = options[b"filename"].decode("utf-8", errors="replace")
+        part.filename = safe_filename(raw_name)
+        if not part.filename:
+            part.error = "Dosya adı geçersiz"
+            return
+        error = check_filename(part.filename)
+        if error:
+            part.error = error
+            return
+        part.writer = _FileWriter(part.filename, target_dir / part.filename, validate)
+
+    async def feed(part: _Part, data: bytes):
+        writer = part.writer
+        if writer is None or part.error:
+            return
+        if writer.size + len(data) > MAX_FILE_SIZE:
+            part.error = f"Dosya boyutu {_format_mb(MAX_FILE_SIZE)} sınırını aşıyor"
+            await writer.abort(part.error)
+            return
+        await writer.write(data)
+
+    async def close_part(part: _Part):
+        part.ended = True
+        if part.writer is not None and not part.error:
+            await part.writer.finish()
+
+    received = 0
+    try:
+        async for chunk in stream:
+            received += len(chunk)
+            if received > MAX_REQUEST_SIZE:
+                raise UploadTooLarge(f"istek en fazla {_format_mb(MAX_REQUEST_SIZE)} olabilir")
+            parser.write(chunk)
+            for kind, part, data in events:
+                if kind == "open":
+                    await open_part(part)
+                elif kind == "data":
+                    await feed(part, data)
+                else:
+                    await close_part(part)
+            events.clear()
+        parser.finalize()
+    except BaseException as e:
+        # İstek yarıda kaldı (sınır, bozuk gövde, bağlantı koptu): bitmemiş dosyalar
+        # yerine taşınmaz, tamamı gelmiş olanlar kalır
+        for part in parts:
+            if part.writer is not None and not part.ended and not part.error:
+                await part.writer.abort("İstek tamamlanamadı")
+        await asyncio.gather(*(p.writer.wait() for p in parts if p.writer is not None),
+                             return_exceptions=True)
+        if isinstance(e, multipart.exceptions.MultipartParseError):
+            raise HTTPException(status_code=400, detail=f"Geçersiz multipart gövdesi: {str(e)}")
+        raise
+
+    # Gövde bölüm ortasında bittiyse o dosya yarımdır
+    for part in parts:
+        if part.writer is not None and not part.error and not part.ended:
+            part.error = "Dosya gövdesi eksik"
+            await part.writer.abort(part.error)
+    await asyncio.gather(*(p.writer.wait() for p in parts if p.writer is not None))
+
+    results = []
+    for part in parts:
+        if part.filename is None and part.error is None:
+            continue
+        error = part.error or (part.writer.error if part.writer is not None else None)
+        if error:
+            results.append({"filename": part.filename or "bilinmiyor", "error": error})
+        else:
+            results.append({
+                "filename": part.filename,
+                "path": str(target_dir / part.filename),
+                "size": part.writer.size
+            })
+    return results
+
+
+# ----------------------------------------------------------------------
+# Devam ettirilebilir yükleme oturumları
+# ----------------------------------------------------------------------
+
+class UploadSessionStore:
+    """
+    Parça parça yüklenen dosyaların oturumları
+
+    Her oturum UPLOAD_SESSION_DIR altında <id>.json (ad, boyut) ve <id>.part
+    (şimdiye kadar gelen baytlar) olarak tutulur; alınan bayt sayısı .part
+    dosyasının boyutudur, bu yüzden sunucu yeniden başlasa da yükleme kaldığı
+    yerden devam eder. Dosya tamamlanınca hedef klasöre taşınır.
+    """
+
+    def __init__(self, root: Path = UPLOAD_SESSION_DIR, target_dir: Path = TEMPLATES_DIR):
+        self.root = Path(root)
+        self.target_dir = Path(target_dir)
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def create(self, filename: str, size: int, validate: Optional[Validator] = None) -> dict:
+        """Yeni oturum aç (boyutu sıfır olan dosya hemen tamamlanır)"""
+        if size < 0:
+            raise HTTPException(status_code=400, detail="Dosya boyutu geçersiz")
+        if size > MAX_FILE_SIZE:
+            raise UploadTooLarge(f"dosya en fazla {_format_mb(MAX_FILE_SIZE)} olabilir")
+
+        self.cleanup_expired()
+        self.root.mkdir(parents=True, exist_ok=True)
+        upload_id = uuid.uuid4().hex
+        meta = {"upload_id": upload_id, "filename": filename, "size": size, "created": time.time()}
+        self._part_path(upload_id).touch()
+        self._write_meta(upload_id, meta)
+        if size == 0:
+            return self._complete(upload_id, meta, validate)
+        return self._state(meta, 0)
+
+    def get(self, upload_id: str) -> dict:
+        meta = self._read_meta(upload_id)
+        return self._state(meta, self._received(upload_id))
+
+    async def append(self, upload_id: str, offset: int, stream: AsyncIterator[bytes],
+                     content_length: Optional[int] = None,
+                     validate: Optional[Validator] = None) -> dict:
+        """
+        offset konumundan itibaren gelen parçayı ekle
+
+        offset sunucudaki alınan bayt sayısına eşit olmalıdır; değilse 409 döner
+        (istemci oturum durumunu okuyup doğru offset'ten devam eder). Parça
+        yarıda kesilirse yazılan kısım kalır, bir sonraki offset onu içerir.
+        Son parçada içerik doğrulanamazsa oturum silinir ve 400 döner.
+        """
+        lock = self._locks.setdefault(upload_id, asyncio.Lock())
+        async with lock:
+            meta = self._read_meta(upload_id)
+            received = self._received(upload_id)
+            if offset != received:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Offset uyuşmuyor: sunucuda {received} bayt var",
+                    headers={"Upload-Offset": str(received)}
+                )
+            limit = min(meta["size"] - received, CHUNK_SIZE)
+            if content_length is not None and content_length > limit:
+                raise UploadTooLarge(f"parça en fazla {limit} bayt olabilir")
+
+            written = 0
+            async with aiofiles.open(self._part_path(upload_id), "r+b") as out:
+                await out.seek(received)
+                try:
+                    async for chunk in stream:
+                        written += len(chunk)
+                        if written > limit:
+                            raise UploadTooLarge(f"parça en fazla {limit} bayt olabilir")
+                        await out.write(chunk)
+                except UploadTooLarge:
+                    await out.truncate(received)
+                    raise
+
+            received += written
+            if received == meta["size"]:
+                return await io_pool.run(self._complete, upload_id, meta, validate)
+            return self._state(meta, received)
+
+    def delete(self, upload_id: str):
+        self._read_meta(upload_id)
+        self._discard(upload_id)
+
+    def cleanup_expired(self):
+        """Süresi geçmiş (yarım bırakılmış) oturumları sil"""
+        if not self.root.exists():
+            return
+        deadline = time.time() - UPLOAD_SESSION_TTL_HOURS * 3600
+        for entry in os.scandir(self.root):
+            upload_id, ext = os.path.splitext(entry.name)
+            if ext != ".json" or not SESSION_ID_PATTERN.match(upload_id):
+                continue
+            try:
+                # Son parça geldiğinde .part dosyasının mtime'ı güncellenir
+                touched = max(entry.stat().st_mtime, os.path.getmtime(self._part_path(upload_id)))
+            except FileNotFoundError:
+                touched = 0
+            if touched < deadline:
+                self._discard(upload_id)
+
+    def _complete(self, upload_id: str, meta: dict, validate: Optional[Validator] = None) -> dict:
+        if validate is not None:
+            error = validate(str(self._part_path(upload_id)), meta["filename"])
+            if error:
+                self._discard(upload_id)
+                raise HTTPException(status_code=400, detail=error)
+        self.target_dir.mkdir(parents=True, exist_ok=True)
+        target = self.target_dir / meta["filename"]
+        # Oturum klasörü başka bir diskte olabilir; os.replace yalnızca aynı diskte çalışır
+        tmp_fd, tmp_name = tempfile.mkstemp(dir=self.target_dir, prefix=".upload-", suffix=".part")
+        os.close(tmp_fd)
+        try:
+            try:
+                os.replace(self._part_path(upload_id), tmp_name)
+            except OSError:
+                shutil.move(str(self._part_path(upload_id)), tmp_name)
+            os.replace(tmp_name, target)
+        except BaseException:
+            _remove_quietly(tmp_name)
+            raise
+        self._discard(upload_id)
+        state = self._state(meta, meta["size"])
+        state["file"] = {"filename": meta["filename"], "path": str(target), "size": meta["size"]}
+        return state
+
+    def _state(self, meta: dict, received: int) -> dict:
+        return {
+            "upload_id": meta["upload_id"],
+            "filename": meta["filename"],
+            "size": meta["size"],
+            "received": received,
+            "chunk_size": CHUNK_SIZE,
+            "completed": received == meta["size"]
+        }
+
+    def _received(self, upload_id: str) -> int:
+        try:
+            return os.path.getsize(self._part_path(upload_id))
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Yükleme oturumu bulunamadı")
+
+    def _read_meta(self, upload_id: str) -> dict:
+        if not SESSION_ID_PATTERN.match(upload_id):
+            raise HTTPException(status_code=404, detail="Yükleme oturumu bulunamadı")
+        try:
+            with open(self._meta_path(upload_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            raise HTTPException(status_code=404, detail="Yükleme oturumu bulunamadı")
+
+    def _write_meta(self, upload_id: str, meta: dict):
+        with open(self._meta_path(upload_id), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    def _discard(self, upload_id: str):
+        _remove_quietly(str(self._part_path(upload_id)))
+        _remove_quietly(str(self._meta_path(upload_id)))
+        self._locks.pop(upload_id, None)
+
+    def _part_path(self, upload_id: str) -> Path:
+        return self.root / f"{upload_id}.part"
+
+    def _meta_path(self, upload_id: str) -> Path:
+        return self.root / f"{upload_id}.json"
+
+
+upload_sessions = UploadSessionStore()
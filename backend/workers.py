@@ -0,0 +1,173 @@
+"""
+Worker Pools - Bloklayan doküman işlemlerini event loop dışında çalıştırır
+Excel/Word parse ve kaydetme işlemleri süreç havuzunda (çok çekirdek),
+dosya sistemi işlemleri (tarama, kopyalama, silme) thread havuzunda çalışır.
+Her havuzun eşzamanlı iş ve kuyruk derinliği sınırı vardır; sınır aşılırsa 503 döner.
+"""
+
+import asyncio
+import importlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Iterable, Optional
+
+from fastapi import HTTPException
+
+# Doküman (CPU) havuzu: parse ve kaydetme
+DOCUMENT_WORKERS = int(os.getenv("DOCUMENT_WORKERS", str(os.cpu_count() or 2)))
+DOCUMENT_QUEUE_LIMIT = int(os.getenv("DOCUMENT_QUEUE_LIMIT", "32"))
+# "process" (çok çekirdek) veya "thread" (tek süreç, hata ayıklama için)
+DOCUMENT_WORKER_MODE = os.getenv("DOCUMENT_WORKER_MODE", "process")
+
+# Dosya sistemi (I/O) havuzu
+IO_WORKERS = int(os.getenv("IO_WORKERS", "16"))
+IO_QUEUE_LIMIT = int(os.getenv("IO_QUEUE_LIMIT", "256"))
+
+
+class PoolBusyError(HTTPException):
+    """Havuzun kuyruk sınırı dolu - istemci daha sonra tekrar denemeli"""
+
+    def __init__(self, pool_name: str):
+        super().__init__(
+            status_code=503,
+            detail=f"Sunucu şu anda yoğun ({pool_name}). Lütfen biraz sonra tekrar deneyin.",
+            headers={"Retry-After": "2"}
+        )
+
+
+class WorkerPool:
+    """
+    Sınırlı kuyruklu iş havuzu
+
+    Aynı anda en fazla max_workers iş çalışır, queue_limit kadar iş bekleyebilir.
+    Executor ilk kullanımda oluşturulur.
+    """
+
+    def __init__(self, name: str, max_workers: int, queue_limit: int, use_processes: bool = False):
+        self.name = name
+        self.max_workers = max(max_workers, 1)
+        self.queue_limit = max(queue_limit, 0)
+        self.use_processes = use_processes
+
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.queue_limit
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """İşi havuzda çalıştır ve sonucunu bekle (event loop bloklanmaz)"""
+        self._acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            try:
+                return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+            except BrokenExecutor:
+                self._discard(executor)
+                raise
+        finally:
+            self._release()
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """İşi havuzda çalıştır ve sonucunu bekle (thread içinden kullanım için)"""
+        self._acquire()
+        try:
+            executor = self._get_executor()
+            try:
+                return executor.submit(func, *args, **kwargs).result()
+            except BrokenExecutor:
+                self._discard(executor)
+                raise
+        finally:
+            self._release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = self._pending
+        return {
+            "name": self.name,
+            "max_workers": self.max_workers,
+            "queue_limit": self.queue_limit,
+            "pending": pending,
+            "mode": "process" if self.use_processes else "thread"
+        }
+
+    def warm_up(self, modules: Iterable[str] = ()):
+        """
+        Süreçleri önceden başlat ve modülleri içlerinde yükle
+
+        İlk isteğin süreç açılışını ve import süresini beklememesi için
+        uygulama başlangıcında çağrılır; sonucu beklenmez.
+        """
+        if not self.use_processes:
+            return
+        executor = self._get_executor()
+        modules = tuple(modules)
+        for _ in range(self.max_workers):
+            executor.submit(_preload_modules, modules)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _discard(self, executor: Executor):
+        """Bozulan executor'ı bırak (ör. bir süreç öldü); sonraki iş yenisini oluşturur"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _acquire(self):
+        with self._lock:
+            if self._pending >= self.capacity:
+                raise PoolBusyError(self.name)
+            self._pending += 1
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.use_processes:
+                        # spawn: thread'li bir süreçten fork etmek kilitlenmelere yol açabilir
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.max_workers,
+                            mp_context=multiprocessing.get_context("spawn")
+                        )
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.max_workers,
+                            thread_name_prefix=self.name
+                        )
+        return self._executor
+
+
+def _preload_modules(modules):
+    for name in modules:
+        importlib.import_module(name)
+
+
+document_pool = WorkerPool(
+    "document",
+    DOCUMENT_WORKERS,
+    DOCUMENT_QUEUE_LIMIT,
+    use_processes=DOCUMENT_WORKER_MODE == "process"
+)
+io_pool = WorkerPool("io", IO_WORKERS, IO_QUEUE_LIMIT)
+
+
+def shutdown_pools():
+    """Uygulama kapanırken havuzları kapat"""
+    document_pool.shutdown()
+    io_pool.shutdown()
@@ -0,0 +1,162 @@
+"""
+XLSX Package - Excel paketindeki ilişki grafiğini tek geçişte okur
+workbook.xml, ilişkiler (rels), metadata.xml ve richValueRel bir kez parse edilir;
+"Place in Cell" (Hücre İçi) resimleri tüm sayfalar için tek taramada çıkarılır
+ve medya deposuna yazılır. Zip, openpyxl'in açtığı arşivle paylaşılabilir.
+"""
+
+import os
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterable, List, Optional
+
+from media_store import MediaStore
+
+REL_ID = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+
+
+def _resolve(base_dir: str, target: str) -> str:
+    """İlişki hedefini zip içi yola çevir (base_dir: ilişkinin sahibi parçanın klasörü)"""
+    if target.startswith('/'):
+        return target[1:]
+    return posixpath.normpath(posixpath.join(base_dir, target))
+
+
+class XlsxPackage:
+    """
+    Açık bir xlsx zip'i üzerinde ilişki grafiği
+
+    Args:
+        archive: Açık ZipFile (örn. openpyxl ExcelReader.archive)
+        names: Zip içindeki dosya adları (verilmezse namelist'ten alınır)
+    """
+
+    def __init__(self, archive: zipfile.ZipFile, names: Optional[Iterable[str]] = None):
+        self.archive = archive
+        self.names = set(names if names is not None else archive.namelist())
+
+        self.sheet_paths: Dict[str, str] = {}  # { "Sheet1": "xl/worksheets/sheet1.xml" }
+        self._read_workbook()
+
+    def _parse(self, path: str) -> Optional[ET.Element]:
+        if path not in self.names:
+            return None
+        try:
+            return ET.fromstring(self.archive.read(path))
+        except Exception as e:
+            print(f"Paket parçası okunamadı ({path}): {e}")
+            return None
+
+    def _relationships(self, rels_path: str, base_dir: str) -> Dict[str, str]:
+        """rels dosyasını oku: { rId: zip içi yol }"""
+        root = self._parse(rels_path)
+        if root is None:
+            return {}
+
+        rels = {}
+        for rel in root.findall(".//{*}Relationship"):
+            rel_id = rel.get('Id')
+            target = rel.get('Target')
+            if rel_id and target and rel.get('TargetMode') != 'External':
+                rels[rel_id] = _resolve(base_dir, target)
+        return rels
+
+    def _read_workbook(self):
+        rels = self._relationships('xl/_rels/workbook.xml.rels', 'xl')
+        wb_root = self._parse('xl/workbook.xml')
+        if wb_root is None:
+            return
+
+        for sheet in wb_root.findall(".//{*}sheet"):
+            name = sheet.get('name')
+            path = rels.get(sheet.get(REL_ID))
+            if name and path:
+                self.sheet_paths[name] = path
+
+    def _rich_value_images(self) -> Dict[int, str]:
+        """
+        vm (1 tabanlı değer metadata indeksi) -> resim yolu
+
+        metadata.xml: valueMetadata/bk/rc t="1" v="X" -> X. rich value
+        richValueRel.xml: X. rel -> rId, rels dosyası: rId -> xl/media/...
+        """
+        meta_root = self._parse('xl/metadata.xml')
+        rv_rel_root = self._parse('xl/richData/richValueRel.xml')
+        if meta_root is None or rv_rel_root is None:
+            return {}
+
+        rv_to_rid = {}
+        for idx, rel in enumerate(rv_rel_root.findall(".//{*}rel")):
+            rel_id = rel.get(REL_ID)
+            if rel_id:
+                rv_to_rid[idx] = rel_id
+
+        rid_to_path = self._relationships('xl/richData/_rels/richValueRel.xml.rels', 'xl/richData')
+
+        vm_to_path = {}
+        for vm_idx, bk in enumerate(meta_root.findall(".//{*}valueMetadata/{*}bk"), start=1):
+            rc = bk.find(".//{*}rc")
+            # t="1" Rich Value demek, v ise rich value indeksi
+            if rc is None or rc.get('t') != '1':
+                continue
+            try:
+                rel_id = rv_to_rid.get(int(rc.get('v')))
+            except (TypeError, ValueError):
+                continue
+            path = rid_to_path.get(rel_id)
+            if path and path in self.names:
+                vm_to_path[vm_idx] = path
+        return vm_to_path
+
+    def in_cell_images(self, store: MediaStore) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Sayfa adı -> hücre içi resim listesi (resimler store'a yazılır, listede kimlikleri olur)
+
+        Rich value resmi yoksa sayfa XML'leri hiç okunmaz. Aynı resim birden
+        fazla hücrede kullanılıyorsa zip'ten bir kez okunur.
+        """
+        vm_to_path = self._rich_value_images()
+        if not vm_to_path:
+            return {}
+
+        stored: Dict[str, str] = {}
+        results = {}
+        for sheet_name, xml_path in self.sheet_paths.items():
+            if xml_path not in self.names:
+                continue
+
+            sheet_images = []
+            try:
+                with self.archive.open(xml_path) as f:
+                    for _, elem in ET.iterparse(f):
+                        if not elem.tag.endswith('}c') and elem.tag != 'c':
+                            continue
+                        # <c r="A1" t="e" vm="1">
+                        vm = elem.get('vm')
+                        image_path = vm_to_path.get(int(vm)) if vm and vm.isdigit() else None
+                        if image_path:
+                            ext = os.path.splitext(image_path)[1][1:].lower()
+                            if ext == 'jpeg':
+                                ext = 'jpg'
+
+                            if image_path not in stored:
+                                with self.archive.open(image_path) as image:
+                                    stored[image_path] = store.put_stream(image, ext)
+
+                            sheet_images.append({
+                                "anchor": elem.get('r'),
+                                "media": stored[image_path],
+                                "format": ext,
+                                "width": 100,  # Varsayılan
+                                "height": 100,
+                                "type": "in_cell"  # İşaretleyici
+                            })
+                        elem.clear()
+            except Exception as e:
+                print(f"Sheet parse error ({sheet_name}): {e}")
+
+            if sheet_images:
+                results[sheet_name] = sheet_images
+
+        return results
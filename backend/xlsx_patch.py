@@ -0,0 +1,373 @@
+"""
+XLSX Patch - Excel dosyasına hücre değerlerini doğrudan XML seviyesinde yazar
+openpyxl ile yükle/kaydet turu yapılmaz: sadece değişen worksheet XML'leri,
+sharedStrings ve workbook.xml yeniden yazılır; diğer parçalar (stiller, çizimler,
+hücre içi resimler, openpyxl'in desteklemediği uzantılar) olduğu gibi kopyalanır.
+Güvenle uygulanamayan durumlarda XlsxPatchUnsupported fırlatılır.
+"""
+
+import re
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from lxml import etree
+from openpyxl.utils.cell import column_index_from_string, coordinate_to_tuple, get_column_letter
+
+from package_writer import write_package
+from xlsx_package import XlsxPackage
+
+XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+CALC_CHAIN_TYPE = '/calcChain'
+SHARED_STRINGS_PATH = 'xl/sharedStrings.xml'
+
+# workbook.xml içinde calcPr'den önce gelebilecek elemanlar (şema sırası)
+WORKBOOK_ELEMENTS_BEFORE_CALC = (
+    'fileVersion', 'fileSharing', 'workbookPr', 'workbookProtection', 'bookViews',
+    'sheets', 'functionGroups', 'externalReferences', 'definedNames'
+)
+
+_COORDINATE_RE = re.compile(r'^([A-Z]{1,3})(\d+)$')
+
+
+class XlsxPatchUnsupported(Exception):
+    """Yama XML seviyesinde güvenle uygulanamıyor (çağıran openpyxl'e dönmeli)"""
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _needs_preserve(text: str) -> bool:
+    return text != text.strip() or '\n' in text
+
+
+class _SharedStrings:
+    """sharedStrings.xml - yeni metinler sona eklenir, mevcut düz metinler tekrar kullanılır"""
+
+    def __init__(self, data: bytes):
+        self.root = etree.fromstring(data)
+        self.ns = etree.QName(self.root).namespace
+        self.items = self.root.findall(f'{{{self.ns}}}si')
+        self.modified = False
+        self.added_refs = 0
+        self._index: Optional[Dict[str, int]] = None
+
+    def add(self, text: str) -> int:
+        if self._index is None:
+            self._index = {}
+            for idx, si in enumerate(self.items):
+                # Sadece tek <t> içeren (zengin metin olmayan) kayıtlar eşleştirilir
+                if len(si) == 1 and _local(si[0].tag) == 't':
+                    self._index.setdefault(si[0].text or '', idx)
+
+        self.added_refs += 1
+        idx = self._index.get(text)
+        if idx is not None:
+            return idx
+
+        si = etree.SubElement(self.root, f'{{{self.ns}}}si')
+        t = etree.SubElement(si, f'{{{self.ns}}}t')
+        t.text = text
+        if _needs_preserve(text):
+            t.set(XML_SPACE, 'preserve')
+
+        idx = len(self.items)
+        self.items.append(si)
+        self._index[text] = idx
+        self.modified = True
+        return idx
+
+    def to_bytes(self) -> bytes:
+        self.root.set('uniqueCount', str(len(self.items)))
+        if self.root.get('count') is not None:
+            self.root.set('count', str(int(self.root.get('count')) + self.added_refs))
+        return etree.tostring(self.root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+
+class _SheetPatcher:
+    """Tek bir worksheet XML'i üzerinde hücre yazma"""
+
+    def __init__(self, data: bytes):
+        self.root = etree.fromstring(data, parser=etree.XMLParser(huge_tree=True))
+        self.ns = etree.QName(self.root).namespace
+        self.sheet_data = self.root.find(self._q('sheetData'))
+        if self.sheet_data is None:
+            raise XlsxPatchUnsupported("sheetData bulunamadı")
+
+        self.rows: Dict[int, etree._Element] = {}
+        for row in self.sheet_data.iterfind(self._q('row')):
+            if row.get('r') is None:
+                raise XlsxPatchUnsupported("Satır numarası (r) olmayan satır")
+            self.rows[int(row.get('r'))] = row
+
+        self.max_row = 0
+        self.max_col = 0
+
+    def _q(self, name: str) -> str:
+        return f'{{{self.ns}}}{name}'
+
+    def _row(self, row_idx: int) -> etree._Element:
+        row = self.rows.get(row_idx)
+        if row is not None:
+            return row
+
+        row = etree.Element(self._q('row'), r=str(row_idx))
+        # Satırlar numara sırasıyla tutulmalı
+        following = [r for r in self.rows if r > row_idx]
+        if following:
+            self.rows[min(following)].addprevious(row)
+        else:
+            self.sheet_data.append(row)
+        self.rows[row_idx] = row
+        return row
+
+    def _cell(self, row: etree._Element, row_idx: int, col_idx: int) -> etree._Element:
+        for cell in row.iterfind(self._q('c')):
+            ref = cell.get('r')
+            match = _COORDINATE_RE.match(ref or '')
+            if not match:
+                raise XlsxPatchUnsupported("Koordinatı (r) olmayan hücre")
+            existing_col = column_index_from_string(match.group(1))
+            if existing_col == col_idx:
+                return cell
+            if existing_col > col_idx:
+                new_cell = etree.Element(self._q('c'), r=f"{get_column_letter(col_idx)}{row_idx}")
+                cell.addprevious(new_cell)
+                return new_cell
+
+        new_cell = etree.SubElement(row, self._q('c'), r=f"{get_column_letter(col_idx)}{row_idx}")
+        self._widen_spans(row, col_idx)
+        return new_cell
+
+    @staticmethod
+    def _widen_spans(row: etree._Element, col_idx: int):
+        spans = row.get('spans')
+        if not spans or ':' not in spans:
+            return
+        try:
+            low, high = (int(part) for part in spans.split(':', 1))
+        except ValueError:
+            row.attrib.pop('spans')
+            return
+        row.set('spans', f"{min(low, col_idx)}:{max(high, col_idx)}")
+
+    def set_value(self, coordinate: str, value: Any, formula: Optional[str],
+                  shared_strings: Optional[_SharedStrings]):
+        row_idx, col_idx = coordinate_to_tuple(coordinate)
+        row = self._row(row_idx)
+        cell = self._cell(row, row_idx, col_idx)
+
+        # Paylaşılan/dizi formülün ana hücresi değişirse bağlı hücreler bozulur
+        old_formula = cell.find(self._q('f'))
+        if old_formula is not None and (old_formula.get('t') in ('array', 'dataTable') or
+                                        (old_formula.get('t') == 'shared' and old_formula.get('ref'))):
+            raise XlsxPatchUnsupported(f"{coordinate} paylaşılan/dizi formülün ana hücresi")
+
+        # Eski içerik temizlenir; stil (s) korunur, hücre içi resim (vm) kalkar
+        for child in list(cell):
+            if _local(child.tag) in ('f', 'v', 'is'):
+                cell.remove(child)
+        for attr in ('t', 'vm', 'cm'):
+            cell.attrib.pop(attr, None)
+
+        if formula:
+            f = etree.Element(self._q('f'))
+            f.text = formula[1:] if formula.startswith('=') else formula
+            cell.insert(0, f)
+        elif value is None or value == "":
+            pass
+        elif isinstance(value, bool):
+            cell.set('t', 'b')
+            self._insert_v(cell, '1' if value else '0')
+        elif isinstance(value, (int, float)):
+            self._insert_v(cell, repr(value) if isinstance(value, float) else str(value))
+        else:
+            text = str(value)
+            if shared_strings is not None:
+                cell.set('t', 's')
+                self._insert_v(cell, str(shared_strings.add(text)))
+            else:
+                cell.set('t', 'inlineStr')
+                inline = etree.Element(self._q('is'))
+                t = etree.SubElement(inline, self._q('t'))
+                t.text = text
+                if _needs_preserve(text):
+                    t.set(XML_SPACE, 'preserve')
+                cell.insert(0, inline)
+
+        self.max_row = max(self.max_row, row_idx)
+        self.max_col = max(self.max_col, col_idx)
+
+    def _insert_v(self, cell: etree._Element, text: str):
+        v = etree.Element(self._q('v'))
+        v.text = text
+        cell.insert(0, v)
+
+    def set_tab_selected(self, selected: bool):
+        for view in self.root.iterfind(f"{self._q('sheetViews')}/{self._q('sheetView')}"):
+            if selected:
+                view.set('tabSelected', '1')
+            else:
+                view.attrib.pop('tabSelected', None)
+            break
+
+    def _update_dimension(self):
+        """Yazılan hücre mevcut aralığın dışındaysa dimension'ı genişlet"""
+        if not self.max_row:
+            return
+        dimension = self.root.find(self._q('dimension'))
+        if dimension is None:
+            return
+
+        ref = dimension.get('ref', 'A1')
+        start, _, end = ref.partition(':')
+        end = end or start
+        try:
+            start_row, start_col = coordinate_to_tuple(start)
+            end_row, end_col = coordinate_to_tuple(end)
+        except ValueError:
+            return
+
+        end_row = max(end_row, self.max_row)
+        end_col = max(end_col, self.max_col)
+        dimension.set('ref', f"{get_column_letter(start_col)}{start_row}:{get_column_letter(end_col)}{end_row}")
+
+    def to_bytes(self) -> bytes:
+        self._update_dimension()
+        return etree.tostring(self.root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+
+def _patch_workbook_xml(data: bytes, active_index: Optional[int], recalc: bool) -> bytes:
+    root = etree.fromstring(data)
+    ns = etree.QName(root).namespace
+
+    if active_index is not None:
+        view = root.find(f'{{{ns}}}bookViews/{{{ns}}}workbookView')
+        if view is not None:
+            view.set('activeTab', str(active_index))
+            if int(view.get('firstSheet', '0')) > active_index:
+                view.set('firstSheet', str(active_index))
+
+    if recalc:
+        # Değişen hücrelere bağlı formüllerin önbellekteki değerleri eskidi
+        calc = root.find(f'{{{ns}}}calcPr')
+        if calc is None:
+            calc = etree.Element(f'{{{ns}}}calcPr')
+            anchor = None
+            for child in root:
+                if _local(child.tag) in WORKBOOK_ELEMENTS_BEFORE_CALC:
+                    anchor = child
+            if anchor is not None:
+                anchor.addnext(calc)
+            else:
+                root.insert(0, calc)
+        calc.set('fullCalcOnLoad', '1')
+
+    return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+
+def _drop_calc_chain(content_types: bytes, workbook_rels: bytes) -> Tuple[bytes, bytes]:
+    """calcChain.xml kaldırılırken içerik tipi ve ilişki kaydı da silinir (Excel yeniden oluşturur)"""
+    types_root = etree.fromstring(content_types)
+    for override in list(types_root):
+        if override.get('PartName', '').lower() == '/xl/calcchain.xml':
+            types_root.remove(override)
+
+    rels_root = etree.fromstring(workbook_rels)
+    for rel in list(rels_root):
+        if rel.get('Type', '').endswith(CALC_CHAIN_TYPE):
+            rels_root.remove(rel)
+
+    return (
+        etree.tostring(types_root, xml_declaration=True, encoding='UTF-8', standalone=True),
+        etree.tostring(rels_root, xml_declaration=True, encoding='UTF-8', standalone=True)
+    )
+
+
+def patch_xlsx(base_path: Path, target_path: Path, cells: List[Dict[str, Any]],
+               active_sheet: Optional[str] = None):
+    """
+    base_path'i hücre yamalarıyla target_path'e yaz (base_path == target_path olabilir)
+
+    Args:
+        cells: [{"sheet", "coordinate", "value" (int/float/bool/str/None), "formula" (str|None)}]
+               Aynı hücre için son kayıt geçerlidir; olmayan sayfalar atlanır.
+        active_sheet: Aktif yapılacak sayfa
+
+    Raises:
+        XlsxPatchUnsupported: Yama güvenle uygulanamıyorsa (dosyaya dokunulmaz)
+    """
+    try:
+        zin = zipfile.ZipFile(base_path)
+    except zipfile.BadZipFile as e:
+        raise XlsxPatchUnsupported(f"Geçersiz xlsx: {e}")
+
+    with zin:
+        package = XlsxPackage(zin)
+
+        # Sayfa yolu -> {koordinat: yama}
+        by_sheet: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for cell in cells:
+            path = package.sheet_paths.get(cell.get("sheet"))
+            coordinate = (cell.get("coordinate") or "").upper()
+            if path is None or not _COORDINATE_RE.match(coordinate):
+                continue
+            by_sheet.setdefault(path, {})[coordinate] = cell
+
+        replaced: Dict[str, bytes] = {}
+        removed = set()
+
+        # Paylaşılan metin tablosu yoksa metinler satır içi (inlineStr) yazılır
+        shared_strings = None
+        if by_sheet and SHARED_STRINGS_PATH in package.names:
+            shared_strings = _SharedStrings(zin.read(SHARED_STRINGS_PATH))
+
+        # Aktif sayfa değişiyorsa eski ve yeni aktif sayfanın sekme seçimi güncellenir
+        active_index = None
+        tab_changes: Dict[str, bool] = {}
+        if active_sheet in package.sheet_paths:
+            wb_root = etree.fromstring(zin.read('xl/workbook.xml'))
+            ns = etree.QName(wb_root).namespace
+            # activeTab, workbook.xml'deki <sheet> sırasına göre indekstir
+            sheet_names = [sheet.get('name') for sheet in wb_root.iter(f'{{{ns}}}sheet')]
+            view = wb_root.find(f'{{{ns}}}bookViews/{{{ns}}}workbookView')
+            current = int(view.get('activeTab', '0')) if view is not None else 0
+            new_index = sheet_names.index(active_sheet)
+            if view is not None and new_index != current:
+                active_index = new_index
+                if 0 <= current < len(sheet_names) and sheet_names[current] in package.sheet_paths:
+                    tab_changes[package.sheet_paths[sheet_names[current]]] = False
+                tab_changes[package.sheet_paths[active_sheet]] = True
+
+        for path in set(by_sheet) | set(tab_changes):
+            if path not in package.names:
+                raise XlsxPatchUnsupported(f"Sayfa bulunamadı: {path}")
+            patcher = _SheetPatcher(zin.read(path))
+            for coordinate, cell in by_sheet.get(path, {}).items():
+                value = cell.get("value")
+                formula = cell.get("formula")
+                # openpyxl gibi '=' ile başlayan metin formül kabul edilir
+                if not formula and isinstance(value, str) and value.startswith('=') and len(value) > 1:
+                    formula = value
+                patcher.set_value(coordinate, value, formula, shared_strings)
+            if path in tab_changes:
+                patcher.set_tab_selected(tab_changes[path])
+            replaced[path] = patcher.to_bytes()
+
+        if shared_strings is not None and shared_strings.modified:
+            replaced[SHARED_STRINGS_PATH] = shared_strings.to_bytes()
+
+        if by_sheet or active_index is not None:
+            replaced['xl/workbook.xml'] = _patch_workbook_xml(
+                zin.read('xl/workbook.xml'), active_index, recalc=bool(by_sheet)
+            )
+
+        if by_sheet and 'xl/calcChain.xml' in package.names:
+            removed.add('xl/calcChain.xml')
+            replaced['[Content_Types].xml'], replaced['xl/_rels/workbook.xml.rels'] = _drop_calc_chain(
+                zin.read('[Content_Types].xml'), zin.read('xl/_rels/workbook.xml.rels')
+            )
+
+        # Değişmeyen parçalar sıkıştırılmış halleriyle kopyalanır; geçici dosya atomik olarak yerine konur
+        write_package(base_path, zin, target_path, replaced, removed)
@@ -0,0 +1,373 @@
+"""
+XLSX Text - Excel dosyalarından hızlı metin çıkarma
+openpyxl nesne modeli (stiller dahil) kurulmadan, xl/sharedStrings.xml ve
+worksheet XML'leri zip içinden iterparse ile akış halinde okunur.
+Bellek kullanımı çalışma kitabının boyutundan bağımsızdır. Hücre metinleri
+openpyxl'deki str(cell.value) ile aynıdır (tarih biçimli sayılar tarih olarak).
+"""
+
+import codecs
+import html
+import posixpath
+import re
+import zipfile
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from lxml import etree
+from openpyxl.styles.numbers import builtin_format_code, is_date_format, is_timedelta_format
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, WINDOWS_EPOCH, from_excel, from_ISO8601
+
+REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+
+# Transitional ve strict OOXML namespace'leri aynı şekilde işlenir
+MAIN_NAMESPACES = (
+    '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}',
+    '{http://purl.oclc.org/ooxml/spreadsheetml/main}',
+)
+
+
+def _tags(name: str) -> Tuple[str, ...]:
+    return tuple(ns + name for ns in MAIN_NAMESPACES)
+
+
+SI_TAGS = _tags('si')
+ROW_TAGS = _tags('row')
+C_TAGS = frozenset(_tags('c'))
+V_TAGS = frozenset(_tags('v'))
+F_TAGS = frozenset(_tags('f'))
+T_TAGS = frozenset(_tags('t'))
+R_TAGS = frozenset(_tags('r'))
+IS_TAGS = frozenset(_tags('is'))
+NUMFMT_TAGS = _tags('numFmt')
+CELLXFS_TAGS = _tags('cellXfs')
+XF_TAGS = frozenset(_tags('xf'))
+WORKBOOK_PR_TAGS = _tags('workbookPr')
+
+_TAG_RE = re.compile(r'<[^>]*>')
+# Sayısal/boolean hücreler openpyxl tarafından dönüştürüldüğü için ham XML'de
+# birebir geçmeyebilir; sadece bu karakterlerden oluşan sorgular ön filtrelenmez
+_NUMERIC_CHARS = frozenset('0123456789.-+e')
+# Tarih ("2024-01-15 00:00:00") ve süre ("1 day, 2:30:00") hücrelerinin metni de
+# ham XML'de geçmez (seri numarası olarak durur)
+_DATE_CHARS = frozenset('0123456789-:. ')
+_TIMEDELTA_CHARS = _DATE_CHARS | frozenset(',days')
+_READ_BLOCK = 1 << 20
+
+
+def _resolve_target(target: str) -> str:
+    """workbook.xml.rels içindeki hedefi zip içi yola çevir"""
+    if target.startswith('/'):
+        return target[1:]
+    return posixpath.normpath(posixpath.join('xl', target))
+
+
+class _Package(NamedTuple):
+    sheets: List[str]              # Worksheet yolları (sıralı)
+    shared_strings: Optional[str]
+    styles: Optional[str]
+    date1904: bool
+
+
+class _CellFormats(NamedTuple):
+    """Tarih/süre biçimli hücre stillerinin (cellXfs) indeksleri"""
+    dates: Set[int]
+    timedeltas: Set[int]
+    epoch: object
+
+
+def _package_parts(z: zipfile.ZipFile) -> _Package:
+    """Worksheet, sharedStrings ve styles yollarını bul"""
+    names = set(z.namelist())
+
+    rels = {}
+    shared_strings = None
+    styles = None
+    if 'xl/_rels/workbook.xml.rels' in names:
+        rels_root = etree.fromstring(z.read('xl/_rels/workbook.xml.rels'))
+        for rel in rels_root:
+            rel_type = rel.get('Type', '')
+            target = rel.get('Target')
+            if not target:
+                continue
+            if rel_type.endswith('/sharedStrings'):
+                shared_strings = _resolve_target(target)
+            elif rel_type.endswith('/styles'):
+                styles = _resolve_target(target)
+            rels[rel.get('Id')] = _resolve_target(target)
+
+    sheets = []
+    date1904 = False
+    if 'xl/workbook.xml' in names:
+        wb_root = etree.fromstring(z.read('xl/workbook.xml'))
+        for sheet in wb_root.iter('{*}sheet'):
+            path = rels.get(sheet.get(REL_NS))
+            if path and path in names:
+                sheets.append(path)
+        for workbook_pr in wb_root.iter(*WORKBOOK_PR_TAGS):
+            date1904 = workbook_pr.get('date1904', '').lower() in ('1', 'true')
+
+    if shared_strings is None and 'xl/sharedStrings.xml' in names:
+        shared_strings = 'xl/sharedStrings.xml'
+    if shared_strings not in names:
+        shared_strings = None
+    if styles is None and 'xl/styles.xml' in names:
+        styles = 'xl/styles.xml'
+    if styles not in names:
+        styles = None
+
+    return _Package(sheets, shared_strings, styles, date1904)
+
+
+def _cell_formats(z: zipfile.ZipFile, package: _Package) -> _CellFormats:
+    """
+    styles.xml'den tarih/süre biçimli stilleri çıkar (openpyxl ile aynı kurallar)
+
+    Stil indeksi hücrenin s özniteliğidir (cellXfs içindeki sıra).
+    """
+    dates: Set[int] = set()
+    timedeltas: Set[int] = set()
+    epoch = CALENDAR_MAC_1904 if package.date1904 else WINDOWS_EPOCH
+    if not package.styles:
+        return _CellFormats(dates, timedeltas, epoch)
+
+    try:
+        root = etree.fromstring(z.read(package.styles))
+    except etree.XMLSyntaxError:
+        return _CellFormats(dates, timedeltas, epoch)
+
+    custom = {}
+    for num_fmt in root.iter(*NUMFMT_TAGS):
+        try:
+            custom[int(num_fmt.get('numFmtId'))] = num_fmt.get('formatCode')
+        except (TypeError, ValueError):
+            continue
+
+    cell_xfs = next(root.iter(*CELLXFS_TAGS), None)
+    if cell_xfs is not None:
+        for index, xf in enumerate(x for x in cell_xfs if x.tag in XF_TAGS):
+            try:
+                num_fmt_id = int(xf.get('numFmtId', 0))
+            except ValueError:
+                continue
+            fmt = custom[num_fmt_id] if num_fmt_id in custom else builtin_format_code(num_fmt_id)
+            if not fmt:
+                continue
+            if is_date_format(fmt):
+                dates.add(index)
+            if is_timedelta_format(fmt):
+                timedeltas.add(index)
+
+    return _CellFormats(dates, timedeltas, epoch)
+
+
+def _release(elem):
+    """İşlenen elemanı ve önceki kardeşlerini bırak (sabit bellek)"""
+    elem.clear(keep_tail=True)
+    parent = elem.getparent()
+    if parent is not None:
+        while elem.getprevious() is not None:
+            del parent[0]
+
+
+def _iter_shared_strings(z: zipfile.ZipFile, path: Optional[str]) -> Iterator[str]:
+    """Paylaşılan metinleri sırayla üret (zengin metin parçaları birleştirilir)"""
+    if not path:
+        return
+
+    with z.open(path) as f:
+        for _, elem in etree.iterparse(f, events=('end',), tag=SI_TAGS):
+            # Fonetik (rPh) metinler hariç tüm <t> parçaları
+            parts = []
+            for child in elem:
+                if child.tag in T_TAGS:
+                    parts.append(child.text or '')
+                elif child.tag in R_TAGS:
+                    for t in child:
+                        if t.tag in T_TAGS:
+                            parts.append(t.text or '')
+            yield ''.join(parts)
+            _release(elem)
+
+
+def _cast_number(raw: str):
+    """Sayısal hücre değeri (openpyxl ile aynı: nokta/üs varsa float)"""
+    if '.' in raw or 'E' in raw or 'e' in raw:
+        return float(raw)
+    return int(raw)
+
+
+def _number_text(raw: str, style: Optional[str], formats: Optional[_CellFormats]) -> str:
+    """Sayısal hücrenin openpyxl'deki str(value) karşılığı (tarih biçimliyse tarih)"""
+    try:
+        value = _cast_number(raw)
+    except ValueError:
+        return raw
+
+    if formats is not None and style and formats.dates:
+        try:
+            style_id = int(style)
+        except ValueError:
+            style_id = None
+        if style_id in formats.dates:
+            try:
+                return str(from_excel(value, formats.epoch, timedelta=style_id in formats.timedeltas))
+            except (OverflowError, ValueError):
+                return '#VALUE!'
+    return str(value)
+
+
+def _iter_sheet_cells(z: zipfile.ZipFile, path: str,
+                      formats: Optional[_CellFormats] = None) -> Iterator[Tuple[Optional[int], Optional[str]]]:
+    """
+    Worksheet hücrelerini akış halinde oku
+
+    Yields:
+        (shared_string_index, None) paylaşılan metin hücreleri için,
+        (None, metin) diğer hücreler için. Formül hücrelerinde metin "=formül" olur.
+    """
+    with z.open(path) as f:
+        for _, row in etree.iterparse(f, events=('end',), tag=ROW_TAGS):
+            for cell in row:
+                if cell.tag not in C_TAGS:
+                    continue
+
+                value = None
+                formula = None
+                inline = None
+                for child in cell:
+                    tag = child.tag
+                    if tag in V_TAGS:
+                        value = child.text
+                    elif tag in F_TAGS:
+                        formula = child.text
+                    elif tag in IS_TAGS:
+                        inline = ''.join(t.text or '' for t in child.iter() if t.tag in T_TAGS)
+
+                cell_type = cell.get('t', 'n')
+                if formula:
+                    yield None, f"={formula}"
+                elif cell_type == 's':
+                    if value is not None:
+                        try:
+                            yield int(value), None
+                        except ValueError:
+                            pass
+                elif cell_type == 'inlineStr':
+                    if inline:
+                        yield None, inline
+                elif value:
+                    if cell_type == 'n':
+                        yield None, _number_text(value, cell.get('s'), formats)
+                    elif cell_type == 'b':
+                        yield None, 'True' if value == '1' else 'False'
+                    elif cell_type == 'd':
+                        try:
+                            yield None, str(from_ISO8601(value))
+                        except ValueError:
+                            yield None, value
+                    else:
+                        yield None, value
+
+            _release(row)
+
+
+def iter_xlsx_text(file_path: Path) -> Iterator[str]:
+    """
+    Çalışma kitabındaki tüm hücre metinlerini üret (indeksleme için)
+
+    Paylaşılan metinlerden sadece hücrelerin kullandıkları, bir kez üretilir
+    (şablonda kalmış kullanılmayan metinler aranmaz).
+    """
+    with zipfile.ZipFile(file_path) as z:
+        package = _package_parts(z)
+        formats = _cell_formats(z, package)
+
+        referenced: Set[int] = set()
+        for sheet_path in package.sheets:
+            for index, text in _iter_sheet_cells(z, sheet_path, formats):
+                if index is not None:
+                    referenced.add(index)
+                elif text:
+                    yield text
+
+        if referenced:
+            for index, text in enumerate(_iter_shared_strings(z, package.shared_strings)):
+                if text and index in referenced:
+                    yield text
+
+
+def _part_may_contain(z: zipfile.ZipFile, path: str, needle: str) -> bool:
+    """
+    XML parçasının metin içeriğinde needle geçebilir mi (hızlı ön filtre)
+
+    Etiketler regex ile atılır, metin blok blok taranır. Hücreler arası
+    birleşme yüzünden yanlış pozitif verebilir, yanlış negatif vermez.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    carry = ''
+    tail = ''
+    keep = len(needle) - 1
+
+    with z.open(path) as f:
+        while True:
+            block = f.read(_READ_BLOCK)
+            text = carry + decoder.decode(block, final=not block)
+            if block:
+                # Etiket ortasından bölmemek için son '>' karakterinde kes
+                cut = text.rfind('>') + 1
+                text, carry = text[:cut], text[cut:]
+
+            plain = html.unescape(_TAG_RE.sub('', text)).lower()
+            if needle in tail + plain:
+                return True
+            if not block:
+                return False
+            tail = (tail + plain)[-keep:] if keep else ''
+
+
+def _can_prefilter(query: str, formats: _CellFormats) -> bool:
+    if all(ch in _NUMERIC_CHARS for ch in query):
+        return False
+    if formats.dates and all(ch in _DATE_CHARS for ch in query):
+        return False
+    if formats.timedeltas and all(ch in _TIMEDELTA_CHARS for ch in query):
+        return False
+    return not any(query in word for word in ('true', 'false', 'inf', 'nan', '#value!'))
+
+
+def xlsx_contains(file_path: Path, query: str) -> bool:
+    """
+    Çalışma kitabında sorguyu içeren bir hücre var mı (küçük harf duyarsız)
+
+    Önce ham XML metni hızlıca taranır; eşleşme ihtimali yoksa parse edilmez.
+    Paylaşılan metinler bir kez eşleştirilir; hücre taramasında sadece
+    indeks kontrolü yapılır. İlk eşleşmede durur.
+    """
+    query = query.lower()
+
+    with zipfile.ZipFile(file_path) as z:
+        package = _package_parts(z)
+        formats = _cell_formats(z, package)
+
+        if _can_prefilter(query, formats):
+            # Formül metni ham XML'de başındaki '=' olmadan durur
+            needle = query[1:] if query.startswith('=') and len(query) > 1 else query
+            parts = package.sheets + ([package.shared_strings] if package.shared_strings else [])
+            if not any(_part_may_contain(z, part, needle) for part in parts):
+                return False
+
+        matching: Set[int] = set()
+        for index, text in enumerate(_iter_shared_strings(z, package.shared_strings)):
+            if text and query in text.lower():
+                matching.add(index)
+
+        for sheet_path in package.sheets:
+            for index, text in _iter_sheet_cells(z, sheet_path, formats):
+                if index is not None:
+                    if index in matching:
+                        return True
+                elif text and query in text.lower():
+                    return True
+
+    return False
@@ -6,8 +6,11 @@ import Toast from './components/Toast'
 import ConfirmDialog from './components/ConfirmDialog'
 
 import ActivationDialog from './components/ActivationDialog'
+import { decodeExcelContent } from './utils/excelFormat'
 
 const API_BASE = '/api'
+// Firma dosyaları sayfa sayfa alınır (en yeni dosyalar önce)
+const COMPANY_FILES_PAGE_SIZE = 200
 
 function App() {
     const [selectedFile, setSelectedFile] = useState(null)
@@ -16,6 +19,8 @@ function App() {
     const [templates, setTemplates] = useState([])
     const [companies, setCompanies] = useState([])
     const [companyFiles, setCompanyFiles] = useState([])
+    const [companyFilesCursor, setCompanyFilesCursor] = useState(null)
+    const [companyFilesTotal, setCompanyFilesTotal] = useState(null)
     const [selectedCompany, setSelectedCompany] = useState(null)
     const [isSidebarOpen, setIsSidebarOpen] = useState(true)
     const [toast, setToast] = useState(null)
@@ -72,19 +77,50 @@ function App() {
         }
     }
 
-    // Firma dosyalarını yükle
+    // Firma dosyalarının bir sayfasını al
+    const fetchCompanyFilesPage = (companyName, cursor = null) =>
+        axios.get(`${API_BASE}/companies/${companyName}/files`, {
+            params: {
+                sort: 'mtime',
+                order: 'desc',
+                limit: COMPANY_FILES_PAGE_SIZE,
+                cursor: cursor || undefined
+            }
+        })
+
+    // Firma dosyalarını yükle (ilk sayfa)
     const loadCompanyFiles = async (companyName) => {
         if (!companyName) {
             setCompanyFiles([])
+            setCompanyFilesCursor(null)
+            setCompanyFilesTotal(null)
             return
         }
 
         try {
-            const response = await axios.get(`${API_BASE}/companies/${companyName}/files`)
+            const response = await fetchCompanyFilesPage(companyName)
             setCompanyFiles(response.data.files || [])
+            setCompanyFilesCursor(response.data.next_cursor || null)
+            setCompanyFilesTotal(response.data.total ?? null)
         } catch (error) {
             console.error('Firma dosyaları yüklenirken hata:', error)
             setCompanyFiles([])
+            setCompanyFilesCursor(null)
+            setCompanyFilesTotal(null)
+        }
+    }
+
+    // Sonraki sayfayı listenin sonuna ekle
+    const loadMoreCompanyFiles = async () => {
+        if (!selectedCompany || !companyFilesCursor) return
+
+        try {
+            const response = await fetchCompanyFilesPage(selectedCompany, companyFilesCursor)
+            setCompanyFiles(prev => [...prev, ...(response.data.files || [])])
+            setCompanyFilesCursor(response.data.next_cursor || null)
+        } catch (error) {
+            console.error('Firma dosyaları yüklenirken hata:', error)
+            showToast('Dosyalar yüklenirken bir hata oluştu', 'error')
         }
     }
 
@@ -246,20 +282,30 @@ function App() {
 
         try {
             let response
+            // Excel dosyalarında önce sadece özet alınır, satırlar editörde blok blok yüklenir
+            const isExcel = /\.xlsx?$/i.test(file.name)
+            const suffix = isExcel ? '/manifest' : ''
             // Firma dosyası mı yoksa şablon dosyası mı kontrol et
             if (file.company) {
                 // Firma dosyası
-                const url = `${API_BASE}/companies/${file.company}/file/${file.name}`
+                const url = `${API_BASE}/companies/${file.company}/file/${file.name}${suffix}`
                 console.log('Firma dosyası URL:', url)
-                response = await axios.get(url)
+                // Aynı isimde dosya farklı iş emri klasörlerinde olabilir, yol ile ayırt edilir
+                response = await axios.get(url, { params: { path: file.full_path || undefined } })
             } else {
                 // Şablon dosyası
-                const url = `${API_BASE}/file/${file.name}`
+                const url = `${API_BASE}/file/${file.name}${suffix}`
                 console.log('Şablon dosyası URL:', url)
                 response = await axios.get(url)
             }
             console.log('Dosya response:', response.data)
-            setFileContent(response.data)
+            // Excel dosyaları kompakt formatta gelir, editör için hücre nesnelerine açılır
+            // source_company/source_path: kaydetmede değişikliklerin uygulanacağı kaynak (şablon için null)
+            setFileContent({
+                ...decodeExcelContent(response.data),
+                source_company: file.company || null,
+                source_path: file.company ? (file.full_path || null) : null
+            })
             // Yeni dosya yüklendiğinde değişiklik takibini sıfırla
             setHasUnsavedChanges(false)
         } catch (error) {
@@ -299,7 +345,9 @@ function App() {
                     // Firma dosyası mı yoksa şablon dosyası mı kontrol et
                     if (file.company) {
                         // Firma dosyası
-                        await axios.delete(`${API_BASE}/companies/${file.company}/file/${file.name}`)
+                        await axios.delete(`${API_BASE}/companies/${file.company}/file/${file.name}`, {
+                            params: { path: file.full_path || undefined }
+                        })
                     } else {
                         // Şablon dosyası
                         await axios.delete(`${API_BASE}/file/${file.name}`)
@@ -403,6 +451,9 @@ function App() {
                 templates={templates}
                 companies={companies}
                 companyFiles={companyFiles}
+                companyFilesTotal={companyFilesTotal}
+                hasMoreCompanyFiles={!!companyFilesCursor}
+                onLoadMoreCompanyFiles={loadMoreCompanyFiles}
                 selectedCompany={selectedCompany}
                 onCompanySelect={handleCompanySelect}
                 onCompanyDelete={handleCompanyDelete}
@@ -1,9 +1,16 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
+import { flushSync } from 'react-dom'
 import axios from 'axios'
 import Toast from './Toast'
+import { decodeCellBlock, columnLetter } from '../utils/excelFormat'
 
 const API_BASE = '/api'
 
+// Büyük çalışma kitaplarında satırlar bu boyutta bloklarla yüklenir
+const ROW_BLOCK_SIZE = 100
+// Kaydırma alanının sonuna bu kadar piksel kala sonraki blok istenir
+const LOAD_AHEAD_PX = 600
+
 export default function ExcelEditor({ fileContent, companies, onFileSaved, onCompanyAdded, onUnsavedChanges }) {
     const [sheets, setSheets] = useState(fileContent.sheets || {})
     const [activeSheet, setActiveSheet] = useState(fileContent.active_sheet || Object.keys(fileContent.sheets)[0])
@@ -17,7 +24,23 @@ export default function ExcelEditor({ fileContent, companies, onFileSaved, onCom
     const [originalCells, setOriginalCells] = useState({}) // Track original cell values
     const [toast, setToast] = useState(null)
 
+    // Tembel yükleme durumu: sayfa başına yüklenen satır sayısı ve bekleyen istek
+    const sheetsRef = useRef(sheets)
+    sheetsRef.current = sheets
+    const contentRef = useRef(fileContent)
+    const loadedRowsRef = useRef({})
+    const pendingLoadsRef = useRef({})
+    const scrollAreaRef = useRef(null)
+    // Sunucudan geldiği haliyle satırlar - kaydederken sadece farklar gönderilir
+    const baseDataRef = useRef({})
+
     useEffect(() => {
+        contentRef.current = fileContent
+        loadedRowsRef.current = {}
+        pendingLoadsRef.current = {}
+        baseDataRef.current = Object.fromEntries(
+            Object.entries(fileContent.sheets || {}).map(([sheetName, sheet]) => [sheetName, sheet.data || []])
+        )
         setSheets(fileContent.sheets || {})
         setActiveSheet(fileContent.active_sheet || Object.keys(fileContent.sheets)[0])
 
@@ -39,6 +62,126 @@ export default function ExcelEditor({ fileContent, companies, onFileSaved, onCom
         setOriginalCells(original)
     }, [fileContent])
 
+    // Yüklenen blok satırlarını sayfanın sonuna ekle (kilit bilgisi de güncellenir)
+    const appendRows = (sheetName, rows) => {
+        const offset = sheetsRef.current[sheetName]?.data.length || 0
+        baseDataRef.current[sheetName] = [...(baseDataRef.current[sheetName] || []), ...rows]
+
+        // Kaydetme/yazdırma tüm satırları hemen okuyabilsin diye senkron işlenir
+        flushSync(() => {
+            setSheets(prev => ({
+                ...prev,
+                [sheetName]: { ...prev[sheetName], data: [...prev[sheetName].data, ...rows] }
+            }))
+            setOriginalCells(prev => {
+                const sheetOriginals = { ...(prev[sheetName] || {}) }
+                rows.forEach((row, rowIndex) => {
+                    row.forEach((cell, colIndex) => {
+                        const value = cell.value || ''
+                        if (value.toString().trim() !== '') {
+                            sheetOriginals[`${offset + rowIndex}-${colIndex}`] = true
+                        }
+                    })
+                })
+                return { ...prev, [sheetName]: sheetOriginals }
+            })
+        })
+    }
+
+    // Sayfanın satırlarını upTo'ya kadar yükle; aynı sayfanın istekleri sıraya girer
+    const loadRows = (sheetName, upTo) => {
+        const content = fileContent
+        if (!content.lazy || !content.sheets[sheetName]) return Promise.resolve()
+
+        const previous = pendingLoadsRef.current[sheetName] || Promise.resolve()
+        const next = previous.then(async () => {
+            if (contentRef.current !== content) return
+
+            const total = content.sheets[sheetName].row_count || 0
+            const loaded = loadedRowsRef.current[sheetName] || 0
+            const end = Math.min(total, upTo)
+            if (loaded >= end) return
+
+            const response = await axios.get(content.cells_url, {
+                params: { sheet: sheetName, row_start: loaded + 1, row_end: end }
+            })
+            if (contentRef.current !== content) return
+
+            loadedRowsRef.current[sheetName] = end
+            appendRows(sheetName, decodeCellBlock(response.data, content))
+        })
+        pendingLoadsRef.current[sheetName] = next.catch(error => {
+            console.error('Satırlar yüklenemedi:', error)
+        })
+        return next
+    }
+
+    const hasMoreRows = (sheetName) => {
+        const sheet = fileContent.sheets?.[sheetName]
+        return !!fileContent.lazy && !!sheet && (loadedRowsRef.current[sheetName] || 0) < (sheet.row_count || 0)
+    }
+
+    // Kaydetme ve yazdırma öncesi tüm sayfaların kalan satırlarını yükle
+    const loadAllRows = async () => {
+        if (!fileContent.lazy) return sheetsRef.current
+        await Promise.all(Object.keys(fileContent.sheets).map(sheetName => loadRows(sheetName, Infinity)))
+        return sheetsRef.current
+    }
+
+    // Sunucudaki haline göre değişen hücreler (koordinat satır/sütun konumundan hesaplanır)
+    const collectChanges = (currentSheets) => {
+        const cells = []
+        const images = []
+
+        Object.entries(currentSheets).forEach(([sheetName, sheet]) => {
+            const baseRows = baseDataRef.current[sheetName] || []
+            ;(sheet.data || []).forEach((row, rowIndex) => {
+                const baseRow = baseRows[rowIndex] || []
+                // Düzenlenmeyen satır ve hücreler aynı nesne olarak kalır
+                if (row === baseRow) return
+                row.forEach((cell, colIndex) => {
+                    const baseCell = baseRow[colIndex]
+                    if (cell === baseCell) return
+
+                    const value = cell.value ?? ''
+                    const formula = cell.formula || null
+                    if (baseCell && (baseCell.value ?? '') === value && (baseCell.formula || null) === formula) return
+                    if (!baseCell && value === '' && !formula) return
+
+                    const change = { sheet: sheetName, coordinate: `${columnLetter(colIndex)}${rowIndex + 1}`, value }
+                    if (formula) change.formula = formula
+                    cells.push(change)
+                })
+            })
+
+            const baseImages = fileContent.sheets[sheetName]?.images || []
+            ;(sheet.images || []).forEach(image => {
+                if (!baseImages.includes(image)) images.push({ ...image, sheet: sheetName })
+            })
+        })
+
+        return { cells, images }
+    }
+
+    // Aktif sayfa görünür alanı dolduracak kadar yüklenir, kaydırdıkça devamı gelir
+    useEffect(() => {
+        if (!hasMoreRows(activeSheet)) return
+        const area = scrollAreaRef.current
+        const loaded = loadedRowsRef.current[activeSheet] || 0
+        if (loaded === 0 || !area || area.scrollHeight - area.scrollTop - area.clientHeight < LOAD_AHEAD_PX) {
+            loadRows(activeSheet, loaded + ROW_BLOCK_SIZE).catch(() => {
+                setToast({ message: 'Sayfa satırları yüklenemedi', type: 'error' })
+            })
+        }
+    }, [activeSheet, fileContent, sheets])
+
+    const handleScroll = (event) => {
+        const area = event.currentTarget
+        if (hasMoreRows(activeSheet) && area.scrollHeight - area.scrollTop - area.clientHeight < LOAD_AHEAD_PX) {
+            loadRows(activeSheet, (loadedRowsRef.current[activeSheet] || 0) + ROW_BLOCK_SIZE).catch(() => {})
+        }
+    }
+
     const handleCellChange = (sheetName, rowIndex, colIndex, value) => {
         setSheets(prev => {
             const newSheets = { ...prev }
@@ -193,12 +336,27 @@ export default function ExcelEditor({ fileContent, companies, onFileSaved, onCom
 
         setSaving(true)
         try {
+            // Satır eklenen sayfalarda alttaki (henüz yüklenmemiş) satırlar da kayar,
+            // farkların doğru konumlarla hesaplanması için bu sayfaların tamamı yüklenir
+            if (fileContent.lazy) {
+                const shiftedSheets = Object.keys(fileContent.sheets).filter(sheetName =>
+                    hasMoreRows(sheetName) &&
+                    (sheetsRef.current[sheetName]?.data.length || 0) !== (loadedRowsRef.current[sheetName] || 0)
+                )
+                await Promise.all(shiftedSheets.map(sheetName => loadRows(sheetName, Infinity)))
+            }
+
+            // Sadece değişen hücreler gönderilir, sunucu kaynak dosyanın kopyasına uygular
+            const { cells, images } = collectChanges(sheetsRef.current)
             await axios.post(`${API_BASE}/save`, {
                 filename: fileContent.filename,
                 company: selectedCompany,
                 type: 'excel',
-                content: {
-                    sheets,
+                patch: {
+                    base_company: fileContent.source_company || null,
+                    base_path: fileContent.source_path || null,
+                    cells,
+                    images,
                     active_sheet: activeSheet
                 }
             })
@@ -232,7 +390,12 @@ export default function ExcelEditor({ fileContent, companies, onFileSaved, onCom
         }
     }
 
-    const handlePrint = () => {
+    const handlePrint = async () => {
+        try {
+            await loadAllRows()
+        } catch (error) {
+            console.error('Satırlar yüklenemedi:', error)
+        }
         window.print()
     }
 
@@ -273,6 +436,14 @@ export default function ExcelEditor({ fileContent, companies, onFileSaved, onCom
 
     // All cells are now editable - lock function removed
 
+    // Resimler JSON'da sadece kimlikle gelir, tarayıcı ayrı istekle (önbellekli) indirir
+    const getImageSrc = (image) => {
+        if (image.media) {
+            return `${fileContent.media_base}/${image.media}`
+        }
+        return `data:image/${image.format};base64,${image.data}`
+    }
+
     // Helper function: Get image for a specific cell coordinate
     const getImageForCell = (coordinate) => {
         const images = sheets[activeSheet]?.images || []
@@ -431,7 +602,7 @@ export default function ExcelEditor({ fileContent, companies, onFileSaved, onCom
             </div>
 
             {/* Excel Table with Formatting - Dark Theme */}
-            <div id="excel-print-area" className="flex-1 overflow-auto bg-dark-800 p-4">
+            <div id="excel-print-area" ref={scrollAreaRef} onScroll={handleScroll} className="flex-1 overflow-auto bg-dark-800 p-4">
                 <table className="border-collapse">
                     <tbody>
                         {currentSheetData.map((row, rowIndex) => (
@@ -506,8 +677,10 @@ export default function ExcelEditor({ fileContent, companies, onFileSaved, onCom
                                         >
                                             {cellImage ? (
                                                 <img
-                                                    src={`data:image/${cellImage.format};base64,${cellImage.data}`}
+                                                    src={getImageSrc(cellImage)}
                                                     alt="Cell image"
+                                                    loading="lazy"
+                                                    decoding="async"
                                                     style={{
                                                         width: '100%',
                                                         height: '100%',
@@ -3,10 +3,55 @@ import axios from 'axios'
 
 const API_BASE = '/api'
 
+// Bu boyuttan büyük dosyalar parça parça (devam ettirilebilir oturumla) yüklenir
+const RESUMABLE_UPLOAD_THRESHOLD = 16 * 1024 * 1024
+const CHUNK_RETRY_LIMIT = 5
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms))
+
+// Büyük dosyayı oturum açıp parçalar halinde gönder; bağlantı koparsa sunucudaki
+// received değerinden devam eder
+const uploadResumable = async (file) => {
+    const { data: session } = await axios.post(`${API_BASE}/upload/sessions`, {
+        filename: file.name,
+        size: file.size
+    })
+
+    let state = session
+    let failures = 0
+    while (!state.completed) {
+        const chunk = file.slice(state.received, state.received + state.chunk_size)
+        try {
+            const response = await axios.put(
+                `${API_BASE}/upload/sessions/${session.upload_id}`,
+                chunk,
+                {
+                    params: { offset: state.received },
+                    headers: { 'Content-Type': 'application/octet-stream' }
+                }
+            )
+            state = response.data
+            failures = 0
+        } catch (error) {
+            const status = error.response?.status
+            if (status && status !== 409 && status < 500) throw error
+            if (++failures > CHUNK_RETRY_LIMIT) throw error
+            // Sunucuya ulaşan bayt sayısını öğrenip oradan devam et
+            await sleep(500 * failures)
+            const response = await axios.get(`${API_BASE}/upload/sessions/${session.upload_id}`)
+            state = response.data
+        }
+    }
+    return state.file
+}
+
 export default function Sidebar({
     templates,
     companies = [],
     companyFiles = [],
+    companyFilesTotal = null,
+    hasMoreCompanyFiles = false,
+    onLoadMoreCompanyFiles,
     selectedCompany,
     onCompanySelect,
     onCompanyDelete,
@@ -30,7 +75,70 @@ export default function Sidebar({
     const fileInputRef = useRef(null)
     const searchTimeoutRef = useRef(null)
 
-    const handleSearch = async (query) => {
+    // Sunucu aynı istemcinin önceki aramasını iptal edebilsin diye sabit kimlik
+    const searchClientIdRef = useRef(`sidebar-${Math.random().toString(36).slice(2)}`)
+    const searchAbortRef = useRef(null)
+
+    const cancelSearch = () => {
+        if (searchAbortRef.current) {
+            searchAbortRef.current.abort()
+            searchAbortRef.current = null
+        }
+    }
+
+    const runSearch = async (query) => {
+        cancelSearch()
+        const controller = new AbortController()
+        searchAbortRef.current = controller
+
+        setSearchResults([])
+        try {
+            const params = new URLSearchParams({ query, client_id: searchClientIdRef.current })
+            const response = await fetch(`${API_BASE}/search/stream?${params}`, {
+                signal: controller.signal
+            })
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`)
+            }
+
+            // NDJSON: her satır bir sonuç, sonuçlar bulundukça listeye eklenir
+            const reader = response.body.getReader()
+            const decoder = new TextDecoder()
+            let buffer = ''
+            while (true) {
+                const { done, value } = await reader.read()
+                if (done) break
+                buffer += decoder.decode(value, { stream: true })
+
+                const lines = buffer.split('\n')
+                buffer = lines.pop()
+                const found = []
+                for (const line of lines) {
+                    if (!line.trim()) continue
+                    const message = JSON.parse(line)
+                    if (message.type === 'result') {
+                        found.push(message.result)
+                    } else if (message.type === 'error') {
+                        console.error('Arama hatası:', message.detail)
+                    }
+                }
+                if (found.length > 0 && !controller.signal.aborted) {
+                    setSearchResults(prev => [...prev, ...found])
+                }
+            }
+        } catch (error) {
+            if (error.name !== 'AbortError') {
+                console.error('Arama hatası:', error)
+            }
+        } finally {
+            if (searchAbortRef.current === controller) {
+                searchAbortRef.current = null
+                setIsSearching(false)
+            }
+        }
+    }
+
+    const handleSearch = (query) => {
         setSearchQuery(query)
 
         if (searchTimeoutRef.current) {
@@ -38,53 +146,65 @@ export default function Sidebar({
         }
 
         if (query.length < 2) {
+            cancelSearch()
             setSearchResults([])
             setIsSearching(false)
             return
         }
 
         setIsSearching(true)
-        searchTimeoutRef.current = setTimeout(async () => {
-            try {
-                const response = await axios.get(`${API_BASE}/search`, {
-                    params: { query }
-                })
-                setSearchResults(response.data.results || [])
-            } catch (error) {
-                console.error('Arama hatası:', error)
-            } finally {
-                setIsSearching(false)
-            }
-        }, 500)
+        searchTimeoutRef.current = setTimeout(() => runSearch(query), 250)
     }
 
     const handleFileUpload = async (event) => {
         const files = Array.from(event.target.files)
         if (files.length === 0) return
 
-        const formData = new FormData()
-        files.forEach(file => {
-            formData.append('files', file)
-        })
+        const smallFiles = files.filter(file => file.size <= RESUMABLE_UPLOAD_THRESHOLD)
+        const largeFiles = files.filter(file => file.size > RESUMABLE_UPLOAD_THRESHOLD)
 
         setUploading(true)
         try {
-            const response = await axios.post(`${API_BASE}/upload`, formData, {
-                headers: {
-                    'Content-Type': 'multipart/form-data',
-                },
-            })
+            let successCount = 0
+            let errorCount = 0
+
+            if (smallFiles.length > 0) {
+                const formData = new FormData()
+                smallFiles.forEach(file => {
+                    formData.append('files', file)
+                })
+
+                const response = await axios.post(`${API_BASE}/upload`, formData, {
+                    headers: {
+                        'Content-Type': 'multipart/form-data',
+                    },
+                })
+                successCount += response.data.success_count
+                errorCount += response.data.error_count
+            }
+
+            for (const file of largeFiles) {
+                try {
+                    await uploadResumable(file)
+                    successCount += 1
+                } catch (error) {
+                    console.error('Yükleme hatası:', file.name, error)
+                    errorCount += 1
+                }
+            }
 
             // Başarı mesajı göster
-            if (response.data.success_count > 0) {
-                const message = `${response.data.success_count} dosya başarıyla yüklendi`
-                const fullMessage = response.data.error_count > 0
-                    ? `${message}\n${response.data.error_count} dosya yüklenemedi`
+            if (successCount > 0) {
+                const message = `${successCount} dosya başarıyla yüklendi`
+                const fullMessage = errorCount > 0
+                    ? `${message}\n${errorCount} dosya yüklenemedi`
                     : message
 
                 if (onSuccess) {
                     onSuccess(fullMessage, 'success')
                 }
+            } else if (errorCount > 0 && onError) {
+                onError(`${errorCount} dosya yüklenemedi`)
             }
 
             onFileUploaded()
@@ -138,7 +258,8 @@ export default function Sidebar({
                 await axios.patch(`${API_BASE}/companies/${renamingFile.company}/file/rename`, null, {
                     params: {
                         old_name: renamingFile.name,
-                        new_name: newName
+                        new_name: newName,
+                        path: renamingFile.full_path || undefined
                     }
                 })
             } else {
@@ -271,7 +392,8 @@ export default function Sidebar({
                                             onClick={() => onFileSelect({
                                                 name: result.filename,
                                                 company: result.company,
-                                                extension: result.extension
+                                                extension: result.extension,
+                                                full_path: result.path
                                             })}
                                             className="w-full text-left flex items-start gap-3"
                                         >
@@ -438,7 +560,7 @@ export default function Sidebar({
 
                 {/* Firma Dosyaları */}
                 <h2 className="text-sm font-semibold text-dark-400 uppercase tracking-wide mb-3">
-                    Firma Dosyaları ({companyFiles.length})
+                    Firma Dosyaları ({companyFilesTotal ?? companyFiles.length})
                 </h2>
 
                 <div className="space-y-2">
@@ -544,6 +666,16 @@ export default function Sidebar({
                             </div>
                         ))
                     )}
+
+                    {/* Sonraki sayfa */}
+                    {selectedCompany && hasMoreCompanyFiles && (
+                        <button
+                            onClick={onLoadMoreCompanyFiles}
+                            className="w-full py-2 text-xs text-primary-400 hover:text-primary-300 bg-dark-900 hover:bg-dark-800 border border-dark-700 hover:border-dark-600 rounded-lg transition-all duration-200"
+                        >
+                            Daha fazla yükle
+                        </button>
+                    )}
                 </div>
             </div>
         </aside>
@@ -11,6 +11,9 @@ DocumentEditorContainerComponent.Inject(Toolbar)
 
 const API_BASE = '/api'
 
+// Editör servisleri (içe aktarma, yapıştırma) backend'de yerel olarak çalışır
+const DOCUMENT_EDITOR_SERVICE_URL = `${API_BASE}/documenteditor/`
+
 export default function WordEditor({ fileContent, selectedFile, companies, onFileSaved, onCompanyAdded, onUnsavedChanges }) {
     const editorRef = useRef(null)
     const [selectedCompany, setSelectedCompany] = useState('')
@@ -38,30 +41,28 @@ export default function WordEditor({ fileContent, selectedFile, companies, onFil
         if (!editorRef.current || !fileContent) return
 
         try {
-            // Backend'den orijinal Word dosyasını al (raw endpoint)
+            // Backend'den dokümanın SFDT halini al (dönüşüm sunucuda önbelleklidir)
             let url
             // selectedFile'dan company bilgisini al
             if (selectedFile?.company) {
                 // Firma dosyası
-                url = `${API_BASE}/companies/${selectedFile.company}/file/${fileContent.filename}/raw`
-                console.log('Firma dosyası raw URL:', url)
+                url = `${API_BASE}/companies/${selectedFile.company}/file/${fileContent.filename}/sfdt`
+                console.log('Firma dosyası SFDT URL:', url)
             } else {
                 // Şablon dosyası
-                url = `${API_BASE}/file/${fileContent.filename}/raw`
-                console.log('Şablon dosyası raw URL:', url)
+                url = `${API_BASE}/file/${fileContent.filename}/sfdt`
+                console.log('Şablon dosyası SFDT URL:', url)
             }
 
             const response = await axios.get(url, {
-                responseType: 'blob'
-            })
-
-            // Blob'u File objesine çevir
-            const file = new File([response.data], fileContent.filename, {
-                type: 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+                // SFDT metni editöre olduğu gibi verilir (JSON parse edilmez)
+                responseType: 'text',
+                // Firma dosyasının yolu (aynı isimde dosya farklı klasörlerde olabilir)
+                params: { path: selectedFile?.company ? (selectedFile.full_path || undefined) : undefined }
             })
 
             // Syncfusion editöre yükle
-            editorRef.current.documentEditor.open(file)
+            editorRef.current.documentEditor.open(response.data)
 
 
             // İstenmeyen div'leri sil (Syncfusion overlay/popup - sadece trial banner)
@@ -250,7 +251,7 @@ export default function WordEditor({ fileContent, selectedFile, companies, onFil
                     ref={editorRef}
                     height="100%"
                     enableToolbar={true}
-                    serviceUrl="https://ej2services.syncfusion.com/production/web-services/api/documenteditor/"
+                    serviceUrl={DOCUMENT_EDITOR_SERVICE_URL}
                     locale="tr-TR"
                     style={{ display: 'block' }}
                     contentChange={() => {
@@ -0,0 +1,86 @@
+// Sunucunun kompakt Excel formatını editörün kullandığı hücre nesnelerine açar.
+//
+// Kompakt format: çalışma kitabı genelinde bir stil tablosu (styles) vardır,
+// her satır hücre listesidir ve koordinat satır/sütun sırasından çıkarılır.
+//   stilId                     -> boş hücre
+//   [stilId, değer]            -> değerli hücre
+//   [stilId, değer, formül]    -> formül hücresi
+// Sondaki boş ve varsayılan stilli hücreler gönderilmez, max_column'a tamamlanır.
+// Büyük çalışma kitapları için önce özet (manifest, satırsız) alınır; satırlar
+// /cells ile blok blok istenir ve decodeCellBlock ile açılır.
+
+export const columnLetter = (index) => {
+    let n = index + 1
+    let letters = ''
+    while (n > 0) {
+        const mod = (n - 1) % 26
+        letters = String.fromCharCode(65 + mod) + letters
+        n = Math.floor((n - 1) / 26)
+    }
+    return letters
+}
+
+// Kompakt satırları hücre nesnelerine aç (rowOffset/colOffset: bloğun sayfadaki başlangıcı)
+const decodeRows = (rows, { rowOffset = 0, colOffset = 0, columnCount = 0, styles, defaultStyle }) => {
+    const letters = Array.from({ length: columnCount }, (_, i) => columnLetter(colOffset + i))
+
+    // Stil nesneleri hücreler arasında paylaşılır (editör hücreleri kopyalayarak günceller)
+    return rows.map((row, rowIndex) => {
+        const rowNumber = rowOffset + rowIndex + 1
+        const cells = new Array(Math.max(columnCount, row.length))
+        for (let colIndex = 0; colIndex < cells.length; colIndex++) {
+            const encoded = colIndex < row.length ? row[colIndex] : defaultStyle
+            const coordinate = `${letters[colIndex] || columnLetter(colOffset + colIndex)}${rowNumber}`
+
+            if (typeof encoded === 'number') {
+                cells[colIndex] = { value: '', coordinate, ...styles[encoded] }
+            } else {
+                const cell = { value: encoded[1], coordinate, ...styles[encoded[0]] }
+                if (encoded.length > 2) {
+                    cell.formula = encoded[2]
+                }
+                cells[colIndex] = cell
+            }
+        }
+        return cells
+    })
+}
+
+const decodeSheet = (sheet, styles, defaultStyle) => {
+    const { rows, ...rest } = sheet
+
+    // Özet (manifest) yanıtında satırlar yoktur, /cells ile parça parça yüklenir
+    if (!rows) {
+        return { ...rest, data: [] }
+    }
+
+    const data = decodeRows(rows, { columnCount: sheet.max_column || 0, styles, defaultStyle })
+    return { ...rest, data }
+}
+
+export const decodeExcelContent = (content) => {
+    if (!content || content.type !== 'excel' || content.format !== 'compact') {
+        return content
+    }
+
+    const { styles = [], default_style: defaultStyle = 0, format, ...rest } = content
+    const sheets = {}
+    Object.entries(content.sheets || {}).forEach(([sheetName, sheet]) => {
+        sheets[sheetName] = decodeSheet(sheet, styles, defaultStyle)
+    })
+
+    // Özet yanıtında stil tablosu sonradan gelecek bloklar için saklanır
+    if (content.lazy) {
+        return { ...rest, styles, default_style: defaultStyle, sheets }
+    }
+    return { ...rest, sheets }
+}
+
+// /cells yanıtını (hücre bloğu) hücre nesnelerine aç
+export const decodeCellBlock = (block, content) => decodeRows(block.rows, {
+    rowOffset: block.row_start - 1,
+    colOffset: block.col_start - 1,
+    columnCount: block.col_end - block.col_start + 1,
+    styles: content.styles || [],
+    defaultStyle: content.default_style || 0
+})